@@ -2,11 +2,36 @@
 #
 # SPDX-License-Identifier: MIT
 
-from . import tasks
-from .uptimerobot import UptimeRobot, uptime_robot
+import importlib
+import typing
+
+if typing.TYPE_CHECKING:
+    from . import tasks
+    from .aio import AsyncUptimeRobot
+    from .uptimerobot import UptimeRobot, uptime_robot
 
 __all__ = [
     "UptimeRobot",  # cls
+    "AsyncUptimeRobot",  # cls
     "uptime_robot",  # default instance
     "tasks",
 ]
+
+# public name -> module it lives in; imported on first access (PEP 562),
+# so importing the package (e.g. for plugin discovery) doesn't load edwh, the HTTP stack or serializers:
+_LAZY = {
+    "UptimeRobot": ".uptimerobot",
+    "AsyncUptimeRobot": ".aio",
+    "uptime_robot": ".uptimerobot",
+    "tasks": ".tasks",
+}
+
+
+def __getattr__(name: str) -> typing.Any:
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    module = importlib.import_module(_LAZY[name], __name__)
+    value = module if name == "tasks" else getattr(module, name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,154 @@
+"""
+Read several UptimeRobot accounts (e.g. one per customer cluster) as if they were one.
+
+Configure them in .env (or the environment):
+
+    UPTIMEROBOT_ACCOUNTS=cluster-a,cluster-b
+    UPTIMEROBOT_APIKEY_CLUSTER_A=...
+    UPTIMEROBOT_APIKEY_CLUSTER_B=...
+    UPTIMEROBOT_PLAN_CLUSTER_B=pro  # optional, defaults to UPTIMEROBOT_PLAN
+
+Every account gets its own client, so its own rate limit budget and connection pool,
+and all accounts are queried at the same time: a read takes as long as the slowest account.
+"""
+
+import os
+import re
+import sys
+import threading
+import typing
+
+from termcolor import cprint
+
+from .memo import RequestMemo
+from .uptimerobot import (
+    DEFAULT_PLAN,
+    UptimeRobot,
+    UptimeRobotDashboard,
+    UptimeRobotMonitor,
+)
+
+T = typing.TypeVar("T", UptimeRobotMonitor, UptimeRobotDashboard)
+
+ACCOUNTS_SETTING = "UPTIMEROBOT_ACCOUNTS"
+
+
+def setting_for(prefix: str, account: str) -> str:
+    """
+    'cluster-a' -> UPTIMEROBOT_APIKEY_CLUSTER_A
+    """
+    return prefix + "_" + re.sub(r"\W", "_", account).upper()
+
+
+def env_value(key: str, default: str = "") -> str:
+    import edwh
+
+    return os.environ.get(key) or edwh.get_env_value(key, default)
+
+
+class Accounts:
+    """
+    Fan read calls out to multiple clients concurrently; every returned item is tagged with its 'account'.
+
+    An account that fails doesn't stop the others: its error is kept in `errors` and reported on stderr.
+    """
+
+    def __init__(self, clients: dict[str, UptimeRobot]):
+        self.clients = clients
+        self.errors: dict[str, Exception] = {}
+
+    @classmethod
+    def from_env(cls, template: UptimeRobot) -> "Accounts":
+        """
+        Clients for the accounts in UPTIMEROBOT_ACCOUNTS (empty if that isn't set).
+
+        :param template: client to copy the API root, timeouts, cache, stats collector and verbosity from
+        """
+        names = [_.strip() for _ in env_value(ACCOUNTS_SETTING).split(",") if _.strip()]
+        if not names:
+            return cls({})
+
+        from edwh import check_env
+
+        default_plan = env_value("UPTIMEROBOT_PLAN", DEFAULT_PLAN)
+
+        clients = {}
+        for name in names:
+            key_setting = setting_for("UPTIMEROBOT_APIKEY", name)
+            client = UptimeRobot(
+                api_key=os.environ.get(key_setting)
+                or check_env(key_setting, default="", comment=f"The API key of UptimeRobot account '{name}'."),
+                base=template.base,
+                pool_size=template.pool_size,
+                timeout=template.timeout,
+                rate_limit=env_value(setting_for("UPTIMEROBOT_PLAN", name), default_plan),
+                max_retries=template.max_retries,
+                cache=template.cache,  # entries are namespaced per API key, and the cache is thread-safe
+                stats=template.stats,
+                memo=RequestMemo() if template.memo else None,  # not shared: its entries aren't per account
+            )
+            client.set_verbosity(template._verbose)
+            clients[name] = client
+
+        return cls(clients)
+
+    def __len__(self) -> int:
+        return len(self.clients)
+
+    def _fan_out(self, fetch: typing.Callable[[UptimeRobot], typing.Iterable[T]]) -> typing.Iterator[T]:
+        """
+        Run `fetch` for every account in its own thread and yield the items as they arrive.
+        """
+        import queue
+
+        results: "queue.Queue[tuple[str, T | None]]" = queue.Queue()
+        self.errors = {}
+
+        def worker(name: str, client: UptimeRobot) -> None:
+            try:
+                for item in fetch(client):
+                    results.put((name, item))
+            except Exception as e:
+                self.errors[name] = e
+            finally:
+                results.put((name, None))  # this account is done
+
+        threads = [
+            threading.Thread(target=worker, args=(name, client), daemon=True) for name, client in self.clients.items()
+        ]
+        for thread in threads:
+            thread.start()
+
+        remaining = len(threads)
+        while remaining:
+            name, item = results.get()
+            if item is None:
+                remaining -= 1
+            else:
+                yield typing.cast(T, {**item, "account": name})
+
+        for name, error in self.errors.items():
+            cprint(f"Account {name} failed: {error}", color="red", file=sys.stderr)
+
+    def iter_monitors(self, search: str = "", **options: typing.Any) -> typing.Iterator[UptimeRobotMonitor]:
+        """
+        Monitors of all accounts, see UptimeRobot.iter_monitors.
+        """
+        return self._fan_out(lambda client: client.iter_monitors(search, **options))
+
+    def get_monitors(self, search: str = "", **options: typing.Any) -> list[UptimeRobotMonitor]:
+        return list(self.iter_monitors(search, **options))
+
+    def get_psps(self) -> list[UptimeRobotDashboard]:
+        return list(self._fan_out(lambda client: client.get_psps()))
+
+    def invalidate_cache(self, *entities: str) -> None:
+        for client in self.clients.values():
+            client.invalidate_cache(*entities)
+
+    def answered_from_cache(self, entity: str) -> bool:
+        return any(client.answered_from_cache(entity) for client in self.clients.values())
+
+    def close(self) -> None:
+        for client in self.clients.values():
+            client.close()
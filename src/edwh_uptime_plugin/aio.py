@@ -0,0 +1,147 @@
+"""
+asyncio counterpart of the UptimeRobot client.
+
+Every call runs on the (thread-safe) pooled session and rate limiter of a regular UptimeRobot instance,
+in a bounded worker pool, so one event loop can fan out hundreds of requests:
+
+    async with AsyncUptimeRobot(concurrency=8) as robot:
+        monitors = await robot.get_monitors()
+        await asyncio.gather(*(robot.edit_monitor(m["id"], {"interval": 60}) for m in monitors))
+"""
+
+import asyncio
+import functools
+import typing
+from concurrent.futures import ThreadPoolExecutor
+
+from typing_extensions import Concatenate, ParamSpec
+
+from .uptimerobot import (
+    PAGE_SIZE,
+    UptimeRobot,
+    UptimeRobotMonitor,
+)
+
+P = ParamSpec("P")
+T = typing.TypeVar("T")
+
+
+def _in_pool(
+    method: typing.Callable[Concatenate[UptimeRobot, P], T],
+) -> typing.Callable[Concatenate["AsyncUptimeRobot", P], typing.Coroutine[typing.Any, typing.Any, T]]:
+    """
+    Expose a blocking UptimeRobot method as a coroutine with the same signature.
+    """
+    name = method.__name__
+
+    @functools.wraps(method)
+    async def wrapper(self: "AsyncUptimeRobot", *args: P.args, **kwargs: P.kwargs) -> T:
+        return await self.run(getattr(self.client, name), *args, **kwargs)
+
+    return wrapper
+
+
+class AsyncUptimeRobot:
+    """
+    Async UptimeRobot client with bounded concurrency.
+
+    Uses the same TypedDicts and raises the same exceptions as UptimeRobot.
+    """
+
+    def __init__(self, client: UptimeRobot = None, concurrency: int = None, **client_kwargs: typing.Any):
+        """
+        :param client: existing client to share the connection pool and rate limit budget with
+        :param concurrency: max amount of requests in flight (default: the pool size of the client)
+        :param client_kwargs: passed to UptimeRobot() when no client is given
+        """
+        self._owns_client = client is None
+        self.client = client or UptimeRobot(**client_kwargs)
+        self.concurrency = concurrency or self.client.pool_size
+
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="uptimerobot")
+        self._semaphores: dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        # semaphores are bound to an event loop, so keep one per loop (e.g. multiple asyncio.run calls):
+        loop = asyncio.get_running_loop()
+        if loop not in self._semaphores:
+            self._semaphores[loop] = asyncio.Semaphore(self.concurrency)
+        return self._semaphores[loop]
+
+    async def run(self, func: typing.Callable[P, T], *args: P.args, **kwargs: P.kwargs) -> T:
+        """
+        Run a blocking callable in the worker pool, waiting for a free slot first.
+        """
+        async with self.semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    async def aclose(self) -> None:
+        self._executor.shutdown(wait=False)
+        if self._owns_client:
+            self.client.close()
+
+    async def __aenter__(self) -> "AsyncUptimeRobot":
+        return self
+
+    async def __aexit__(self, *_: typing.Any) -> None:
+        await self.aclose()
+
+    async def iter_monitors(
+        self,
+        search: str = "",
+        monitor_ids: typing.Iterable[str | int] = (),
+        mwindows=False,
+        page_size: int = PAGE_SIZE,
+    ) -> typing.AsyncIterator[UptimeRobotMonitor]:
+        """
+        Yield all monitors, fetching the next page only when the previous one is consumed.
+        """
+        data = {}
+        if search:
+            data["search"] = search
+        if monitor_ids:
+            data["monitors"] = self.client.format_list(monitor_ids)
+        if mwindows:
+            data["mwindows"] = mwindows
+
+        pages = self.client._iter_page_lists("getMonitors", "monitors", page_size=page_size, **data)
+        while page := await self.run(next, pages, None):
+            for monitor in page:
+                yield monitor
+
+    get_account_details = _in_pool(UptimeRobot.get_account_details)
+
+    get_monitors = _in_pool(UptimeRobot.get_monitors)
+    get_monitor = _in_pool(UptimeRobot.get_monitor)
+    new_monitor = _in_pool(UptimeRobot.new_monitor)
+    edit_monitor = _in_pool(UptimeRobot.edit_monitor)
+    delete_monitor = _in_pool(UptimeRobot.delete_monitor)
+    reset_monitor = _in_pool(UptimeRobot.reset_monitor)
+    monitor_change_mwindows = _in_pool(UptimeRobot.monitor_change_mwindows)
+
+    get_m_windows = _in_pool(UptimeRobot.get_m_windows)
+    get_m_window = _in_pool(UptimeRobot.get_m_window)
+    new_maintenance_window = _in_pool(UptimeRobot.new_maintenance_window)
+    edit_m_window = _in_pool(UptimeRobot.edit_m_window)
+    delete_maintenance_window = _in_pool(UptimeRobot.delete_maintenance_window)
+
+    get_psps = _in_pool(UptimeRobot.get_psps)
+    get_psp = _in_pool(UptimeRobot.get_psp)
+    edit_psp = _in_pool(UptimeRobot.edit_psp)
+
+    async def clean_maintenance_windows(self) -> int:
+        """
+        Remove all 'once' maintenance windows concurrently. Returns the amount that was removed;
+        a failing removal doesn't stop the others.
+        """
+        windows = [_ for _ in await self.get_m_windows() or [] if _["type"] == "once"]
+        results = await asyncio.gather(
+            *(self.delete_maintenance_window(_["id"]) for _ in windows), return_exceptions=True
+        )
+        return sum(result is True for result in results)
+
+    format_list = staticmethod(UptimeRobot.format_list)
+    format_status = staticmethod(UptimeRobot.format_status)
+    format_status_color = staticmethod(UptimeRobot.format_status_color)
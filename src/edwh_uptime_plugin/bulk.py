@@ -0,0 +1,326 @@
+"""
+Journaled bulk changes (e.g. linking a maintenance window to every monitor of a dashboard).
+
+A run is planned up front as a list of steps and written to an append-only journal
+(`$XDG_DATA_HOME/edwh-uptime/runs/<run id>.jsonl`): the plan on the first line,
+then one line per step that finished, failed or was undone, written as soon as that happens.
+When a run is interrupted (crash, Ctrl-C, 429s that outlast the retries), `resume` only performs the steps that
+aren't done yet, and `rollback` undoes the steps that changed something.
+
+Steps of the same action are prepared with one batched read and then run in parallel,
+paced by the client's rate limiter. They are idempotent, so a step that finished right before a crash
+(but wasn't journaled anymore) can safely run again.
+"""
+
+import itertools
+import json
+import os
+import secrets
+import time
+import typing
+from pathlib import Path
+
+from .helpers import run_parallel
+from .uptimerobot import YEAR_3000
+
+if typing.TYPE_CHECKING:
+    from .uptimerobot import UptimeRobot
+
+AnyDict: typing.TypeAlias = dict[str, typing.Any]
+
+KEEP_DAYS = 30  # journals of finished runs are removed after this long
+
+
+def default_runs_path() -> Path:
+    data_home = os.environ.get("XDG_DATA_HOME") or Path.home() / ".local" / "share"
+    return Path(data_home) / "edwh-uptime" / "runs"
+
+
+class Step(typing.NamedTuple):
+    action: str
+    params: AnyDict
+
+
+class StepFailed(Exception):
+    """
+    The API didn't accept a step.
+    """
+
+
+# a worker performs one step and returns whether it changed anything (raises when it failed):
+Worker = typing.Callable[[AnyDict], bool]
+# an action gets the params of all its steps in this run (for one batched read) and returns the worker:
+Action = typing.Callable[["UptimeRobot", list[AnyDict]], Worker]
+Progress = typing.Callable[[int, int, Step, bool | Exception], None]
+
+
+def windows_of(params: AnyDict) -> set[str]:
+    """
+    Window ids of a step: one 'window' or a list of 'windows'.
+    """
+    return {str(_) for _ in params.get("windows") or [params["window"]]}
+
+
+def _change_mwindows(link: bool) -> Action:
+    def prepare(client: "UptimeRobot", batch: list[AnyDict]) -> Worker:
+        monitor_ids = [_["monitor"] for _ in batch]
+        monitors = {int(_["id"]): _ for _ in client.get_monitors(monitor_ids=monitor_ids, mwindows=1)}
+
+        def change(params: AnyDict) -> bool:
+            monitor_id = int(params["monitor"])
+            if (monitor := monitors.get(monitor_id)) is None:
+                raise StepFailed(f"monitor {monitor_id} not found")
+
+            linked = {str(_["id"]) for _ in monitor.get("mwindows", [])}
+            windows = windows_of(params) - linked if link else windows_of(params) & linked
+            if not windows:
+                return False  # nothing to do
+
+            changes = {"to_add": windows} if link else {"to_remove": windows}
+            if not client.monitor_change_mwindows(monitor_data=dict(monitor), **changes):
+                raise StepFailed(f"monitor {monitor_id} could not be edited")
+            return True
+
+        return change
+
+    return prepare
+
+
+def delete_mwindow(client: "UptimeRobot", batch: list[AnyDict]) -> Worker:
+    windows = {int(_["id"]): _ for _ in client.get_m_windows([_["window"] for _ in batch]) or []}
+
+    def delete(params: AnyDict) -> bool:
+        if (window := windows.get(int(params["window"]))) is None:
+            return False  # already gone
+
+        if window.get("status") != 0:
+            # pause it first, like `unmaintenance`:
+            client.edit_m_window(new_data={**window, "status": 0, "start_time": YEAR_3000})
+
+        if not client.delete_maintenance_window(window["id"]):
+            raise StepFailed(f"window {window['id']} could not be removed")
+        return True
+
+    return delete
+
+
+ACTIONS: dict[str, Action] = {
+    # one edit per monitor, so use 'windows' for a monitor that needs several:
+    "attach_mwindow": _change_mwindows(link=True),  # params: monitor, window or windows
+    "detach_mwindow": _change_mwindows(link=False),  # params: monitor, window or windows
+    "delete_mwindow": delete_mwindow,  # params: window
+}
+
+# how to undo an action (with the same params); actions that aren't listed can't be undone.
+# 'new_mwindow' steps are never performed by a run, only recorded as done (see BulkRun.plan):
+UNDO: dict[str, str] = {
+    "attach_mwindow": "detach_mwindow",
+    "detach_mwindow": "attach_mwindow",
+    "new_mwindow": "delete_mwindow",
+}
+
+
+class BulkRun:
+    def __init__(self, path: Path):
+        self.path = path
+        self.id = path.stem
+        self.operation = ""
+        self.created = 0.0
+        self.steps: list[Step] = []
+        self.changed: dict[int, bool] = {}  # step -> whether it changed something, for every step that is done
+        self.errors: dict[int, str] = {}  # step -> last error, for steps that failed and aren't done since
+        self.undone: set[int] = set()
+        self._read()
+
+    def _read(self) -> None:
+        with self.path.open() as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    break  # half-written last line of a run that was killed
+                self._apply_event(event)
+
+    def _apply_event(self, event: AnyDict) -> None:
+        if plan := event.get("plan"):
+            self.operation = plan["operation"]
+            self.created = plan["created"]
+            self.steps = [Step(action, params) for action, params in plan["steps"]]
+        elif "done" in event:
+            self.changed[event["done"]] = event["changed"]
+            self.errors.pop(event["done"], None)
+        elif "failed" in event:
+            self.errors[event["failed"]] = event["error"]
+        elif "undone" in event:
+            self.undone.add(event["undone"])
+
+    def _record(self, *events: AnyDict) -> None:
+        """
+        Append events to the journal (and apply them to this run).
+        """
+        if not events:
+            return
+
+        with self.path.open("a") as f:
+            f.write("".join(json.dumps(_) + "\n" for _ in events))
+        for event in events:
+            self._apply_event(event)
+
+    @classmethod
+    def plan(cls, operation: str, steps: typing.Iterable[Step], done: typing.Iterable[int] = ()) -> "BulkRun":
+        """
+        Start a new run.
+
+        :param done: steps that were already performed (e.g. creating the window that the other steps use),
+            only journaled so a rollback undoes them too
+        """
+        directory = default_runs_path()
+        directory.mkdir(parents=True, exist_ok=True)
+        cls.prune()
+
+        run_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{operation}-{secrets.token_hex(2)}"
+        path = directory / f"{run_id}.jsonl"
+        path.touch(exist_ok=False)
+
+        run = cls(path)
+        plan = {"operation": operation, "created": time.time(), "steps": [list(_) for _ in steps]}
+        run._record({"plan": plan}, *({"done": idx, "changed": True} for idx in done))
+        return run
+
+    @classmethod
+    def all(cls) -> list["BulkRun"]:
+        """
+        Every journaled run, oldest first.
+        """
+        directory = default_runs_path()
+        if not directory.exists():
+            return []
+        return sorted((cls(path) for path in directory.glob("*.jsonl")), key=lambda run: run.created)
+
+    @classmethod
+    def find(cls, run_id: str = "", unfinished: bool = False) -> typing.Optional["BulkRun"]:
+        """
+        The run with `run_id`, or else the last (unfinished) one.
+        """
+        if run_id:
+            path = default_runs_path() / f"{run_id}.jsonl"
+            return cls(path) if path.exists() else None
+
+        runs = [_ for _ in cls.all() if not unfinished or not (_.complete or _.undone)]
+        return runs[-1] if runs else None
+
+    @classmethod
+    def prune(cls) -> None:
+        cutoff = time.time() - KEEP_DAYS * 24 * 3600
+        for run in cls.all():
+            if run.path.stat().st_mtime < cutoff and (run.complete or run.undone):
+                run.path.unlink(missing_ok=True)
+
+    @property
+    def pending(self) -> list[int]:
+        return [idx for idx in range(len(self.steps)) if idx not in self.changed]
+
+    @property
+    def complete(self) -> bool:
+        return len(self.changed) == len(self.steps)
+
+    def _to_undo(self) -> list[int]:
+        """
+        Steps that changed something and aren't undone yet, newest first.
+        """
+        return [idx for idx in reversed(range(len(self.steps))) if self.changed.get(idx) and idx not in self.undone]
+
+    def _reversible(self, idx: int, removed: set[str]) -> bool:
+        """
+        :param removed: windows this run removed, which can't be linked again
+        """
+        step = self.steps[idx]
+        return step.action in UNDO and not (step.action != "new_mwindow" and windows_of(step.params) & removed)
+
+    def _removed_windows(self) -> set[str]:
+        removed: set[str] = set()
+        for idx, changed in self.changed.items():
+            if changed and self.steps[idx].action == "delete_mwindow":
+                removed |= windows_of(self.steps[idx].params)
+        return removed
+
+    @property
+    def irreversible(self) -> list[int]:
+        """
+        Steps that changed something but can't be undone (removing a window, or (un)linking a window that was removed).
+        """
+        removed = self._removed_windows()
+        return [idx for idx in self._to_undo() if not self._reversible(idx, removed)]
+
+    def _perform(
+        self,
+        client: "UptimeRobot",
+        action: str,
+        indices: list[int],
+        undo: bool,
+        progress: Progress | None,
+        counter: typing.Callable[[], tuple[int, int]],
+    ) -> list[tuple[int, bool | Exception]]:
+        worker = ACTIONS[action](client, [self.steps[idx].params for idx in indices])
+
+        def report(_: int, __: int, idx: int, result: bool | Exception) -> None:
+            if not isinstance(result, Exception):
+                self._record({"undone": idx} if undo else {"done": idx, "changed": result})
+            elif not undo:
+                self._record({"failed": idx, "error": str(result)})
+
+            if progress:
+                progress(*counter(), Step(action, self.steps[idx].params), result)
+
+        return run_parallel(
+            lambda idx: worker(self.steps[idx].params), indices, workers=client.pool_size, progress=report
+        )
+
+    def _in_batches(
+        self, client: "UptimeRobot", indices: list[int], undo: bool, progress: Progress = None
+    ) -> list[tuple[int, bool | Exception]]:
+        """
+        Per action (in the given order), all its steps in parallel.
+        """
+        done = itertools.count(1)
+
+        def counter() -> tuple[int, int]:  # progress over all batches
+            return next(done), len(indices)
+
+        def action_of(idx: int) -> str:
+            return UNDO[self.steps[idx].action] if undo else self.steps[idx].action
+
+        results = []
+        with client.fresh():  # steps edit what they read, so never prepare them from cached data
+            for action, batch in itertools.groupby(indices, key=action_of):
+                results += self._perform(client, action, list(batch), undo, progress, counter)
+        return results
+
+    def execute(self, client: "UptimeRobot", progress: Progress = None) -> list[tuple[int, bool | Exception]]:
+        """
+        Perform every step that isn't done yet.
+
+        :return: (step, whether it changed something or the exception it failed with) per performed step
+        """
+        return self._in_batches(client, self.pending, undo=False, progress=progress)
+
+    def rollback(self, client: "UptimeRobot", progress: Progress = None) -> list[tuple[int, bool | Exception]]:
+        """
+        Undo every step that changed something, newest first. Steps that can't be undone are skipped.
+
+        Links to a window that this run created aren't undone one by one: removing the window removes them.
+        """
+        removed = self._removed_windows()
+        todo = [idx for idx in self._to_undo() if self._reversible(idx, removed)]
+
+        def windows(idx: int) -> set[str]:
+            return windows_of(self.steps[idx].params)
+
+        created = set().union(*(windows(idx) for idx in todo if self.steps[idx].action == "new_mwindow"))
+        covered = {idx for idx in todo if self.steps[idx].action == "attach_mwindow" and windows(idx) <= created}
+
+        results = self._in_batches(client, [_ for _ in todo if _ not in covered], undo=True, progress=progress)
+
+        gone = set().union(*(windows(idx) for idx in self.undone if self.steps[idx].action == "new_mwindow"))
+        self._record(*({"undone": idx} for idx in sorted(covered) if windows(idx) <= gone))
+        return results
@@ -0,0 +1,129 @@
+"""
+Persistent on-disk cache for read-only API responses (monitors, dashboards and maintenance windows).
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import typing
+from pathlib import Path
+
+if typing.TYPE_CHECKING:
+    import sqlite3
+
+# which entity each read endpoint returns:
+CACHED_ENDPOINTS: dict[str, str] = {
+    "getMonitors": "monitors",
+    "getPSPs": "psps",
+    "getMWindows": "mwindows",
+}
+
+# which cached entities become stale when the client performs a write:
+INVALIDATED_BY: dict[str, tuple[str, ...]] = {
+    "newMonitor": ("monitors",),
+    "editMonitor": ("monitors",),
+    "deleteMonitor": ("monitors", "psps"),
+    "resetMonitor": ("monitors",),
+    "newPSP": ("psps",),
+    "editPSP": ("psps",),
+    "deletePSP": ("psps",),
+    "newMWindow": ("mwindows",),
+    "editMWindow": ("mwindows", "monitors"),
+    "deleteMWindow": ("mwindows", "monitors"),
+}
+
+# seconds; monitor status changes often, dashboards and windows rarely:
+DEFAULT_TTLS: dict[str, float] = {
+    "monitors": 60,
+    "psps": 600,
+    "mwindows": 300,
+}
+
+
+def default_cache_path() -> Path:
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "edwh-uptime" / "cache.sqlite3"
+
+
+def namespace_for(api_key: str) -> str:
+    """
+    Keep accounts apart without storing the API key itself.
+    """
+    return hashlib.sha256(api_key.encode()).hexdigest()[:16]
+
+
+class ResponseCache:
+    """
+    SQLite-backed key/value store with a TTL per entity (monitors, psps, mwindows).
+    """
+
+    def __init__(
+        self,
+        path: Path | str = None,
+        ttls: dict[str, float] = None,
+        clock: typing.Callable[[], float] = time.time,
+    ):
+        self.path = Path(path) if path else default_cache_path()
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._db: typing.Optional["sqlite3.Connection"] = None
+
+    @property
+    def db(self) -> "sqlite3.Connection":
+        if self._db is None:
+            import sqlite3
+
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " namespace TEXT, entity TEXT, key TEXT, value TEXT, expires REAL,"
+                " PRIMARY KEY (namespace, entity, key))"
+            )
+        return self._db
+
+    def get(self, namespace: str, entity: str, key: str) -> typing.Any | None:
+        with self._lock:
+            row = self.db.execute(
+                "SELECT value FROM entries WHERE namespace = ? AND entity = ? AND key = ? AND expires > ?",
+                (namespace, entity, key, self._clock()),
+            ).fetchone()
+
+        return json.loads(row[0]) if row else None
+
+    def set(self, namespace: str, entity: str, key: str, value: typing.Any) -> None:
+        ttl = self.ttls.get(entity, 0)
+        if ttl <= 0:
+            return
+
+        now = self._clock()
+        with self._lock:
+            self.db.execute("DELETE FROM entries WHERE expires <= ?", (now,))
+            self.db.execute(
+                "INSERT OR REPLACE INTO entries (namespace, entity, key, value, expires) VALUES (?, ?, ?, ?, ?)",
+                (namespace, entity, key, json.dumps(value), now + ttl),
+            )
+
+    def invalidate(self, namespace: str, *entities: str) -> None:
+        """
+        Drop the given entities (or everything when none are given) for one account.
+        """
+        with self._lock:
+            if entities:
+                placeholders = ", ".join("?" for _ in entities)
+                self.db.execute(
+                    f"DELETE FROM entries WHERE namespace = ? AND entity IN ({placeholders})",
+                    (namespace, *entities),
+                )
+            else:
+                self.db.execute("DELETE FROM entries WHERE namespace = ?", (namespace,))
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
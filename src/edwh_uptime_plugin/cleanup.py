@@ -0,0 +1,72 @@
+"""
+Find the maintenance windows that are no longer needed, from one listing of the windows and one of the monitors:
+one-time windows that have ended ('expired') and windows that no monitor uses ('orphaned').
+"""
+
+import time
+import typing
+from collections import defaultdict
+
+from .bulk import Step
+
+if typing.TYPE_CHECKING:
+    from .uptimerobot import UptimeRobotMaintenanceWindow, UptimeRobotMonitor
+
+ONCE = ("once", 1)  # type of one-time windows, by name or number
+
+
+class StaleWindow(typing.NamedTuple):
+    window: "UptimeRobotMaintenanceWindow"
+    reason: typing.Literal["expired", "orphaned"]
+    monitors: list[int]  # ids of the monitors it is still linked to
+
+
+def has_ended(window: "UptimeRobotMaintenanceWindow", now: float) -> bool:
+    if window.get("type") not in ONCE:
+        return False  # recurring windows don't end
+
+    # start_time is a unix timestamp for one-time windows, duration is in minutes:
+    return int(window.get("start_time") or 0) + int(window.get("duration") or 0) * 60 < now
+
+
+def find_stale_windows(
+    windows: typing.Iterable["UptimeRobotMaintenanceWindow"],
+    monitors: typing.Iterable["UptimeRobotMonitor"],
+    expired: bool = True,
+    orphaned: bool = True,
+    now: float = None,
+) -> list[StaleWindow]:
+    """
+    :param monitors: all monitors, with their windows (`get_monitors(mwindows=1)`)
+    """
+    now = time.time() if now is None else now
+
+    linked: dict[int, list[int]] = defaultdict(list)  # window id -> monitor ids
+    for monitor in monitors:
+        for window in monitor.get("mwindows") or []:
+            linked[int(window["id"])].append(int(monitor["id"]))
+
+    stale = []
+    for window in windows:
+        monitor_ids = linked.get(int(window["id"]), [])
+        if expired and has_ended(window, now):
+            stale.append(StaleWindow(window, "expired", monitor_ids))
+        elif orphaned and not monitor_ids:
+            stale.append(StaleWindow(window, "orphaned", monitor_ids))
+
+    return stale
+
+
+def cleanup_steps(stale: typing.Iterable[StaleWindow]) -> list[Step]:
+    """
+    One step per monitor that detaches all of its stale windows, followed by the removal of every window.
+    """
+    stale = list(stale)
+    detach: dict[int, list[int]] = defaultdict(list)  # monitor id -> window ids
+    for item in stale:
+        for monitor_id in item.monitors:
+            detach[monitor_id].append(int(item.window["id"]))
+
+    return [Step("detach_mwindow", {"monitor": monitor_id, "windows": ids}) for monitor_id, ids in detach.items()] + [
+        Step("delete_mwindow", {"window": int(item.window["id"])}) for item in stale
+    ]
@@ -0,0 +1,135 @@
+"""
+Assign monitors to dashboards by rules instead of picking them one dashboard at a time.
+
+    [[dashboards]]
+    friendly_name = "Production"   # existing dashboard, by name (or `id`)
+    urls = ["*.example.com"]        # globs on the URL or its host
+    names = ["prod-*"]              # globs on the friendly_name
+    hosts = ["shop.example.com"]    # exact hosts
+    compose = ["/srv/shop"]         # the traefik hosts of these docker compose projects
+
+A monitor belongs to a dashboard when any of its rule's patterns matches (case-insensitive).
+"""
+
+import fnmatch
+import re
+import typing
+from dataclasses import dataclass, field
+
+from .search import split_url
+from .table import MonitorTable
+from .uptimerobot import AnyDict, UptimeRobotDashboard
+
+
+def compile_globs(patterns: typing.Iterable[str]) -> re.Pattern[str] | None:
+    """
+    One regex for a list of globs, so every monitor is tested once per rule instead of once per pattern.
+    """
+    if not (patterns := [_.lower() for _ in patterns]):
+        return None
+    return re.compile("|".join(f"(?:{fnmatch.translate(_)})" for _ in patterns))
+
+
+@dataclass
+class DashboardRule:
+    dashboard: str  # id or friendly_name
+    urls: list[str] = field(default_factory=list)
+    names: list[str] = field(default_factory=list)
+    hosts: list[str] = field(default_factory=list)
+    compose: list[str] = field(default_factory=list)  # directories, resolved to `hosts` by the caller
+    unresolved: list[str] = field(default_factory=list)  # `compose` entries the caller found no hosts for
+
+    @classmethod
+    def from_spec(cls, spec: AnyDict) -> "DashboardRule":
+        return cls(
+            str(spec.get("id") or spec.get("friendly_name", "")),
+            urls=list(spec.get("urls") or []),
+            names=list(spec.get("names") or []),
+            hosts=list(spec.get("hosts") or []),
+            compose=list(spec.get("compose") or []),
+        )
+
+    def matcher(self) -> typing.Callable[[str, str], bool]:
+        """
+        (url, friendly_name) -> whether the monitor belongs to the dashboard.
+        """
+        urls, names = compile_globs(self.urls), compile_globs(self.names)
+        hosts = {_.lower() for _ in self.hosts}
+
+        def matches(url: str, name: str) -> bool:
+            url, name = url.lower(), name.lower()
+            host, _ = split_url(url)
+            return bool(
+                (hosts and host in hosts)
+                or (urls and (urls.fullmatch(url) or urls.fullmatch(host) or urls.fullmatch(url.rstrip("/"))))
+                or (names and names.fullmatch(name))
+            )
+
+        return matches
+
+
+@dataclass
+class DashboardChange:
+    dashboard: UptimeRobotDashboard
+    added: list[int]
+    removed: list[int]
+
+    @property
+    def monitors(self) -> list[int]:
+        removed = set(self.removed)
+        return [_ for _ in self.dashboard.get("monitors") or [] if int(_) not in removed] + self.added
+
+    def describe(self) -> str:
+        return f"~ dashboard {self.dashboard['friendly_name']} (+{len(self.added)} -{len(self.removed)} monitors)"
+
+
+def plan_dashboards(
+    rules: typing.Iterable[DashboardRule],
+    dashboards: list[UptimeRobotDashboard],
+    monitors: MonitorTable,
+    exact: bool = False,
+) -> tuple[list[DashboardChange], list[str]]:
+    """
+    The membership changes for all dashboards at once; dashboards that stay the same are left out.
+
+    :param exact: also remove the monitors that don't match (default: only add the ones that do),
+                  except on dashboards with a rule that is incomplete or matches nothing
+    :return: changes and problems (e.g. unknown dashboards)
+    """
+    by_id = {str(_["id"]): _ for _ in dashboards}
+    by_name = {_["friendly_name"].lower(): _ for _ in dashboards}
+
+    # all rules of the same dashboard together:
+    matchers: dict[str, list[typing.Callable[[str, str], bool]]] = {}
+    # dashboard id -> why its monitors can't be trusted to be complete, so none are removed:
+    keep: dict[str, str] = {}
+    problems = []
+    for rule in rules:
+        if not (dashboard := by_id.get(rule.dashboard) or by_name.get(rule.dashboard.lower())):
+            problems.append(f"unknown dashboard {rule.dashboard!r}, create it first")
+            continue
+        matchers.setdefault(str(dashboard["id"]), []).append(rule.matcher())
+        if rule.unresolved:
+            keep.setdefault(str(dashboard["id"]), f"no hosts found for compose {', '.join(rule.unresolved)}")
+        elif not (rule.urls or rule.names or rule.hosts):
+            keep.setdefault(str(dashboard["id"]), "a rule has no patterns")
+
+    changes = []
+    for dashboard_id, tests in matchers.items():
+        dashboard = by_id[dashboard_id]
+        wanted = [
+            monitor_id
+            for monitor_id, url, name in zip(monitors.ids, monitors.urls, monitors.names)
+            if any(test(url, name) for test in tests)
+        ]
+        current = {int(_) for _ in dashboard.get("monitors") or []}
+
+        added = [_ for _ in wanted if _ not in current]
+        removed = sorted(current - set(wanted)) if exact else []
+        if removed and dashboard_id in keep:
+            problems.append(f"not removing monitors from dashboard {dashboard['friendly_name']}: {keep[dashboard_id]}")
+            removed = []
+        if added or removed:
+            changes.append(DashboardChange(dashboard, added, removed))
+
+    return changes, problems
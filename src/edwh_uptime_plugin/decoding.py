@@ -0,0 +1,87 @@
+"""
+Decode API response bodies, with msgspec when it is installed (`pip install edwh-uptime-plugin[fast]`)
+and the standard library's json otherwise.
+
+msgspec parses the bytes and checks the envelope (stat, error, pagination and the shape of the item lists)
+in one pass in C. The items themselves stay plain dicts with every field the API sent:
+decoding them into the UptimeRobotMonitor/... TypedDicts would drop the fields those don't list.
+"""
+
+import json
+import typing
+
+if typing.TYPE_CHECKING:
+    from .uptimerobot import UptimeRobotResponse
+
+AnyDict: typing.TypeAlias = dict[str, typing.Any]
+
+
+class Pagination(typing.TypedDict, total=False):
+    offset: int
+    limit: int
+    total: int
+
+
+class Envelope(typing.TypedDict, total=False):
+    """
+    Every key `UptimeRobot` reads from a response.
+    """
+
+    stat: str
+    error: AnyDict
+    pagination: Pagination
+    account: AnyDict
+    monitor: AnyDict
+    monitors: list[AnyDict]
+    psp: AnyDict
+    psps: list[AnyDict]
+    mwindow: AnyDict
+    mwindows: list[AnyDict]
+
+
+class DecodeError(ValueError):
+    """
+    The body is not valid JSON, or not shaped like an API response.
+    """
+
+
+_decode: typing.Callable[[bytes], typing.Any] | None = None
+
+
+def msgspec_decoder() -> typing.Callable[[bytes], typing.Any] | None:
+    """
+    msgspec's decoder for the Envelope, or None if msgspec isn't installed.
+    """
+    try:
+        import msgspec
+    except ImportError:
+        return None
+
+    # strict=False: accept e.g. numbers sent as strings, like json + the TypedDicts would
+    return msgspec.json.Decoder(Envelope, strict=False).decode
+
+
+def backend() -> str:
+    return "json" if decoder() is json.loads else "msgspec"
+
+
+def decoder() -> typing.Callable[[bytes], typing.Any]:
+    global _decode
+    if _decode is None:
+        _decode = msgspec_decoder() or json.loads
+    return _decode
+
+
+def decode_response(content: bytes) -> "UptimeRobotResponse":
+    """
+    :raise DecodeError: if `content` isn't a JSON object (with the expected types, when using msgspec)
+    """
+    try:
+        data = decoder()(content)
+    except ValueError as e:  # json.JSONDecodeError and msgspec.DecodeError both are
+        raise DecodeError(str(e)) from e
+
+    if not isinstance(data, dict):
+        raise DecodeError(f"Expected a JSON object, got {type(data).__name__}")
+
+    return typing.cast("UptimeRobotResponse", data)
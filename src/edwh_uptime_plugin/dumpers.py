@@ -1,9 +1,8 @@
 import json
+import sys
 import typing
 from collections import defaultdict
 
-import tomli_w
-import yaml
 from typing_extensions import Never
 
 
@@ -23,24 +22,61 @@ dumpers["json"] = lambda data, *a, **kw: print(
         **kw,
     )
 )
-dumpers["yaml"] = dumpers["yml"] = lambda data, *a, **kw: print(
-    yaml.dump(
-        data,
-        *a,
-        indent=2,
-        **kw,
+
+
+# yaml and tomli_w are only imported when those formats are actually used:
+def dump_yaml(data: typing.Any, *a: typing.Any, **kw: typing.Any) -> None:
+    import yaml
+
+    print(
+        yaml.dump(
+            data,
+            *a,
+            indent=2,
+            **kw,
+        )
     )
-)
 
-dumpers["toml"] = lambda data, *a, **kw: print(
-    tomli_w.dumps(
-        data,
-        *a,
-        **kw,
+
+def dump_toml(data: typing.Any, *a: typing.Any, **kw: typing.Any) -> None:
+    import tomli_w
+
+    print(
+        tomli_w.dumps(
+            data,
+            *a,
+            **kw,
+        )
     )
-)
 
-SUPPORTED_FORMATS = typing.Literal["plaintext", "text", "json", "yaml", "yml", "toml"]
+
+dumpers["yaml"] = dumpers["yml"] = dump_yaml
+dumpers["toml"] = dump_toml
+
+
+def dump_lines(records: typing.Iterable[typing.Any], file: typing.TextIO = None) -> None:
+    """
+    Newline-delimited JSON: one compact record per line, written (and flushed) as soon as it is available,
+    so long (paginated) listings can be piped into e.g. `jq` while they are still being fetched.
+    """
+    file = file or sys.stdout
+    for record in records:
+        file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        file.flush()
+
+
+def dump_ndjson(data: typing.Any) -> None:
+    # {"monitors": [...]} -> one line per monitor; anything else is a single line:
+    if isinstance(data, dict) and len(data) == 1 and isinstance(items := next(iter(data.values())), list):
+        dump_lines(items)
+    else:
+        dump_lines([data])
+
+
+dumpers["ndjson"] = dumpers["jsonl"] = dump_ndjson
+
+SUPPORTED_FORMATS = typing.Literal["plaintext", "text", "json", "yaml", "yml", "toml", "ndjson", "jsonl"]
+STREAMING_FORMATS = ("ndjson", "jsonl")
 
 DEFAULT_PLAINTEXT: SUPPORTED_FORMATS = "text"
 DEFAULT_STRUCTURED: SUPPORTED_FORMATS = "json"
@@ -0,0 +1,280 @@
+"""
+Serve monitor metrics in the Prometheus text format, for any number of scrapers, at the cost of one poller.
+
+A single background thread polls the API (all monitors with their latest response time, and the dashboards)
+and renders the metrics once per poll. Every scrape of /metrics is answered from that snapshot in memory,
+so scraping never makes API calls, however many dashboards and alert rules read it.
+"""
+
+import math
+import threading
+import time
+import typing
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .uptimerobot import (
+    PAGE_SIZE,
+    MonitorType,
+    UptimeRobot,
+    UptimeRobotDashboard,
+    UptimeRobotMonitor,
+)
+
+if typing.TYPE_CHECKING:
+    from .accounts import Accounts
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_PORT = 9705
+DEFAULT_INTERVAL = 60.0  # seconds between polls
+
+
+def response_time(monitor: UptimeRobotMonitor) -> float | None:
+    """
+    Latest response time in seconds (the API reports milliseconds, newest first), or None if there is none.
+    """
+    if times := monitor.get("response_times"):
+        return float(times[0]["value"]) / 1000
+    if average := monitor.get("average_response_time"):
+        return float(average) / 1000
+    return None
+
+
+# name, help text, value per monitor (None: leave the monitor out)
+MONITOR_METRICS: list[tuple[str, str, typing.Callable[[UptimeRobotMonitor], float | None]]] = [
+    (
+        "uptimerobot_monitor_status",
+        "Status of the monitor: 0 paused, 1 not checked yet, 2 up, 8 seems down, 9 down.",
+        lambda monitor: monitor.get("status"),
+    ),
+    (
+        "uptimerobot_monitor_type",
+        "Type of the monitor: 1 HTTP(s), 2 keyword, 3 ping, 4 port, 5 heartbeat.",
+        lambda monitor: monitor.get("type"),
+    ),
+    (
+        "uptimerobot_monitor_interval_seconds",
+        "Seconds between the checks of the monitor.",
+        lambda monitor: monitor.get("interval"),
+    ),
+    (
+        "uptimerobot_monitor_response_time_seconds",
+        "Latest response time of the monitor.",
+        response_time,
+    ),
+]
+
+
+def escape(value: typing.Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def labels(monitor: UptimeRobotMonitor, dashboard: str) -> str:
+    pairs = {
+        "id": monitor["id"],
+        "name": monitor.get("friendly_name", ""),
+        "url": monitor.get("url", ""),
+        "type": type_name(monitor.get("type")),
+        "dashboard": dashboard,
+    }
+    if "account" in monitor:
+        pairs["account"] = monitor["account"]
+    return ",".join(f'{key}="{escape(value)}"' for key, value in pairs.items())
+
+
+def type_name(value: int | None) -> str:
+    try:
+        return MonitorType(value).name.lower()
+    except ValueError:
+        return str(value or "")
+
+
+def render_metrics(
+    monitors: typing.Iterable[UptimeRobotMonitor], dashboards: typing.Iterable[UptimeRobotDashboard]
+) -> str:
+    """
+    Monitor metrics with one series per monitor and dashboard it is on (dashboard="" for monitors on none).
+    """
+    on_dashboards: dict[tuple[str, int], list[str]] = {}  # (account, monitor id) -> dashboard names
+    for dashboard in dashboards:
+        for monitor_id in dashboard.get("monitors") or []:
+            key = (dashboard.get("account", ""), int(monitor_id))
+            on_dashboards.setdefault(key, []).append(dashboard["friendly_name"])
+
+    rows = [
+        (monitor, labels(monitor, dashboard))
+        for monitor in monitors
+        for dashboard in on_dashboards.get((monitor.get("account", ""), int(monitor["id"])), [""])
+    ]
+
+    lines = []
+    for name, description, value_of in MONITOR_METRICS:
+        lines += [f"# HELP {name} {description}", f"# TYPE {name} gauge"]
+        for monitor, label_set in rows:
+            if (value := value_of(monitor)) is not None:
+                lines.append(f"{name}{{{label_set}}} {float(value):g}")
+
+    return "\n".join(lines) + "\n"
+
+
+class MetricsPoller:
+    """
+    Keeps an up-to-date rendering of the metrics in memory, refreshed by one background thread.
+    """
+
+    def __init__(
+        self,
+        client: typing.Union[UptimeRobot, "Accounts"],
+        interval: float = DEFAULT_INTERVAL,
+        on_poll: typing.Callable[[list[UptimeRobotMonitor]], None] = None,
+    ):
+        """
+        :param on_poll: called with all monitors after every poll (e.g. to record them)
+        """
+        self.client = client
+        self.interval = interval
+        self._on_poll = on_poll
+
+        self._lock = threading.Lock()
+        self._body = ""
+        self._monitors: Counter[str] = Counter()  # per account ('' for a single one)
+        self.polls = 0
+        self.errors = 0
+        self.last_success = 0.0
+        self.last_duration = 0.0
+
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def poll(self) -> None:
+        started = time.monotonic()
+
+        # never answer from the local cache (or the memo of an earlier poll):
+        self.client.invalidate_cache("monitors", "psps")
+        monitors = list(self.client.iter_monitors(response_times=1, response_times_limit=1))
+        dashboards = self.client.get_psps()
+        body = render_metrics(monitors, dashboards)
+
+        with self._lock:
+            self._body = body
+            self._monitors = Counter(_.get("account", "") for _ in monitors)
+            self.polls += 1
+            self.last_success = time.time()
+            self.last_duration = time.monotonic() - started
+
+        if self._on_poll:
+            self._on_poll(monitors)
+
+    def min_interval(self) -> float:
+        """
+        Seconds one poll (all pages of monitors + the dashboards) costs from the rate limit budget;
+        with several accounts, of the account that needs the longest.
+        """
+        clients: dict[str, UptimeRobot] = getattr(self.client, "clients", None) or {"": self.client}
+
+        seconds = 0.0
+        for account, client in clients.items():
+            if not (limiter := client.rate_limiter) or not limiter.per_minute:
+                continue
+
+            requests = max(1, math.ceil(self._monitors[account] / PAGE_SIZE)) + 1
+            seconds = max(seconds, requests * 60 / limiter.per_minute)
+        return seconds
+
+    def next_interval(self) -> float:
+        return max(self.interval, self.min_interval())
+
+    def metrics(self) -> str:
+        """
+        The last snapshot, plus the state of the poller itself.
+        """
+        with self._lock:
+            body = self._body
+            exporter = [
+                "# HELP uptimerobot_exporter_polls_total Successful polls of the API.",
+                "# TYPE uptimerobot_exporter_polls_total counter",
+                f"uptimerobot_exporter_polls_total {self.polls}",
+                "# HELP uptimerobot_exporter_poll_errors_total Polls of the API that failed.",
+                "# TYPE uptimerobot_exporter_poll_errors_total counter",
+                f"uptimerobot_exporter_poll_errors_total {self.errors}",
+                "# HELP uptimerobot_exporter_last_poll_timestamp_seconds When the metrics were last refreshed.",
+                "# TYPE uptimerobot_exporter_last_poll_timestamp_seconds gauge",
+                f"uptimerobot_exporter_last_poll_timestamp_seconds {self.last_success:.3f}",
+                "# HELP uptimerobot_exporter_last_poll_duration_seconds How long the last poll took.",
+                "# TYPE uptimerobot_exporter_last_poll_duration_seconds gauge",
+                f"uptimerobot_exporter_last_poll_duration_seconds {self.last_duration:.3f}",
+            ]
+        return body + "\n".join(exporter) + "\n"
+
+    def run(self, polls: int = None, on_error: typing.Callable[[Exception], None] = None) -> None:
+        """
+        Keep refreshing until stop() (or after `polls` more polls, failed ones included).
+        Waits an interval before every poll, so call poll() first for metrics right away.
+        A failing poll keeps the previous snapshot.
+        """
+        attempts = 0
+        while (polls is None or attempts < polls) and not self._stop.wait(self.next_interval()):
+            try:
+                self.poll()
+            except Exception as e:
+                with self._lock:
+                    self.errors += 1
+                if on_error:
+                    on_error(e)
+            attempts += 1
+
+    def start(
+        self,
+        polls: int = None,
+        on_error: typing.Callable[[Exception], None] = None,
+        on_done: typing.Callable[[], None] = None,
+    ) -> threading.Thread:
+        def target() -> None:
+            self.run(polls, on_error)
+            if on_done:
+                on_done()
+
+        self._thread = threading.Thread(target=target, daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    server: "MetricsServer"
+
+    def do_GET(self) -> None:
+        match self.path.split("?")[0]:
+            case "/metrics":
+                status, content_type, body = 200, CONTENT_TYPE, self.server.poller.metrics()
+            case "/":
+                status, content_type, body = 200, "text/html", '<a href="/metrics">Metrics</a>\n'
+            case _:
+                status, content_type, body = 404, "text/plain", "Not found\n"
+
+        data = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *_: typing.Any) -> None:
+        pass  # scrapes every few seconds would flood the terminal
+
+
+class MetricsServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, poller: MetricsPoller, host: str = "127.0.0.1", port: int = DEFAULT_PORT):
+        super().__init__((host, port), MetricsHandler)
+        self.poller = poller
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/metrics"
@@ -1,6 +1,7 @@
 import typing
 
 T = typing.TypeVar("T")
+R = typing.TypeVar("R")
 
 
 def first(somedict: dict[typing.Hashable, T]) -> T:
@@ -8,3 +9,38 @@ def first(somedict: dict[typing.Hashable, T]) -> T:
     Get the first key of a dictionary.
     """
     return next(iter(somedict))
+
+
+def run_parallel(
+    func: typing.Callable[[T], R],
+    items: typing.Iterable[T],
+    workers: int = 8,
+    progress: typing.Callable[[int, int, T, R | Exception], None] = None,
+) -> list[tuple[T, R | Exception]]:
+    """
+    Call `func` for every item in a bounded thread pool.
+
+    Exceptions are returned instead of raised, so one failing item doesn't abort the others.
+    `progress(done, total, item, result)` is called from the calling thread whenever an item finishes.
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    items = list(items)
+    results: list[tuple[T, R | Exception]] = []
+    if not items:
+        return results
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(items)))) as pool:
+        futures = {pool.submit(func, item): item for item in items}
+        for done, future in enumerate(as_completed(futures), 1):
+            item = futures[future]
+            try:
+                result: R | Exception = future.result()
+            except Exception as e:
+                result = e
+
+            results.append((item, result))
+            if progress:
+                progress(done, len(items), item, result)
+
+    return results
@@ -0,0 +1,228 @@
+"""
+Local, append-only history of monitor statuses, so past incidents can be looked up without the API.
+
+Samples are fixed-width records of three native uint32 values (timestamp, monitor id, status),
+appended to one binary file in time order. A sample is only written when a monitor's status changed,
+or when its last sample is older than `heartbeat` (so gaps in polling stay visible).
+Monitor urls and names are kept in a small JSON file next to it.
+
+Appends hold an exclusive lock on the file, so concurrent processes (e.g. cron and a `watch`) keep it sorted,
+and reads only go back from the end of the file as far as they need.
+"""
+
+import bisect
+import contextlib
+import json
+import os
+import time
+import typing
+from array import array
+from pathlib import Path
+
+HEADER = b"EDWHUPTIME\x01\x00"  # 12 bytes: keeps the records after it aligned
+FIELDS = 3  # timestamp, monitor id, status
+RECORD_SIZE = FIELDS * array("I").itemsize
+DEFAULT_HEARTBEAT = 3600  # seconds
+DOWN_STATUSES = (8, 9)
+TAIL_CHUNK = 64 * 1024  # bytes read at once when going back from the end, doubled every step
+
+
+@contextlib.contextmanager
+def locked(f: typing.BinaryIO) -> typing.Iterator[None]:
+    """
+    Exclusive lock on an open file for the duration of the block (no-op where fcntl isn't available).
+    """
+    try:
+        import fcntl
+    except ImportError:  # pragma: no cover
+        yield
+        return
+
+    fcntl.flock(f, fcntl.LOCK_EX)
+    try:
+        yield
+    finally:
+        fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def default_history_path() -> Path:
+    data_home = os.environ.get("XDG_DATA_HOME") or Path.home() / ".local" / "share"
+    return Path(data_home) / "edwh-uptime" / "history.bin"
+
+
+class Period(typing.NamedTuple):
+    monitor_id: int
+    status: int
+    start: int
+    end: int | None  # None: still ongoing at the last sample
+
+
+class HistoryStore:
+    def __init__(self, path: Path | str = None, heartbeat: int = DEFAULT_HEARTBEAT):
+        self.path = Path(path) if path else default_history_path()
+        self.names_path = self.path.with_suffix(".json")
+        self.heartbeat = heartbeat
+        self._last: dict[int, tuple[int, int]] | None = None  # monitor id -> (timestamp, status) of its last sample
+        self._size = 0  # of the file after our last append, to notice appends by other processes
+
+    def _read(self, since: float = 0) -> array:
+        """
+        The samples from `since` on (and possibly a few before) as one flat array: [timestamp, monitor_id, status, ...].
+        """
+        if not self.path.exists():
+            return array("I")
+
+        with self.path.open("rb") as f:
+            return self._read_tail(f, since)
+
+    def _read_tail(self, f: typing.BinaryIO, since: float) -> array:
+        """
+        Read chunks backwards from the end of the file until one starts before `since`,
+        so recent samples are found without reading the whole history.
+        """
+        records = array("I")
+        if not (size := f.seek(0, os.SEEK_END)):
+            return records
+
+        f.seek(0)
+        if f.read(len(HEADER)) != HEADER:
+            raise ValueError(f"{self.path} is not an uptime history file")
+
+        end = (size - len(HEADER)) // RECORD_SIZE  # ignore a half-written trailing record
+        chunk = TAIL_CHUNK // RECORD_SIZE
+        chunks = []
+        while end > 0:
+            start = max(0, end - chunk)
+            f.seek(len(HEADER) + start * RECORD_SIZE)
+            (block := array("I")).frombytes(f.read((end - start) * RECORD_SIZE))
+            chunks.append(block)
+            if block[0] < since:
+                break
+            end, chunk = start, chunk * 2
+
+        for block in reversed(chunks):
+            records.extend(block)
+        return records
+
+    @staticmethod
+    def _window(records: array, since: float, until: float | None = None) -> tuple[array, array, array]:
+        """
+        Timestamps, monitor ids and statuses of the samples in [since, until], found by bisecting the time column.
+        """
+        timestamps = records[0::FIELDS]
+        start = bisect.bisect_left(timestamps, since)
+        end = len(timestamps) if until is None else bisect.bisect_right(timestamps, until)
+        offset = slice(start * FIELDS, end * FIELDS)
+        window = records[offset]
+        return window[0::FIELDS], window[1::FIELDS], window[2::FIELDS]
+
+    def __len__(self) -> int:
+        return max(0, (self.path.stat().st_size - len(HEADER)) // RECORD_SIZE) if self.path.exists() else 0
+
+    def names(self) -> dict[int, dict[str, str]]:
+        if not self.names_path.exists():
+            return {}
+        return {int(key): value for key, value in json.loads(self.names_path.read_text()).items()}
+
+    def _last_samples(self, f: typing.BinaryIO, now: int) -> dict[int, tuple[int, int]]:
+        # thanks to the heartbeat, only the tail of the file can hold a monitor's latest sample:
+        timestamps, ids, statuses = self._window(self._read_tail(f, now - self.heartbeat), now - self.heartbeat)
+        return {monitor_id: (timestamp, status) for timestamp, monitor_id, status in zip(timestamps, ids, statuses)}
+
+    def append(self, monitors: typing.Iterable[dict[str, typing.Any]], now: float = None) -> int:
+        """
+        Record the statuses of a poll. Returns the amount of samples written.
+        """
+        now = int(now if now is not None else time.time())
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a+b") as f, locked(f):
+            size = f.seek(0, os.SEEK_END)
+            if self._last is None or size != self._size:
+                # first append, or another process appended since:
+                self._last = self._last_samples(f, now)
+                if partial := (size - len(HEADER)) % RECORD_SIZE if size else 0:
+                    size -= partial  # an interrupted write, which would shift every record after it
+                    f.truncate(size)
+
+            last = self._last
+            if last:
+                now = max(now, max(timestamp for timestamp, _ in last.values()))  # keep the file sorted by time
+
+            records = array("I")
+            names = {}
+            for monitor in monitors:
+                monitor_id, status = int(monitor["id"]), int(monitor["status"])
+                previous = last.get(monitor_id)
+                if previous is None:
+                    names[monitor_id] = {
+                        "url": monitor.get("url", ""),
+                        "friendly_name": monitor.get("friendly_name", ""),
+                    }
+                if previous is None or previous[1] != status or now - previous[0] >= self.heartbeat:
+                    records.extend((now, monitor_id, status))
+                    last[monitor_id] = (now, status)
+
+            if records:
+                if not size:
+                    f.write(HEADER)
+                f.write(records.tobytes())
+            self._size = f.seek(0, os.SEEK_END)
+
+            if names and (known := self.names()).keys() | names.keys() != known.keys():
+                self.names_path.write_text(json.dumps({**known, **names}))
+
+        return len(records) // FIELDS
+
+    def periods(
+        self,
+        since: float,
+        until: float = None,
+        monitor_ids: typing.Iterable[int] = (),
+        statuses: typing.Collection[int] = DOWN_STATUSES,
+    ) -> list[Period]:
+        """
+        When (between since and until) were monitors in one of `statuses`?
+        """
+        # start one heartbeat earlier, to know the state monitors were in at `since`:
+        timestamps, ids, codes = self._window(self._read(since - self.heartbeat), since - self.heartbeat, until)
+
+        if wanted := {int(_) for _ in monitor_ids}:
+            indices: typing.Iterable[int] = [idx for idx, monitor_id in enumerate(ids) if monitor_id in wanted]
+        else:
+            indices = range(len(ids))
+
+        periods = []
+        current: dict[int, tuple[int, int]] = {}  # monitor id -> (status, since when)
+        for idx in indices:
+            monitor_id, status, timestamp = ids[idx], codes[idx], timestamps[idx]
+            previous = current.get(monitor_id)
+            if previous and previous[0] == status:
+                continue  # heartbeat
+            if previous and previous[0] in statuses and timestamp >= since:
+                periods.append(Period(monitor_id, previous[0], max(previous[1], int(since)), timestamp))
+            current[monitor_id] = (status, timestamp)
+
+        periods.extend(
+            Period(monitor_id, status, max(start, int(since)), None)
+            for monitor_id, (status, start) in current.items()
+            if status in statuses
+        )
+        return sorted(periods, key=lambda _: (_.start, _.monitor_id))
+
+    def flapping(self, since: float, until: float = None, min_changes: int = 2) -> dict[int, int]:
+        """
+        Monitors that changed status at least `min_changes` times between since and until, most changes first.
+        """
+        timestamps, ids, codes = self._window(self._read(since - self.heartbeat), since - self.heartbeat, until)
+
+        last: dict[int, int] = {}
+        changes: dict[int, int] = {}
+        for timestamp, monitor_id, status in zip(timestamps, ids, codes):
+            previous = last.get(monitor_id)
+            if previous is not None and previous != status and timestamp >= since:
+                changes[monitor_id] = changes.get(monitor_id, 0) + 1
+            last[monitor_id] = status
+
+        flapped = {monitor_id: amount for monitor_id, amount in changes.items() if amount >= min_changes}
+        return dict(sorted(flapped.items(), key=lambda _: -_[1]))
@@ -0,0 +1,116 @@
+"""
+In-memory memo of read responses for the lifetime of one client (for the CLI: one command).
+
+Identical reads are answered from memory, concurrent identical reads share one request,
+and a complete listing (e.g. all maintenance windows) also answers later reads of a few of its items by id.
+Writes through the client drop the entities they affect (see cache.INVALIDATED_BY).
+"""
+
+import threading
+import typing
+
+T = typing.TypeVar("T")
+
+
+def copied(value: T) -> T:
+    """
+    Copy dicts and lists two levels deep (a response, its item lists and the items themselves),
+    so callers can change what they get without changing the memo.
+    """
+    if isinstance(value, dict):
+        return typing.cast(T, {key: copied(_) if isinstance(_, list) else _ for key, _ in value.items()})
+    if isinstance(value, list):
+        return typing.cast(T, [dict(_) if isinstance(_, dict) else _ for _ in value])
+    return value
+
+
+class _InFlight:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: typing.Any = None
+        self.error: BaseException | None = None
+
+
+class RequestMemo:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._responses: dict[str, dict[str, typing.Any]] = {}  # entity -> request key -> response
+        self._listings: dict[str, dict[str, list[typing.Any]]] = {}  # entity -> listing key -> all items
+        self._in_flight: dict[str, _InFlight] = {}
+        # bumped on every invalidation, so a read that started before a write isn't stored after it:
+        self._generations: dict[str, int] = {}
+        self._epoch = 0  # same, for invalidating everything
+
+    def _generation(self, entity: str) -> tuple[int, int]:
+        return self._epoch, self._generations.get(entity, 0)
+
+    def generation(self, entity: str) -> tuple[int, int]:
+        with self._lock:
+            return self._generation(entity)
+
+    def fetch(self, entity: str, key: str, request: typing.Callable[[], T]) -> tuple[T, bool]:
+        """
+        The memoized response for `key`, or the result of `request()` (performed once, even when called concurrently).
+
+        :return: (response, whether it came from the memo or another thread's request)
+        """
+        with self._lock:
+            if key in (responses := self._responses.get(entity, {})):
+                return copied(responses[key]), True
+
+            flight = self._in_flight.get(key)
+            owner = flight is None
+            if owner:
+                flight = self._in_flight[key] = _InFlight()
+            generation = self._generation(entity)
+
+        if not owner:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return copied(flight.result), True
+
+        try:
+            flight.result = request()
+        except BaseException as e:
+            flight.error = e
+            raise
+        else:
+            with self._lock:
+                if self._generation(entity) == generation:
+                    self._responses.setdefault(entity, {})[key] = flight.result
+            return copied(flight.result), False
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            flight.done.set()
+
+    def listing(self, entity: str, key: str) -> list[typing.Any] | None:
+        with self._lock:
+            items = self._listings.get(entity, {}).get(key)
+        return copied(items) if items is not None else None
+
+    def store_listing(self, entity: str, key: str, items: list[typing.Any], generation: tuple[int, int]) -> None:
+        """
+        :param items: kept as-is, so the caller shouldn't hand out or change them afterwards
+        :param generation: generation(entity) from before the first page was requested
+        """
+        with self._lock:
+            if self._generation(entity) == generation:
+                self._listings.setdefault(entity, {})[key] = items
+
+    def invalidate(self, *entities: str) -> None:
+        """
+        Forget the given entities (everything if none are given).
+        """
+        with self._lock:
+            if not entities:
+                self._responses.clear()
+                self._listings.clear()
+                self._epoch += 1
+                return
+
+            for entity in entities:
+                self._responses.pop(entity, None)
+                self._listings.pop(entity, None)
+                self._generations[entity] = self._generations.get(entity, 0) + 1
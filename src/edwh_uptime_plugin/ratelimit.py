@@ -0,0 +1,151 @@
+"""
+Client-side pacing of API requests, so bulk operations stay within the UptimeRobot rate limits.
+
+See https://uptimerobot.com/api/#rate-limits:
+- free plan: 10 requests/minute
+- pro plan: 2x the monitor limit requests/minute, with a maximum of 5000
+"""
+
+import threading
+import time
+import typing
+
+PLAN_RATE_LIMITS: dict[str, int] = {
+    "free": 10,
+    "pro": 5000,  # upper bound; the real limit is picked up from the X-RateLimit-Limit response header
+}
+
+
+def plan_rate_limit(plan: str | int, monitor_limit: int = 0) -> int:
+    """
+    Requests/minute for a plan name (or an explicit number of requests/minute).
+
+    :param plan: 'free', 'pro' or an amount of requests per minute
+    :param monitor_limit: for the pro plan, the budget scales with the amount of monitors you may create
+    """
+    if isinstance(plan, int) or str(plan).isdigit():
+        return int(plan)
+
+    plan = plan.lower()
+    if plan not in PLAN_RATE_LIMITS:
+        raise ValueError(f"Unknown plan {plan}, choose from {', '.join(PLAN_RATE_LIMITS)} or a number.")
+
+    if plan == "pro" and monitor_limit:
+        return min(monitor_limit * 2, PLAN_RATE_LIMITS["pro"])
+
+    return PLAN_RATE_LIMITS[plan]
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    Retry-After is either an amount of seconds or an HTTP date.
+    """
+    if not value:
+        return None
+
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    import email.utils  # rarely needed, and relatively slow to import
+
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    return max(0.0, when.timestamp() - time.time())
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket with a budget of `per_minute` requests.
+
+    Callers reserve a token and sleep until it becomes available,
+    so concurrent callers are queued behind each other instead of all firing at once.
+    """
+
+    def __init__(
+        self,
+        per_minute: int,
+        clock: typing.Callable[[], float] = time.monotonic,
+        sleep: typing.Callable[[float], typing.Any] = time.sleep,
+    ):
+        self._lock = threading.Lock()
+        self._clock = clock
+        self._sleep = sleep
+
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.updated = clock()
+        self.blocked_until = 0.0
+
+    @property
+    def per_minute(self) -> int:
+        return int(self.capacity)
+
+    @property
+    def rate(self) -> float:
+        """
+        Tokens per second.
+        """
+        return self.capacity / 60
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self) -> float:
+        """
+        Take a token and return how many seconds to wait before it may be used.
+        """
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self.tokens -= 1
+
+            return max(0.0, -self.tokens / self.rate, self.blocked_until - now)
+
+    def acquire(self) -> float:
+        """
+        Block until a request may be sent. Returns the time waited.
+        """
+        if wait := self.reserve():
+            self._sleep(wait)
+        return wait
+
+    def set_limit(self, per_minute: int) -> None:
+        """
+        Change the budget, e.g. when the API reports a different limit than expected.
+        """
+        if per_minute <= 0 or per_minute == self.capacity:
+            return
+
+        with self._lock:
+            self._refill(self._clock())
+            # a bigger budget also means more room in the current window (X-RateLimit-Remaining narrows it down):
+            self.tokens = min(self.tokens + per_minute - self.capacity, float(per_minute))
+            self.capacity = float(per_minute)
+
+    def sync(self, remaining: int, reset_in: float | None = None) -> None:
+        """
+        Align the bucket with what the API says is left of the current window.
+        """
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self.tokens = min(self.tokens, float(remaining))
+            if remaining <= 0 and reset_in:
+                self.blocked_until = max(self.blocked_until, now + reset_in)
+
+    def pause(self, seconds: float) -> None:
+        """
+        Hold every request (from all threads) for `seconds`, e.g. after a 429 with Retry-After.
+        """
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self.tokens = min(self.tokens, 0.0)
+            self.blocked_until = max(self.blocked_until, now + seconds)
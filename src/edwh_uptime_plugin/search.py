@@ -0,0 +1,134 @@
+"""
+In-process search index over monitors, so lookups by URL or label don't need an API round trip.
+"""
+
+import bisect
+import difflib
+import itertools
+import typing
+from collections import defaultdict
+
+from .table import MonitorTable
+from .uptimerobot import UptimeRobotMonitor
+
+
+def split_url(url: str) -> tuple[str, str]:
+    """
+    'https://www.example.com/some/path' -> ('www.example.com', '/some/path')
+    """
+    _, _, rest = url.lower().partition("://")
+    host, slash, path = rest.partition("/")
+    return host, slash + path
+
+
+def trigrams(text: str) -> set[str]:
+    return {text[idx : idx + 3] for idx in range(len(text) - 2)}
+
+
+class MonitorIndex:
+    """
+    Prefix, substring and fuzzy lookup over the host, path and friendly_name of monitors.
+
+    Substring search matches the URL or the label (like the API's `search` parameter does),
+    exact and prefix matches on host or label are ranked first.
+    """
+
+    def __init__(self, monitors: typing.Iterable[UptimeRobotMonitor] = ()):
+        self.monitors = MonitorTable()
+        self._haystacks: list[str] = []
+        self._names: list[tuple[str, ...]] = []  # (host, host without www., label) per monitor
+        self._trigrams: dict[str, set[int]] = defaultdict(set)
+        self._sorted_names: list[tuple[str, int]] = []
+        self._needs_sort = False
+
+        for monitor in monitors:
+            self.add(monitor)
+
+    def __len__(self) -> int:
+        return len(self.monitors)
+
+    def add(self, monitor: UptimeRobotMonitor) -> None:
+        position = len(self.monitors)
+        url = monitor.get("url", "").lower()
+        label = monitor.get("friendly_name", "").lower()
+        host, _path = split_url(url)
+
+        haystack = f"{url}\n{label}"
+        names = tuple(dict.fromkeys(_ for _ in (host, host.removeprefix("www."), label) if _))
+
+        self.monitors.append(monitor)
+        self._haystacks.append(haystack)
+        self._names.append(names)
+        for trigram in trigrams(haystack):
+            self._trigrams[trigram].add(position)
+        self._sorted_names.extend((name, position) for name in names)
+        self._needs_sort = True
+
+    @property
+    def sorted_names(self) -> list[tuple[str, int]]:
+        # sort once after (bulk) adding instead of on every insert:
+        if self._needs_sort:
+            self._sorted_names.sort()
+            self._needs_sort = False
+        return self._sorted_names
+
+    def _rank(self, position: int, term: str) -> int:
+        names = self._names[position]
+        if term in names:
+            return 0
+        if any(_.startswith(term) for _ in names):
+            return 1
+        return 2
+
+    def search(self, term: str) -> list[UptimeRobotMonitor]:
+        """
+        Monitors whose URL or label contains `term` (case-insensitive), best matches first.
+        """
+        term = term.lower().strip()
+        if not term:
+            return list(self.monitors)
+
+        if len(term) >= 3:
+            # only verify the monitors that share every trigram with the term, rarest trigrams first:
+            postings = sorted((self._trigrams.get(_, set()) for _ in trigrams(term)), key=len)
+            candidates = set(postings[0])
+            for posting in postings[1:]:
+                if not candidates:
+                    break
+                candidates &= posting
+        else:
+            candidates = set(range(len(self.monitors)))
+
+        matches = [_ for _ in candidates if term in self._haystacks[_]]
+        matches.sort(key=lambda position: (self._rank(position, term), position))
+        return [self.monitors[_] for _ in matches]
+
+    def prefix(self, term: str) -> list[UptimeRobotMonitor]:
+        """
+        Monitors whose host (with or without 'www.') or label starts with `term`.
+        """
+        term = term.lower().strip()
+        start = bisect.bisect_left(self.sorted_names, (term, -1))
+
+        positions: dict[int, None] = {}
+        for name, position in itertools.islice(self.sorted_names, start, None):
+            if not name.startswith(term):
+                break
+            positions[position] = None
+
+        return [self.monitors[_] for _ in sorted(positions)]
+
+    def fuzzy(self, term: str, limit: int = 5, cutoff: float = 0.6) -> list[UptimeRobotMonitor]:
+        """
+        Monitors with a host or label that looks like `term`, e.g. for typos.
+        """
+        term = term.lower().strip()
+        names: dict[str, list[int]] = defaultdict(list)
+        for name, position in self.sorted_names:
+            names[name].append(position)
+
+        positions: dict[int, None] = {}
+        for name in difflib.get_close_matches(term, names, n=limit, cutoff=cutoff):
+            positions.update(dict.fromkeys(names[name]))
+
+        return [self.monitors[_] for _ in positions]
@@ -0,0 +1,223 @@
+"""
+SLA figures per monitor and per dashboard: uptime, incidents, downtime, MTTR and response times.
+
+The raw data (response time samples and down logs of every monitor) is flattened into columns first,
+then aggregated per group in one pass: vectorized with NumPy when it is installed
+(`pip install edwh-uptime-plugin[sla]`), with plain Python otherwise.
+"""
+
+import math
+import typing
+from array import array
+from dataclasses import dataclass, field
+
+from .uptimerobot import UptimeRobotDashboard, UptimeRobotMonitor
+
+LOG_DOWN = 1  # log type for 'down' events; 2 is 'up', 98 'started', 99 'paused'
+PERCENTILE = 95
+MAX_RESPONSE_TIME_DAYS = 7  # the API doesn't return response times for longer ranges
+
+
+def numpy() -> typing.Any:
+    """
+    The numpy module, or None if it's not installed.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        return None
+    return np
+
+
+class GroupStats(typing.NamedTuple):
+    count: list[int]
+    total: list[float]
+    maximum: list[float | None]
+    percentile: list[float | None]
+
+
+def group_stats(groups: array, values: array, size: int, q: float = PERCENTILE) -> GroupStats:
+    """
+    Count, sum, max and q-th (nearest rank) percentile of `values` per group (0 <= group < size).
+    """
+    if (np := numpy()) is not None:
+        return _group_stats_numpy(np, groups, values, size, q)
+
+    buckets: list[list[float]] = [[] for _ in range(size)]
+    for group, value in zip(groups, values):
+        buckets[group].append(value)
+
+    stats = GroupStats([], [], [], [])
+    for bucket in buckets:
+        bucket.sort()
+        stats.count.append(len(bucket))
+        stats.total.append(math.fsum(bucket))
+        stats.maximum.append(bucket[-1] if bucket else None)
+        stats.percentile.append(bucket[max(math.ceil(q / 100 * len(bucket)) - 1, 0)] if bucket else None)
+    return stats
+
+
+def _group_stats_numpy(np: typing.Any, groups: array, values: array, size: int, q: float) -> GroupStats:
+    group = np.frombuffer(groups, dtype=np.uint32) if len(groups) else np.zeros(0, dtype=np.uint32)
+    value = np.frombuffer(values, dtype=np.float64) if len(values) else np.zeros(0)
+
+    count = np.bincount(group, minlength=size)
+    total = np.bincount(group, weights=value, minlength=size)
+
+    maximum = np.full(size, -np.inf)
+    np.maximum.at(maximum, group, value)
+
+    # sort by group, then value; the percentile of each group is then at a fixed offset from its start:
+    ordered = value[np.lexsort((value, group))]
+    starts = np.concatenate(([0], np.cumsum(count)[:-1]))
+    rank = np.maximum(np.ceil(q / 100 * count).astype(np.int64) - 1, 0)
+    percentile = ordered[np.minimum(starts + rank, max(len(ordered) - 1, 0))] if len(ordered) else np.zeros(size)
+
+    empty = count == 0
+    return GroupStats(
+        count.tolist(),
+        total.tolist(),
+        [None if _ else float(m) for _, m in zip(empty, maximum)],
+        [None if _ else float(p) for _, p in zip(empty, percentile)],
+    )
+
+
+def regroup(groups: array, values: array, members: list[list[int]]) -> tuple[array, array]:
+    """
+    Re-tag (group, value) pairs of monitors with the dashboard(s) each monitor is on.
+
+    :param members: dashboard positions per monitor position
+    """
+    if (np := numpy()) is not None and len(groups):
+        group = np.frombuffer(groups, dtype=np.uint32)
+        value = np.frombuffer(values, dtype=np.float64)
+        lengths = np.array([len(_) for _ in members], dtype=np.int64)
+        offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        flat = np.array([_ for dashboards in members for _ in dashboards], dtype=np.uint32)
+
+        repeats = lengths[group]
+        source = np.repeat(np.arange(len(group)), repeats)
+        nth = np.arange(len(source)) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+        return (
+            array("I", flat[offsets[group[source]] + nth].tobytes()),
+            array("d", value[source].tobytes()),
+        )
+
+    new_groups, new_values = array("I"), array("d")
+    for group, value in zip(groups, values):
+        for dashboard in members[group]:
+            new_groups.append(dashboard)
+            new_values.append(value)
+    return new_groups, new_values
+
+
+def parse_ratio(value: str | float | None) -> float | None:
+    """
+    custom_uptime_ratio is a '-'-separated string with one ratio per requested period.
+    """
+    if value in (None, ""):
+        return None
+    return float(str(value).split("-")[0])
+
+
+@dataclass
+class Columns:
+    """
+    Flat per-sample data of a list of monitors; `*_group` is the position of the monitor it belongs to.
+    """
+
+    uptime: array = field(default_factory=lambda: array("d"))  # one per monitor with a known ratio
+    uptime_group: array = field(default_factory=lambda: array("I"))
+    response_group: array = field(default_factory=lambda: array("I"))
+    response_ms: array = field(default_factory=lambda: array("d"))
+    down_group: array = field(default_factory=lambda: array("I"))
+    down_seconds: array = field(default_factory=lambda: array("d"))
+
+    @classmethod
+    def from_monitors(cls, monitors: list[UptimeRobotMonitor], since: float = 0) -> "Columns":
+        columns = cls()
+        for position, monitor in enumerate(monitors):
+            if (ratio := parse_ratio(monitor.get("custom_uptime_ratio"))) is not None:
+                columns.uptime.append(ratio)
+                columns.uptime_group.append(position)
+
+            times = [float(_["value"]) for _ in monitor.get("response_times") or []]
+            columns.response_ms.extend(times)
+            columns.response_group.extend([position] * len(times))
+
+            downs = [
+                float(_.get("duration", 0))
+                for _ in monitor.get("logs") or []
+                if _.get("type") == LOG_DOWN and _.get("datetime", 0) >= since
+            ]
+            columns.down_seconds.extend(downs)
+            columns.down_group.extend([position] * len(downs))
+        return columns
+
+
+def summarize(
+    uptime: GroupStats, responses: GroupStats, downs: GroupStats, position: int
+) -> dict[str, float | int | None]:
+    incidents = downs.count[position]
+    downtime = downs.total[position]
+    return {
+        "uptime": round(uptime.total[position] / uptime.count[position], 3) if uptime.count[position] else None,
+        "incidents": incidents,
+        "downtime": round(downtime),
+        "mttr": round(downtime / incidents) if incidents else None,
+        "response_avg": (
+            round(responses.total[position] / responses.count[position], 1) if responses.count[position] else None
+        ),
+        "response_p95": responses.percentile[position],
+        "response_max": responses.maximum[position],
+    }
+
+
+def sla_report(
+    monitors: list[UptimeRobotMonitor], dashboards: list[UptimeRobotDashboard] = (), since: float = 0
+) -> dict[str, list[dict[str, typing.Any]]]:
+    """
+    Per monitor and per dashboard (for the given monitors only) aggregates.
+
+    Uptime is the API's ratio (averaged over the monitors of a dashboard), MTTR the average duration of an incident,
+    downtime and MTTR are in seconds and response times in milliseconds.
+    """
+    columns = Columns.from_monitors(monitors, since)
+    size = len(monitors)
+
+    per_monitor = [
+        group_stats(columns.uptime_group, columns.uptime, size),
+        group_stats(columns.response_group, columns.response_ms, size),
+        group_stats(columns.down_group, columns.down_seconds, size),
+    ]
+    report_monitors = [
+        {"id": monitor["id"], "url": monitor.get("url", ""), "friendly_name": monitor.get("friendly_name", "")}
+        | summarize(*per_monitor, position)
+        for position, monitor in enumerate(monitors)
+    ]
+
+    positions = {int(_["id"]): position for position, _ in enumerate(monitors)}
+    dashboards = [_ for _ in dashboards if any(int(m) in positions for m in _.get("monitors") or [])]
+    members: list[list[int]] = [[] for _ in monitors]
+    for idx, dashboard in enumerate(dashboards):
+        for monitor_id in dashboard.get("monitors") or []:
+            if (position := positions.get(int(monitor_id))) is not None:
+                members[position].append(idx)
+
+    per_dashboard = [
+        group_stats(*regroup(columns.uptime_group, columns.uptime, members), len(dashboards)),
+        group_stats(*regroup(columns.response_group, columns.response_ms, members), len(dashboards)),
+        group_stats(*regroup(columns.down_group, columns.down_seconds, members), len(dashboards)),
+    ]
+    monitor_counts = [0] * len(dashboards)
+    for dashboard_positions in members:
+        for idx in dashboard_positions:
+            monitor_counts[idx] += 1
+
+    report_dashboards = [
+        {"id": dashboard["id"], "friendly_name": dashboard.get("friendly_name", ""), "monitors": monitor_counts[idx]}
+        | summarize(*per_dashboard, idx)
+        for idx, dashboard in enumerate(dashboards)
+    ]
+
+    return {"monitors": report_monitors, "dashboards": report_dashboards}
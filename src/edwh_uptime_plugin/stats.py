@@ -0,0 +1,120 @@
+"""
+Per-endpoint request statistics, to see how many API calls a task makes and where its time goes.
+"""
+
+import json
+import sys
+import threading
+import typing
+from dataclasses import asdict, dataclass, field
+
+# upper bounds (in ms) of the latency histogram buckets; the last bucket catches everything slower:
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+@dataclass
+class EndpointStats:
+    calls: int = 0  # HTTP requests actually sent, including retries
+    cached: int = 0  # answered from the local cache, no request sent
+    retries: int = 0
+    ratelimited: int = 0  # 429 responses
+    errors: int = 0  # other non-2xx responses
+    request_bytes: int = 0
+    response_bytes: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    histogram: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS_MS) + 1))
+
+    @property
+    def avg_ms(self) -> float:
+        return self.total_seconds / self.calls * 1000 if self.calls else 0.0
+
+    def add_latency(self, seconds: float) -> None:
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+        ms = seconds * 1000
+        bucket = next((idx for idx, bound in enumerate(LATENCY_BUCKETS_MS) if ms <= bound), len(LATENCY_BUCKETS_MS))
+        self.histogram[bucket] += 1
+
+
+class RequestStats:
+    """
+    Thread-safe collector, fed by UptimeRobot._post.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.endpoints: dict[str, EndpointStats] = {}
+
+    def _get(self, endpoint: str) -> EndpointStats:
+        if endpoint not in self.endpoints:
+            self.endpoints[endpoint] = EndpointStats()
+        return self.endpoints[endpoint]
+
+    def record(
+        self, endpoint: str, seconds: float, status_code: int, request_bytes: int = 0, response_bytes: int = 0
+    ) -> None:
+        with self._lock:
+            stats = self._get(endpoint)
+            stats.calls += 1
+            stats.request_bytes += request_bytes
+            stats.response_bytes += response_bytes
+            stats.add_latency(seconds)
+
+            if status_code == 429:
+                stats.ratelimited += 1
+            elif status_code >= 400:
+                stats.errors += 1
+
+    def record_retry(self, endpoint: str) -> None:
+        with self._lock:
+            self._get(endpoint).retries += 1
+
+    def record_cached(self, endpoint: str) -> None:
+        with self._lock:
+            self._get(endpoint).cached += 1
+
+    @property
+    def total_calls(self) -> int:
+        return sum(_.calls for _ in self.endpoints.values())
+
+    def as_dict(self) -> dict[str, typing.Any]:
+        with self._lock:
+            return {
+                "latency_buckets_ms": list(LATENCY_BUCKETS_MS),
+                "endpoints": {name: asdict(stats) for name, stats in sorted(self.endpoints.items())},
+            }
+
+    def table(self) -> str:
+        header = ("endpoint", "calls", "cached", "retries", "429s", "errors", "avg ms", "max ms", "sent", "received")
+        rows = [
+            (
+                name,
+                stats.calls,
+                stats.cached,
+                stats.retries,
+                stats.ratelimited,
+                stats.errors,
+                f"{stats.avg_ms:.1f}",
+                f"{stats.max_seconds * 1000:.1f}",
+                stats.request_bytes,
+                stats.response_bytes,
+            )
+            for name, stats in sorted(self.endpoints.items())
+        ]
+
+        widths = [max(len(str(row[idx])) for row in [header, *rows]) for idx in range(len(header))]
+        lines = ["  ".join(str(value).rjust(width) for value, width in zip(row, widths)) for row in [header, *rows]]
+        lines.insert(1, "  ".join("-" * width for width in widths))
+        return "\n".join(lines)
+
+    def report(self, target: str = "1") -> None:
+        """
+        :param target: '1'/'table' prints a summary table to stderr, anything ending in .json is a file to write to
+        """
+        if target.endswith(".json"):
+            with open(target, "w") as f:
+                json.dump(self.as_dict(), f, indent=2)
+        elif self.endpoints:
+            print(f"\n{self.table()}", file=sys.stderr)
@@ -0,0 +1,264 @@
+"""
+Reconcile the account with a desired-state file (TOML or YAML) using as few API requests as possible.
+
+    [[monitors]]
+    url = "https://example.com"
+    friendly_name = "example"     # optional, defaults to the domain
+    interval = 300                # any other editable monitor field
+    mwindows = ["weekly release"] # maintenance windows by name or id; omit to leave them alone
+
+    [[dashboards]]
+    friendly_name = "Production"  # existing dashboard, matched by name (or give its `id` to rename it)
+    monitors = ["https://example.com"]
+"""
+
+import sys
+import typing
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .helpers import run_parallel
+from .uptimerobot import (
+    AnyDict,
+    MonitorType,
+    UptimeRobot,
+    UptimeRobotDashboard,
+    UptimeRobotMaintenanceWindow,
+    UptimeRobotMonitor,
+)
+
+# keys of a desired monitor that are not sent to the API as-is:
+SPECIAL_MONITOR_KEYS = ("url", "type", "mwindows")
+
+
+class DesiredState(typing.TypedDict, total=False):
+    monitors: list[AnyDict]
+    dashboards: list[AnyDict]
+
+
+def load_desired_state(path: str | Path) -> DesiredState:
+    path = Path(path)
+    match path.suffix.lower():
+        case ".toml":
+            if sys.version_info >= (3, 11):
+                import tomllib
+            else:  # pragma: no cover
+                import tomli as tomllib
+
+            data = tomllib.loads(path.read_text())
+        case ".yaml" | ".yml":
+            import yaml
+
+            data = yaml.safe_load(path.read_text()) or {}
+        case _:
+            raise ValueError(f"Unsupported desired-state file {path.name}, use .toml or .yaml")
+
+    return typing.cast(DesiredState, data)
+
+
+def url_key(url: str) -> str:
+    """
+    Compare URLs regardless of scheme-less input, casing or a trailing slash.
+    """
+    if "://" not in url:
+        url = f"https://{url}"
+    return url.lower().rstrip("/")
+
+
+def monitor_type(value: str | int | None) -> int:
+    if value is None:
+        return MonitorType.HTTP.value
+    if isinstance(value, str) and not value.isdigit():
+        return MonitorType[value.upper()].value
+    return int(value)
+
+
+@dataclass
+class MonitorEdit:
+    monitor: UptimeRobotMonitor
+    changes: AnyDict  # only the fields that differ
+
+
+@dataclass
+class DashboardEdit:
+    dashboard: UptimeRobotDashboard
+    changes: AnyDict
+    monitors: list[str | int]  # url keys (or ids); monitors created by the same plan only get an id while applying
+
+
+@dataclass
+class SyncPlan:
+    create: list[AnyDict] = field(default_factory=list)
+    edit: list[MonitorEdit] = field(default_factory=list)
+    delete: list[UptimeRobotMonitor] = field(default_factory=list)
+    dashboards: list[DashboardEdit] = field(default_factory=list)
+    problems: list[str] = field(default_factory=list)
+    monitor_ids: dict[str, int] = field(default_factory=dict)  # url key -> id of existing monitors
+
+    def __len__(self) -> int:
+        return len(self.create) + len(self.edit) + len(self.delete) + len(self.dashboards)
+
+    def describe(self) -> list[str]:
+        lines = [f"+ create {_['url']} ({_['friendly_name']})" for _ in self.create]
+        for item in self.edit:
+            changes = ", ".join(f"{key}: {item.monitor.get(key)!r} -> {value!r}" for key, value in item.changes.items())
+            lines.append(f"~ edit {item.monitor['url']} ({changes})")
+        lines.extend(f"- delete {_['url']} ({_.get('friendly_name', '')})" for _ in self.delete)
+        for item in self.dashboards:
+            changes = [f"{key}: {item.dashboard.get(key)!r} -> {value!r}" for key, value in item.changes.items()]
+            if item.monitors is not None:
+                changes.append(f"{len(item.monitors)} monitors")
+            lines.append(f"~ dashboard {item.dashboard['friendly_name']} ({', '.join(changes)})")
+        return lines
+
+
+def _resolve_mwindows(
+    names: typing.Iterable[str | int], mwindows: list[UptimeRobotMaintenanceWindow], problems: list[str]
+) -> set[int]:
+    by_name = {str(_["friendly_name"]).lower(): int(_["id"]) for _ in mwindows}
+    by_id = {int(_["id"]) for _ in mwindows}
+
+    ids = set()
+    for name in names:
+        if str(name).isdigit() and int(name) in by_id:
+            ids.add(int(name))
+        elif (mwindow_id := by_name.get(str(name).lower())) is not None:
+            ids.add(mwindow_id)
+        else:
+            problems.append(f"unknown maintenance window {name!r}")
+    return ids
+
+
+def compute_plan(
+    desired: DesiredState,
+    monitors: typing.Iterable[UptimeRobotMonitor],
+    dashboards: list[UptimeRobotDashboard],
+    mwindows: list[UptimeRobotMaintenanceWindow],
+    prune: bool = False,
+    default_name: typing.Callable[[str], str] = lambda url: url.split("/")[2],
+) -> SyncPlan:
+    """
+    Diff the desired state against the current account (monitors fetched with their mwindows).
+
+    :param prune: also delete monitors that are not in the desired state
+    :param default_name: friendly_name for new monitors that don't specify one
+    """
+    plan = SyncPlan()
+    current = {url_key(_["url"]): _ for _ in monitors}
+    plan.monitor_ids = {key: int(_["id"]) for key, _ in current.items()}
+
+    wanted: set[str] = set()
+    for spec in desired.get("monitors") or []:
+        url = spec["url"] if "://" in spec["url"] else f"https://{spec['url']}"
+        key = url_key(url)
+        if key in wanted:
+            plan.problems.append(f"duplicate monitor {url}")
+            continue
+        wanted.add(key)
+
+        fields = {k: v for k, v in spec.items() if k not in SPECIAL_MONITOR_KEYS}
+        mwindow_ids = (
+            _resolve_mwindows(spec["mwindows"], mwindows, plan.problems) if spec.get("mwindows") is not None else None
+        )
+
+        if (monitor := current.get(key)) is None:
+            new = {"url": url, "friendly_name": default_name(url), **fields, "type": monitor_type(spec.get("type"))}
+            if mwindow_ids:
+                new["mwindows"] = UptimeRobot.format_list(sorted(mwindow_ids))
+            plan.create.append(new)
+            continue
+
+        if "type" in spec and monitor_type(spec["type"]) != monitor.get("type"):
+            plan.problems.append(f"the type of {url} can't be changed, remove and re-add it instead")
+
+        changes = {k: v for k, v in fields.items() if str(monitor.get(k)) != str(v)}
+        if mwindow_ids is not None:
+            current_windows = {int(_["id"]) for _ in monitor.get("mwindows") or []}
+            if mwindow_ids != current_windows:
+                changes["mwindows"] = UptimeRobot.format_list(sorted(mwindow_ids))
+        if changes:
+            plan.edit.append(MonitorEdit(monitor, changes))
+
+    if prune:
+        plan.delete = [monitor for key, monitor in current.items() if key not in wanted]
+
+    known_ids = set(plan.monitor_ids.values())
+    by_id = {str(_["id"]): _ for _ in dashboards}
+    by_name = {_["friendly_name"].lower(): _ for _ in dashboards}
+    for spec in desired.get("dashboards") or []:
+        dashboard = by_id.get(str(spec.get("id"))) or by_name.get(str(spec.get("friendly_name", "")).lower())
+        if not dashboard:
+            plan.problems.append(f"unknown dashboard {spec.get('friendly_name') or spec.get('id')!r}, create it first")
+            continue
+
+        changes = {k: v for k, v in spec.items() if k not in ("id", "monitors") and str(dashboard.get(k)) != str(v)}
+
+        # monitors by url, or by id (like the API lists them):
+        members = [_ if isinstance(_, int) else url_key(_) for _ in spec.get("monitors", [])]
+        unknown = [
+            _ for _ in members if (_ not in known_ids if isinstance(_, int) else _ not in wanted and _ not in current)
+        ]
+        plan.problems.extend(f"dashboard {dashboard['friendly_name']}: unknown monitor {_}" for _ in unknown)
+        members = [_ for _ in members if _ not in unknown]
+
+        member_ids = [_ if isinstance(_, int) else plan.monitor_ids.get(_) for _ in members]
+        new_members = "monitors" in spec and (
+            None in member_ids  # created by this plan
+            or set(member_ids) != {int(_) for _ in dashboard.get("monitors") or []}
+        )
+        if changes or new_members:
+            plan.dashboards.append(
+                DashboardEdit(dashboard, changes, members if "monitors" in spec else dashboard.get("monitors"))
+            )
+
+    return plan
+
+
+def apply_plan(
+    client: UptimeRobot,
+    plan: SyncPlan,
+    workers: int = None,
+    progress: typing.Callable[[str, bool | Exception], None] = None,
+) -> int:
+    """
+    Apply the plan in phases (create, edit, dashboards, delete), each in parallel under the client's rate limit.
+
+    :param progress: called with a description and the result (True, False or the exception) of every step
+    :return: amount of failed steps
+    """
+    workers = workers or client.pool_size
+    failures = 0
+    monitor_ids = dict(plan.monitor_ids)
+
+    def run(func: typing.Callable[[typing.Any], typing.Any], items: list, describe: typing.Callable) -> list:
+        nonlocal failures
+        results = run_parallel(func, items, workers=workers)
+        for item, result in results:
+            ok = result not in (None, False, 0) and not isinstance(result, Exception)
+            failures += not ok
+            if progress:
+                progress(describe(item), True if ok else result)
+        return results
+
+    def create(spec: AnyDict) -> int | None:
+        extra = {k: v for k, v in spec.items() if k not in ("friendly_name", "url", "type")}
+        return client.new_monitor(spec["friendly_name"], spec["url"], MonitorType(spec["type"]), **extra)
+
+    for spec, result in run(create, plan.create, lambda _: f"create {_['url']}"):
+        if result and not isinstance(result, Exception):
+            monitor_ids[url_key(spec["url"])] = int(result)
+
+    run(
+        lambda _: client.edit_monitor(_.monitor["id"], _.changes),
+        plan.edit,
+        lambda _: f"edit {_.monitor['url']}",
+    )
+
+    def edit_dashboard(item: DashboardEdit) -> bool:
+        members = [_ if isinstance(_, int) else monitor_ids.get(_) for _ in item.monitors or []]
+        return client.edit_psp(item.dashboard["id"], [_ for _ in members if _], **item.changes)
+
+    run(edit_dashboard, plan.dashboards, lambda _: f"dashboard {_.dashboard['friendly_name']}")
+    run(lambda _: client.delete_monitor(_["id"]), plan.delete, lambda _: f"delete {_['url']}")
+
+    return failures
@@ -0,0 +1,130 @@
+"""
+Compact column storage for the monitors of (large) accounts.
+
+Most tasks only need the id, url, name, type, interval and status of each monitor, so instead of a full dict per
+monitor those are kept in one typed array or list per field. Rows are turned back into dicts only when needed.
+"""
+
+import itertools
+import typing
+from array import array
+
+from .uptimerobot import UptimeRobotMonitor
+
+UNKNOWN = 255  # for small number columns: the monitor didn't have this field (status 0 means 'paused')
+
+
+class MonitorTable:
+    """
+    Struct-of-arrays: position `n` in every column belongs to the same monitor.
+
+    Iterating, indexing (by position) and `get` (by id) give plain monitor dicts with the kept fields.
+    """
+
+    __slots__ = ("_positions", "accounts", "ids", "intervals", "names", "statuses", "types", "urls")
+
+    def __init__(self, monitors: typing.Iterable[UptimeRobotMonitor] = ()):
+        self.ids = array("Q")
+        self.statuses = array("B")
+        self.types = array("B")
+        self.intervals = array("I")  # seconds, 0 if unknown
+        self.urls: list[str] = []
+        self.names: list[str] = []
+        self.accounts: list[str] | None = None  # only when reading multiple accounts
+        self._positions: dict[int, int] | None = None  # id -> position, built on the first lookup by id
+
+        self.extend(monitors)
+
+    def append(self, monitor: UptimeRobotMonitor) -> None:
+        position = len(self.ids)
+        monitor_id = int(monitor["id"])
+
+        self.ids.append(monitor_id)
+        if self._positions is not None:
+            self._positions[monitor_id] = position
+        self.statuses.append(monitor.get("status", UNKNOWN))
+        self.types.append(monitor.get("type") or UNKNOWN)
+        self.intervals.append(monitor.get("interval") or 0)
+        self.urls.append(monitor.get("url", ""))
+        self.names.append(monitor.get("friendly_name", ""))
+        if "account" in monitor and self.accounts is None:
+            self.accounts = [""] * position
+        if self.accounts is not None:
+            self.accounts.append(monitor.get("account", ""))
+
+    def extend(self, monitors: typing.Iterable[UptimeRobotMonitor]) -> None:
+        for monitor in monitors:
+            self.append(monitor)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def positions(self) -> dict[int, int]:
+        if self._positions is None:
+            self._positions = {monitor_id: position for position, monitor_id in enumerate(self.ids)}
+        return self._positions
+
+    def __contains__(self, monitor_id: object) -> bool:
+        return monitor_id in self.positions
+
+    def row(self, position: int) -> UptimeRobotMonitor:
+        monitor: UptimeRobotMonitor = {
+            "id": self.ids[position],
+            "friendly_name": self.names[position],
+            "url": self.urls[position],
+        }
+        if (status := self.statuses[position]) != UNKNOWN:
+            monitor["status"] = status
+        if (monitor_type := self.types[position]) != UNKNOWN:
+            monitor["type"] = monitor_type
+        if interval := self.intervals[position]:
+            monitor["interval"] = interval
+        if self.accounts is not None:
+            monitor["account"] = self.accounts[position]
+        return monitor
+
+    def __getitem__(self, position: int) -> UptimeRobotMonitor:
+        return self.row(range(len(self))[position])  # range: same bounds checking and negative indices as a list
+
+    def __iter__(self) -> typing.Iterator[UptimeRobotMonitor]:
+        return map(self.row, range(len(self)))
+
+    def get(self, monitor_id: int) -> UptimeRobotMonitor | None:
+        position = self.positions.get(int(monitor_id))
+        return None if position is None else self.row(position)
+
+    def status_of(self, monitor_id: int) -> int | None:
+        position = self.positions.get(int(monitor_id))
+        if position is None or (status := self.statuses[position]) == UNKNOWN:
+            return None
+        return status
+
+    def _status_mask(self, statuses: typing.Iterable[int]) -> bytes:
+        """
+        One byte per monitor: 1 if its status is one of `statuses`, else 0.
+        """
+        wanted = set(statuses)
+        lookup = bytes(1 if _ in wanted else 0 for _ in range(256))
+        # bytes.translate maps the whole column in one C-level pass:
+        return self.statuses.tobytes().translate(lookup)
+
+    def with_status(self, statuses: typing.Iterable[int]) -> "MonitorTable":
+        """
+        A new table with only the monitors in one of `statuses`, e.g. `table.with_status(DOWN_STATUSES)`.
+        """
+        mask = self._status_mask(statuses)
+
+        subset = MonitorTable()
+        subset.ids = array("Q", itertools.compress(self.ids, mask))
+        subset.statuses = array("B", itertools.compress(self.statuses, mask))
+        subset.types = array("B", itertools.compress(self.types, mask))
+        subset.intervals = array("I", itertools.compress(self.intervals, mask))
+        subset.urls = list(itertools.compress(self.urls, mask))
+        subset.names = list(itertools.compress(self.names, mask))
+        if self.accounts is not None:
+            subset.accounts = list(itertools.compress(self.accounts, mask))
+        return subset
+
+    def count(self, statuses: typing.Iterable[int]) -> int:
+        return self._status_mask(statuses).count(1)
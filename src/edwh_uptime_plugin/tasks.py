@@ -3,6 +3,8 @@ UptimeRobot API integration for the `edwh` tool.
 """
 
 import atexit
+import contextlib
+import os
 import signal
 import sys
 import typing
@@ -21,11 +23,119 @@ from edwh.tasks import dc_config, get_hosts_for_service
 from invoke import Context
 from termcolor import cprint
 
-from .dumpers import DEFAULT_PLAINTEXT, DEFAULT_STRUCTURED, SUPPORTED_FORMATS, dumpers
-from .helpers import first
-from .uptimerobot import MonitorType, UptimeRobotMonitor, uptime_robot
+from .dumpers import (
+    DEFAULT_PLAINTEXT,
+    DEFAULT_STRUCTURED,
+    STREAMING_FORMATS,
+    SUPPORTED_FORMATS,
+    dump_lines,
+    dumpers,
+)
+from .helpers import first, run_parallel
+from .uptimerobot import (
+    YEAR_3000,
+    MonitorType,
+    UptimeRobot,
+    UptimeRobotMonitor,
+    uptime_robot,
+)
+
+if typing.TYPE_CHECKING:
+    from .accounts import Accounts
+    from .bulk import BulkRun, Step
+    from .dashboards import DashboardChange
+    from .history import HistoryStore
+    from .search import MonitorIndex
+    from .table import MonitorTable
+
+_monitor_index: Optional["MonitorIndex"] = None
+_accounts: Optional["Accounts"] = None
+
+
+def monitor_index() -> "MonitorIndex":
+    """
+    Local search index over all monitors, built from one full (possibly cached) fetch per run.
+    """
+    global _monitor_index
+    if _monitor_index is None:
+        from .search import MonitorIndex
+
+        _monitor_index = MonitorIndex(uptime_robot.iter_monitors())
+        record_history(_monitor_index.monitors, source=uptime_robot)
+    return _monitor_index
+
+
+def reader() -> typing.Union[UptimeRobot, "Accounts"]:
+    """
+    Where read-only tasks get their data: all accounts from UPTIMEROBOT_ACCOUNTS at once if that is set,
+    otherwise the single UPTIMEROBOT_APIKEY account.
+    """
+    global _accounts
+    if _accounts is None:
+        from .accounts import Accounts
+
+        _accounts = Accounts.from_env(uptime_robot)
+    return _accounts or uptime_robot
+
+
+def history_store() -> Optional["HistoryStore"]:
+    """
+    Local status history that polls append to. UPTIME_HISTORY (environment or .env) can point to another file,
+    or be set to 0 to stop recording.
+    """
+    setting = os.environ.get("UPTIME_HISTORY") or edwh.get_env_value("UPTIME_HISTORY", "")
+    if setting == "0":
+        return None
+
+    from .history import HistoryStore
+
+    return HistoryStore(setting or None)
+
+
+def record_history(
+    monitors: typing.Iterable[UptimeRobotMonitor],
+    store: "HistoryStore" = None,
+    source: typing.Union[UptimeRobot, "Accounts"] = None,
+) -> None:
+    """
+    :param source: where the monitors came from. If it answered from the on-disk cache, the statuses are older than
+                   they look (and were recorded when they were fetched), so they aren't recorded again as current.
+    """
+    if source is not None and source.answered_from_cache("monitors"):
+        return
+    if store is None and (store := history_store()) is None:
+        return
+
+    try:
+        store.append(monitors)
+    except (OSError, ValueError) as e:
+        # never let bookkeeping break the actual command:
+        cprint(f"Could not record status history: {e}", color="yellow", file=sys.stderr)
+
+
+def recorded(monitors: typing.Iterable[UptimeRobotMonitor]) -> typing.Iterator[UptimeRobotMonitor]:
+    """
+    Pass monitors through unchanged, and add their statuses to the local history once all of them came by.
+    """
+    from .table import MonitorTable
+
+    seen = MonitorTable()
+    for monitor in monitors:
+        seen.append(monitor)
+        yield monitor
 
-YEAR_3000 = 32504504418
+    record_history(seen, source=reader())
+
+
+def recorded_table(monitors: typing.Iterable[UptimeRobotMonitor]) -> "MonitorTable":
+    """
+    Collect monitors as compact columns (see MonitorTable), and add their statuses to the local history.
+    """
+    from .table import MonitorTable
+
+    table = MonitorTable(monitors)
+    record_history(table, source=reader())
+    return table
 
 
 @task(iterable=("monitor_ids",))
@@ -49,13 +159,63 @@ def auto_add_to_dashboard(ctx: Context, monitor_ids: list[str | int], dashboard_
     edit_dashboard(ctx, dashboard_id, add_monitors=monitor_ids)
 
 
-@task()
-def auto_add(ctx: Context, directory: str = None, force: bool = False, quiet: bool = False):
+def expand_directories(patterns: typing.Iterable[str]) -> list[str]:
+    """
+    Directories for (glob) patterns like 'projects/*', deduplicated and in order.
+    """
+    import glob
+
+    directories: dict[str, None] = {}
+    for pattern in patterns:
+        pattern = os.path.expanduser(pattern)
+        if glob.has_magic(pattern):
+            directories.update(dict.fromkeys(sorted(_ for _ in glob.glob(pattern) if os.path.isdir(_))))
+        elif os.path.isdir(pattern):
+            directories[pattern] = None
+        else:
+            cprint(f"{pattern} is not a directory, skipping it.", color="yellow", file=sys.stderr)
+    return list(directories)
+
+
+def compose_domains(ctx: Context, directories: list[str], workers: int = 8) -> dict[str, set[str]]:
+    """
+    Evaluate the docker compose config of every directory at the same time (each `docker compose config` is its own
+    process) and collect the traefik domains of all their services.
+
+    :return: domain -> directories it was found in
+    """
+
+    def domains_in(directory: str) -> set[str]:
+        # ctx.cd isn't thread-safe, so every directory gets its own context (with the same config):
+        with (local := Context(config=ctx.config)).cd(directory):
+            config = dc_config(local)
+        if not config:  # dc_config doesn't raise when `docker compose config` fails
+            raise ValueError("no docker compose config found")
+
+        domains = set()
+        for service in config.get("services", {}).values():
+            domains.update(get_hosts_for_service(service))
+        return domains
+
+    found: dict[str, set[str]] = {}
+    for directory, result in run_parallel(domains_in, directories, workers=workers):
+        if isinstance(result, Exception):
+            cprint(f"Could not read the compose config in {directory}: {result}", color="red", file=sys.stderr)
+            continue
+
+        for domain in result:
+            found.setdefault(domain, set()).add(directory)
+    return found
+
+
+@task(iterable=("directory",))
+def auto_add(ctx: Context, directory: str | list[str] = None, force: bool = False, quiet: bool = False):
     """
     Find domains based on traefik labels and add them (if desired).
 
     :param ctx: invoke/fab context
-    :param directory: where to look for a docker-compose file? Default is current directory
+    :param directory: where to look for a docker-compose file? Default is current directory.
+                      Can be repeated and can be a glob (e.g. --directory '/srv/*') to handle many projects at once.
     :param force: perform auto-add even if UPTIME_AUTOADD_DONE flag is already set
     :param quiet: don't print in color on error (useful for `edwh setup`)
     """
@@ -73,72 +233,88 @@ def auto_add(ctx: Context, directory: str = None, force: bool = False, quiet: bo
             file=sys.stderr,
         )
 
-    directory = directory or "."
-
-    existing_monitors = uptime_robot.get_monitors()
-    existing_domains = {_["url"].split("/")[2] for _ in existing_monitors}
+    patterns = [directory] if isinstance(directory, str) else directory
+    directories = expand_directories(patterns or ["."])
 
-    with ctx.cd(directory):
-        config = dc_config(ctx)
-
-        domains = set()
-        services = config.get("services", {})
+    domains = compose_domains(ctx, directories)
+    if not domains:
+        cprint(
+            "No docker services/domains found; Could not auto-add anything.",
+            color=None if quiet else "red",
+            file=sys.stderr,
+        )
+        return
 
-        for service in services.values():
-            domains.update(get_hosts_for_service(service))
+    if len(directories) > 1:
+        projects = len(set().union(*domains.values()))
+        cprint(f"Found {len(domains)} domains in {projects} of {len(directories)} directories.", file=sys.stderr)
 
-        if not domains:
-            cprint(
-                "No docker services/domains found; Could not auto-add anything.",
-                color=None if quiet else "red",
-                file=sys.stderr,
-            )
-            return
+    # one fetch of the monitors for all directories together:
+    index = monitor_index()
+    existing_domains = {_.split("/")[2] for _ in index.monitors.urls}
 
-        to_add = interactive_selected_checkbox_values(
-            list(domains),
-            prompt="Which domains would you like to add to Uptime Robot? "
-            "(use arrow keys, spacebar, or digit keys, press 'Enter' to finish):",
-            selected=existing_domains,
-        )
+    to_add = interactive_selected_checkbox_values(
+        sorted(domains),
+        prompt="Which domains would you like to add to Uptime Robot? "
+        "(use arrow keys, spacebar, or digit keys, press 'Enter' to finish):",
+        selected=existing_domains,
+    )
 
-        indices = []
-        for url in to_add:
-            if url in existing_domains:
-                # no need to re-add!
-                continue
-
-            if monitor_id := add(ctx, url):
-                indices.append(monitor_id)
-
-        if indices and confirm(
-            (
-                "Do you want to add this monitor to a dashboard? [Yn] "
-                if len(indices) == 1
-                else "Do you want to add these monitors to a dashboard? [Yn] "
-            ),
-            default=True,
-        ):
-            auto_add_to_dashboard(ctx, indices)
+    # no need to re-add!
+    missing = [_ for _ in to_add if _ not in existing_domains]
+
+    if similar := {_: found for _ in missing if (found := index.search(_.removeprefix("www.")))}:
+        cprint("Similar domains were already added:", color="yellow", file=sys.stderr)
+        for domain, monitors in similar.items():
+            print(domain, "~", ", ".join(_["url"] for _ in monitors))
+        if not edwh.confirm("Add these domains anyway? [yN]", default=False):
+            missing = [_ for _ in missing if _ not in similar]
+
+    indices = [_ for _ in add_monitors(missing).values() if _]
+
+    if indices and confirm(
+        (
+            "Do you want to add this monitor to a dashboard? [Yn] "
+            if len(indices) == 1
+            else "Do you want to add these monitors to a dashboard? [Yn] "
+        ),
+        default=True,
+    ):
+        auto_add_to_dashboard(ctx, indices)
 
     # todo: Path(directory) / .env may be better, but `set_env_value` doesn't work with -H on remote servers at all yet
     edwh.set_env_value(Path(".env"), "UPTIME_AUTOADD_DONE", "1")
 
 
+def skip_cache(fresh: bool) -> None:
+    """
+    --fresh: forget the locally cached data, so this run gets (and stores) the current state from the API.
+    """
+    global _monitor_index
+    if fresh:
+        uptime_robot.invalidate_cache()
+        if (accounts := reader()) is not uptime_robot:
+            accounts.invalidate_cache()
+        _monitor_index = None
+
+
 def output_statuses_plaintext(monitors: typing.Iterable[UptimeRobotMonitor]) -> None:
     for monitor in monitors:
         status = uptime_robot.format_status(monitor["status"])
         color = uptime_robot.format_status_color(monitor["status"])
 
-        cprint(f"- {monitor['url']}: {status}", color=color)
+        account = f"[{monitor['account']}] " if "account" in monitor else ""
+        cprint(f"- {account}{monitor['url']}: {status}", color=color)
 
 
 def output_statuses_structured(
     monitors: typing.Iterable[UptimeRobotMonitor], fmt: SUPPORTED_FORMATS = DEFAULT_STRUCTURED
 ) -> None:
-    statuses = {}
+    statuses: dict[str, typing.Any] = {}
     for monitor in monitors:
-        statuses[monitor["url"]] = uptime_robot.format_status(monitor["status"])
+        # urls can exist in multiple accounts, so those are grouped per account:
+        target = statuses.setdefault(monitor["account"], {}) if "account" in monitor else statuses
+        target[monitor["url"]] = uptime_robot.format_status(monitor["status"])
 
     dumpers[fmt](
         {
@@ -147,23 +323,35 @@ def output_statuses_structured(
     )
 
 
+def output_statuses_streaming(monitors: typing.Iterable[UptimeRobotMonitor]) -> None:
+    dump_lines(
+        {"url": _["url"], "status": uptime_robot.format_status(_["status"])}
+        | ({"account": _["account"]} if "account" in _ else {})
+        for _ in monitors
+    )
+
+
 def output_statuses(monitors: typing.Iterable[UptimeRobotMonitor], fmt: SUPPORTED_FORMATS) -> None:
     match fmt:
         case "json" | "yml" | "yaml":
             output_statuses_structured(monitors, fmt)
+        case "ndjson" | "jsonl":
+            output_statuses_streaming(monitors)
         case _:
             output_statuses_plaintext(monitors)
 
 
 @task()
-def status(_: Context, url: str, fmt: SUPPORTED_FORMATS = DEFAULT_PLAINTEXT) -> None:
+def status(_: Context, url: str, fmt: SUPPORTED_FORMATS = DEFAULT_PLAINTEXT, fresh: bool = False) -> None:
     """
     Show a specific monitor by (partial) url or label.
 
     :param url: required positional argument of the URL to show the status for
     :param fmt: Output format (plaintext, json or yaml)
+    :param fresh: ignore locally cached data and fetch everything from the API
     """
-    monitors = uptime_robot.get_monitors(url)
+    skip_cache(fresh)
+    monitors = monitor_index().search(url)
     if not monitors:
         cprint("No monitor found!", color="red", file=sys.stderr)
         return
@@ -172,62 +360,355 @@ def status(_: Context, url: str, fmt: SUPPORTED_FORMATS = DEFAULT_PLAINTEXT) ->
 
 
 @task(name="monitors")
-def monitors_verbose(_: Context, search: str = "", fmt: SUPPORTED_FORMATS = DEFAULT_STRUCTURED) -> None:
+def monitors_verbose(
+    _: Context, search: str = "", fmt: SUPPORTED_FORMATS = DEFAULT_STRUCTURED, fresh: bool = False
+) -> None:
     """
     Show all monitors full data as dict.
     You can optionally add a search term, which will look in the URL and label.
 
     :param search: (partial) URL or monitor name to filter by
-    :param fmt: output format (json or yaml)
+    :param fmt: output format (json, yaml or ndjson to stream one monitor per line)
+    :param fresh: ignore locally cached data and fetch everything from the API
     """
-    monitors = uptime_robot.get_monitors(search)
+    skip_cache(fresh)
+    if fmt in STREAMING_FORMATS:
+        # print every page as soon as it arrives instead of collecting everything first:
+        dump_lines(recorded(reader().iter_monitors(search, remember=False)))
+        return
+
+    monitors = list(recorded(reader().iter_monitors(search, remember=False)))
     dumpers[fmt]({"monitors": monitors})
 
 
 @task(name="list")
-def list_statuses(_: Context, search: str = "", fmt: SUPPORTED_FORMATS = DEFAULT_PLAINTEXT) -> None:
+def list_statuses(
+    _: Context, search: str = "", fmt: SUPPORTED_FORMATS = DEFAULT_PLAINTEXT, fresh: bool = False
+) -> None:
     """
     Show the status for each monitor.
 
     :param search: (partial) URL or monitor name to filter by
-    :param fmt: text (default), json or yaml
+    :param fmt: text (default), json, yaml or ndjson
+    :param fresh: ignore locally cached data and fetch everything from the API
     """
-    monitors = uptime_robot.get_monitors(search)
+    skip_cache(fresh)
+    monitors = recorded(reader().iter_monitors(search, remember=False))
 
     output_statuses(monitors, fmt)
 
 
+def filter_statuses(
+    monitors: typing.Iterable[UptimeRobotMonitor], statuses: typing.Collection[int], fmt: SUPPORTED_FORMATS
+) -> typing.Iterable[UptimeRobotMonitor]:
+    """
+    The monitors with one of `statuses`: streamed one by one for ndjson,
+    otherwise filtered at once from compact columns (the whole account is collected for the history anyway).
+    """
+    if fmt in STREAMING_FORMATS:
+        return (_ for _ in recorded(monitors) if _["status"] in statuses)
+
+    return recorded_table(monitors).with_status(statuses)
+
+
 @task(aliases=("up",))
-def list_up(_: Context, strict: bool = False, fmt: SUPPORTED_FORMATS = DEFAULT_PLAINTEXT) -> None:
+def list_up(_: Context, strict: bool = False, fmt: SUPPORTED_FORMATS = DEFAULT_PLAINTEXT, fresh: bool = False) -> None:
     """
     List monitors that are up (probably).
 
     :param strict: If strict is True, only status 2 is allowed
-    :param fmt: output format (default is plaintext)
+    :param fmt: output format (default is plaintext; ndjson streams one monitor per line)
+    :param fresh: ignore locally cached data and fetch everything from the API
     """
-    min_status = 2 if strict else 0
-    max_status = 3
-
-    monitors = uptime_robot.get_monitors()
-    monitors = [_ for _ in monitors if min_status <= _["status"] < max_status]
+    skip_cache(fresh)
+    statuses = range(2 if strict else 0, 3)
 
-    output_statuses(monitors, fmt)
+    output_statuses(filter_statuses(reader().iter_monitors(remember=False), statuses, fmt), fmt)
 
 
 @task(aliases=("down",))
-def list_down(_: Context, strict: bool = False, fmt: SUPPORTED_FORMATS = DEFAULT_PLAINTEXT) -> None:
+def list_down(
+    _: Context, strict: bool = False, fmt: SUPPORTED_FORMATS = DEFAULT_PLAINTEXT, fresh: bool = False
+) -> None:
     """
     List monitors that are down (probably).
 
     :param strict: If strict is True, 'seems down' is ignored
-    :param fmt: output format (default is plaintext)
+    :param fmt: output format (default is plaintext; ndjson streams one monitor per line)
+    :param fresh: ignore locally cached data and fetch everything from the API
     """
-    min_status = 9 if strict else 8
+    skip_cache(fresh)
+    statuses = range(9 if strict else 8, 10)
 
-    monitors = uptime_robot.get_monitors()
-    monitors = [_ for _ in monitors if _["status"] >= min_status]
+    output_statuses(filter_statuses(reader().iter_monitors(remember=False), statuses, fmt), fmt)
 
-    output_statuses(monitors, fmt)
+
+@task()
+def watch(
+    _: Context,
+    search: str = "",
+    interval: float = 60,
+    fast_interval: float = 15,
+    fmt: SUPPORTED_FORMATS = DEFAULT_PLAINTEXT,
+    polls: int = 0,
+) -> None:
+    """
+    Keep polling the monitors and only print status changes, until interrupted (Ctrl+C).
+
+    :param search: (partial) URL or monitor name to filter by
+    :param interval: seconds between polls while everything is up
+    :param fast_interval: seconds between polls while something is down
+    :param fmt: text (default) or ndjson (one change per line)
+    :param polls: stop after this many polls (default: keep going)
+    """
+    from .watch import StatusWatcher, Transition
+
+    store = history_store()
+    watcher = StatusWatcher(
+        uptime_robot,
+        search,
+        interval=interval,
+        fast_interval=fast_interval,
+        on_poll=lambda monitors: record_history(monitors, store),
+    )
+
+    def on_change(change: Transition) -> None:
+        url = change.monitor["url"]
+        before = "new" if change.before is None else uptime_robot.format_status(change.before)
+        after = "removed" if change.after is None else uptime_robot.format_status(change.after)
+        now = datetime.now().isoformat(timespec="seconds")
+
+        if fmt in STREAMING_FORMATS:
+            dump_lines([{"time": now, "id": change.monitor["id"], "url": url, "from": before, "to": after}])
+        else:
+            color = "grey" if change.after is None else uptime_robot.format_status_color(change.after)
+            cprint(f"[{now}] {url}: {before} -> {after}", color=color, flush=True)
+
+    def on_start() -> None:
+        cprint(
+            f"Watching {len(watcher.monitors)} monitors ({len(watcher.down)} down), "
+            f"polling every {watcher.next_interval():g}s. Press Ctrl+C to stop.",
+            color="red" if watcher.down else "green",
+            file=sys.stderr,
+        )
+        for monitor in watcher.down:
+            cprint(f"- {monitor['url']}: {uptime_robot.format_status(monitor['status'])}", color="red", file=sys.stderr)
+
+    with contextlib.suppress(KeyboardInterrupt):
+        watcher.run(on_change, polls=polls, on_start=on_start)
+
+
+@task()
+def exporter(
+    _: Context,
+    host: str = "127.0.0.1",
+    port: int = 9705,
+    interval: float = 60,
+    polls: int = 0,
+) -> None:
+    """
+    Serve the monitors as Prometheus metrics (status, type, interval and response time, labelled by dashboard)
+    on http://<host>:<port>/metrics, until interrupted (Ctrl+C).
+
+    One background poller refreshes the metrics, so any amount of scrapers costs no extra API requests.
+
+    :param host: address to listen on, e.g. 0.0.0.0 for every interface
+    :param port: port to listen on
+    :param interval: seconds between polls (never shorter than the rate limit allows)
+    :param polls: stop after this many polls (default: keep going)
+    """
+    from .exporter import MetricsPoller, MetricsServer
+
+    store = history_store()
+    poller = MetricsPoller(reader(), interval=interval, on_poll=lambda monitors: record_history(monitors, store))
+    poller.poll()  # fail right away on e.g. a wrong API key, and never serve empty metrics
+
+    server = MetricsServer(poller, host, int(port))
+    cprint(
+        f"Serving metrics on {server.url}, polling every {poller.next_interval():g}s. Press Ctrl+C to stop.",
+        color="green",
+        file=sys.stderr,
+    )
+
+    def on_error(error: Exception) -> None:
+        cprint(f"Polling failed, serving the previous metrics: {error}", color="red", file=sys.stderr)
+
+    poller.start(
+        polls=int(polls) - 1 if polls else None,
+        on_error=on_error,
+        on_done=server.shutdown if polls else None,
+    )
+    try:
+        with contextlib.suppress(KeyboardInterrupt):
+            server.serve_forever()
+    finally:
+        poller.stop()
+        server.server_close()
+
+
+def format_duration(seconds: float) -> str:
+    minutes, _ = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    days, hours = divmod(hours, 24)
+    return " ".join(f"{value}{unit}" for value, unit in ((days, "d"), (hours, "h"), (minutes, "m")) if value) or "<1m"
+
+
+@task()
+def history(
+    _: Context, url: str = "", days: float = 30, flapping: bool = False, fmt: SUPPORTED_FORMATS = DEFAULT_PLAINTEXT
+) -> None:
+    """
+    When were monitors down? Answered from the statuses that earlier list/up/down/monitors/watch runs recorded locally.
+
+    Usage: edwh uptime.history --url site.example.com --days 30
+
+    Run e.g. `edwh uptime.list` from cron to keep the history complete.
+
+    :param url: (partial) URL or monitor name to filter by (default: all monitors)
+    :param days: how far to look back
+    :param flapping: show the monitors that changed status at least twice instead
+    :param fmt: text (default), json, yaml or ndjson
+    """
+    if (store := history_store()) is None:
+        cprint("Status history is disabled (UPTIME_HISTORY=0).", color="red", file=sys.stderr)
+        return
+
+    now = datetime.now().timestamp()
+    since = now - days * 86400
+    names = store.names()
+
+    def label(monitor_id: int) -> str:
+        return names.get(monitor_id, {}).get("url") or str(monitor_id)
+
+    if flapping:
+        changes = store.flapping(since)
+        if fmt in ("text", "plaintext"):
+            for monitor_id, amount in changes.items():
+                cprint(f"- {label(monitor_id)}: {amount} status changes", color="yellow")
+        else:
+            dumpers[fmt]({"flapping": [{"id": _, "url": label(_), "changes": n} for _, n in changes.items()]})
+        return
+
+    monitor_ids = ()
+    if url:
+        term = url.lower()
+        monitor_ids = [
+            monitor_id
+            for monitor_id, info in names.items()
+            if term in info.get("url", "").lower() or term in info.get("friendly_name", "").lower()
+        ]
+        if not monitor_ids:
+            cprint(f"No recorded history for {url}.", color="red", file=sys.stderr)
+            return
+
+    periods = store.periods(since, monitor_ids=monitor_ids)
+
+    if fmt not in ("text", "plaintext"):
+        dumpers[fmt](
+            {
+                "downtime": [
+                    {
+                        "id": period.monitor_id,
+                        "url": label(period.monitor_id),
+                        "status": uptime_robot.format_status(period.status),
+                        "start": datetime.fromtimestamp(period.start).isoformat(),
+                        "end": datetime.fromtimestamp(period.end).isoformat() if period.end else None,
+                        "seconds": (period.end or now) - period.start,
+                    }
+                    for period in periods
+                ]
+            }
+        )
+        return
+
+    if not periods:
+        cprint(f"No downtime recorded in the last {days:g} days.", color="green")
+
+    for period in periods:
+        start = datetime.fromtimestamp(period.start).strftime("%Y-%m-%d %H:%M")
+        end = datetime.fromtimestamp(period.end).strftime("%Y-%m-%d %H:%M") if period.end else "now"
+        cprint(
+            f"- {label(period.monitor_id)}: {uptime_robot.format_status(period.status)} from {start} to {end} "
+            f"({format_duration((period.end or now) - period.start)})",
+            color=uptime_robot.format_status_color(period.status),
+        )
+
+
+@task()
+def sla_report(
+    _: Context,
+    dashboard_id: str = "",
+    search: str = "",
+    days: int = 30,
+    fmt: SUPPORTED_FORMATS = DEFAULT_PLAINTEXT,
+    fresh: bool = False,
+) -> None:
+    """
+    Uptime, incidents, downtime, MTTR and response times per monitor and per dashboard.
+
+    Install `edwh-uptime-plugin[sla]` (NumPy) to aggregate thousands of monitors quickly.
+
+    :param dashboard_id: only the monitors on this dashboard (default: all monitors)
+    :param search: only monitors whose url or name contains this
+    :param days: reporting window (response times cover at most the last 7 of these days)
+    :param fmt: text (default), json, yaml or ndjson
+    :param fresh: ignore locally cached data and fetch everything from the API
+    """
+    from . import sla
+
+    skip_cache(fresh)
+    now = int(datetime.now().timestamp())
+    since = now - days * 86400
+
+    monitor_ids = ()
+    if dashboard_id:
+        if not (dashboard_info := uptime_robot.get_psp(dashboard_id)):
+            cprint(f"Dashboard {dashboard_id} not found.", color="red", file=sys.stderr)
+            return
+        all_dashboards = [dashboard_info]
+        monitor_ids = dashboard_info["monitors"]
+    else:
+        all_dashboards = uptime_robot.get_psps()
+
+    monitors = list(
+        uptime_robot.iter_monitors(
+            search,
+            monitor_ids=monitor_ids,
+            custom_uptime_ratios=days,
+            response_times=1,
+            response_times_start_date=max(since, now - sla.MAX_RESPONSE_TIME_DAYS * 86400),
+            response_times_end_date=now,
+            logs=1,
+            logs_start_date=since,
+            logs_end_date=now,
+            remember=False,  # with their logs and response times, nothing else should hold on to these
+        )
+    )
+    report = sla.sla_report(monitors, all_dashboards, since=since)
+
+    if fmt in STREAMING_FORMATS:
+        dump_lines({"kind": kind.removesuffix("s"), **row} for kind, rows in report.items() for row in rows)
+        return
+    elif fmt not in ("text", "plaintext"):
+        dumpers[fmt](report)
+        return
+
+    def fmt_value(value: float | None, unit: str = "") -> str:
+        return "-" if value is None else f"{value:g}{unit}"
+
+    for kind, rows in report.items():
+        if not rows:
+            continue
+        cprint(f"{kind.capitalize()} (last {days} days):", attrs=["bold"])
+        for row in rows:
+            mttr = format_duration(row["mttr"]) if row["mttr"] is not None else "-"
+            cprint(
+                f"- {row.get('url') or row['friendly_name']}: {fmt_value(row['uptime'], '%')} up, "
+                f"{row['incidents']} incidents ({format_duration(row['downtime']) if row['downtime'] else 'no'} "
+                f"downtime, MTTR {mttr}), response avg {fmt_value(row['response_avg'], 'ms')} "
+                f"p95 {fmt_value(row['response_p95'], 'ms')} max {fmt_value(row['response_max'], 'ms')}",
+                color="red" if row["incidents"] else "green",
+            )
 
 
 def extract_friendly_name(url: str) -> str:
@@ -260,7 +741,7 @@ def add(_: Context, url: str, friendly_name: str = "") -> int | None:
     """
     url, domain = normalize_url(url)
 
-    if existing := uptime_robot.get_monitors(domain):
+    if existing := monitor_index().search(domain):
         cprint("A similar domain was already added:", color="yellow", file=sys.stderr)
         for monitor in existing:
             print(monitor["friendly_name"], monitor["url"])
@@ -278,10 +759,111 @@ def add(_: Context, url: str, friendly_name: str = "") -> int | None:
         cprint("No monitor was added", color="red")
     else:
         cprint(f"Monitor '{friendly_name}' was added: {monitor_id}", color="green")
+        monitor_index().add({"id": monitor_id, "friendly_name": friendly_name, "url": url, "status": 1})
 
     return monitor_id
 
 
+@task()
+def sync(_: Context, path: str, prune: bool = False, dry_run: bool = False, yes: bool = False) -> None:
+    """
+    Make the account match a desired-state file (TOML or YAML) of monitors, dashboards and maintenance windows.
+
+    Current state is fetched once; only the fields that differ are sent.
+
+    :param path: desired-state file (.toml, .yaml or .yml)
+    :param prune: also remove monitors that are not in the file
+    :param dry_run: only show what would change
+    :param yes: apply without asking for confirmation
+    """
+    global _monitor_index
+    from .sync import apply_plan, compute_plan, load_desired_state
+
+    desired = load_desired_state(path)
+
+    uptime_robot.invalidate_cache()  # never diff against stale data
+    plan = compute_plan(
+        desired,
+        uptime_robot.iter_monitors(mwindows=1),
+        uptime_robot.get_psps(),
+        uptime_robot.get_m_windows(),
+        prune=prune,
+        default_name=extract_friendly_name,
+    )
+
+    for problem in plan.problems:
+        cprint(problem, color="yellow", file=sys.stderr)
+
+    if not plan:
+        cprint("Everything is in sync.", color="green")
+        return
+
+    colors = {"+": "green", "~": "blue", "-": "red"}
+    for line in plan.describe():
+        cprint(line, color=colors.get(line[0]))
+
+    if dry_run or not (yes or confirm(f"Apply these {len(plan)} changes? [Yn]", default=True)):
+        return
+
+    done = 0
+
+    def report(step: str, result: bool | Exception) -> None:
+        nonlocal done
+        done += 1
+        if result is True:
+            cprint(f"[{done}/{len(plan)}] {step}", color="green")
+        else:
+            reason = f": {result}" if isinstance(result, Exception) else ""
+            cprint(f"[{done}/{len(plan)}] {step} failed{reason}", color="red")
+
+    failures = apply_plan(uptime_robot, plan, progress=report)
+    _monitor_index = None  # the account changed, rebuild on the next lookup
+
+    if failures:
+        cprint(f"{failures} of {len(plan)} changes failed.", color="red", file=sys.stderr)
+
+
+def add_monitors(urls: typing.Iterable[str]) -> dict[str, int | None]:
+    """
+    Create many monitors in parallel (paced by the client's rate limiter), without the per-url duplicate check of `add`.
+
+    Returns the new monitor id per url (None if it could not be added).
+    """
+    urls = [normalize_url(_)[0] for _ in urls]
+    if not urls:
+        return {}
+
+    def create(url: str) -> int | None:
+        return uptime_robot.new_monitor(extract_friendly_name(url), url)
+
+    def report(done: int, total: int, url: str, monitor_id: int | None | Exception) -> None:
+        if monitor_id and not isinstance(monitor_id, Exception):
+            cprint(f"[{done}/{total}] Monitor '{extract_friendly_name(url)}' was added: {monitor_id}", color="green")
+        else:
+            reason = f": {monitor_id}" if isinstance(monitor_id, Exception) else ""
+            cprint(f"[{done}/{total}] Monitor for {url} could not be added{reason}", color="red")
+
+    results = run_parallel(create, urls, workers=uptime_robot.pool_size, progress=report)
+
+    added: dict[str, int | None] = {}
+    index = monitor_index()
+    for url, monitor_id in results:
+        if isinstance(monitor_id, Exception) or not monitor_id:
+            added[url] = None
+            continue
+
+        added[url] = monitor_id
+        index.add({"id": monitor_id, "friendly_name": extract_friendly_name(url), "url": url, "status": 1})
+
+    failed = sum(_ is None for _ in added.values())
+    cprint(
+        f"Added {len(added) - failed} of {len(added)} monitors.",
+        color="red" if failed else "green",
+        file=sys.stderr,
+    )
+    return added
+
+
 def select_monitor(url: str) -> UptimeRobotMonitor | None:
     """
     Interactively select a monitor by url.
@@ -289,12 +871,20 @@ def select_monitor(url: str) -> UptimeRobotMonitor | None:
     :param url: Which domain name to select
     :return: Selected monitor
     """
-    monitors = uptime_robot.get_monitors(url)
+    index = monitor_index()
+    monitors = index.search(url)
+    ambiguous = len(monitors) > 1
+    if not monitors and (monitors := index.fuzzy(url)):
+        # probably a typo, but let the user confirm:
+        cprint(f"No exact match for {url}, did you mean:", color="yellow")
+        ambiguous = True
+    elif ambiguous:
+        cprint(f"Ambiguous url {url} could mean:", color="yellow")
+
     if not monitors:
         cprint(f"No such monitor could be found {url}", color="red")
         return None
-    if len(monitors) > 1:
-        cprint(f"Ambiguous url {url} could mean:", color="yellow")
+    if ambiguous:
         for idx, monitor in enumerate(monitors):
             print(idx + 1, monitor["friendly_name"], monitor["url"])
 
@@ -348,7 +938,8 @@ def edit(_: Context, url: str, friendly_name: Optional[str] = None) -> None:
     :param url: Which domain name to edit
     :param friendly_name: new human-readable label
     """
-    monitor = select_monitor(url)
+    with uptime_robot.fresh():  # fields that aren't changed are sent as they are now
+        monitor = select_monitor(url)
     if monitor is None:
         return
 
@@ -400,24 +991,28 @@ def account(_: Context, fmt: SUPPORTED_FORMATS = DEFAULT_STRUCTURED) -> None:
 
 
 @task()
-def dashboards(_: Context, fmt: SUPPORTED_FORMATS = DEFAULT_STRUCTURED):
+def dashboards(_: Context, fmt: SUPPORTED_FORMATS = DEFAULT_STRUCTURED, fresh: bool = False):
     """
     Show all dashboards.
 
     :param fmt: Output format (plaintext, json or yaml)
+    :param fresh: ignore locally cached data and fetch everything from the API
     """
-    data = {"dashboards": uptime_robot.get_psps()}
+    skip_cache(fresh)
+    data = {"dashboards": reader().get_psps()}
     dumpers[fmt](data)
 
 
 @task()
-def dashboard(_: Context, dashboard_id: str, fmt: SUPPORTED_FORMATS = DEFAULT_STRUCTURED):
+def dashboard(_: Context, dashboard_id: str, fmt: SUPPORTED_FORMATS = DEFAULT_STRUCTURED, fresh: bool = False):
     """
     Show a specific dashboard by dashboard_id.
 
     :param dashboard_id: id of the dashboard you want to show.
     :param fmt: Output format (plaintext, json or yaml)
+    :param fresh: ignore locally cached data and fetch everything from the API
     """
+    skip_cache(fresh)
     dashboard_info = uptime_robot.get_psp(dashboard_id)
     data = {"dashboard": dashboard_info}
     if dashboard_info:
@@ -427,28 +1022,57 @@ def dashboard(_: Context, dashboard_id: str, fmt: SUPPORTED_FORMATS = DEFAULT_ST
     dumpers[fmt](data)
 
 
-@task(iterable=("add_monitors",))
+@task(iterable=("add_monitors", "url", "name", "compose"))
 def edit_dashboard(
-    _: Context, dashboard_id: int, friendly_name: str = None, add_monitors: typing.Iterable[int | str] = ()
+    ctx: Context,
+    dashboard_id: int = None,
+    friendly_name: str = None,
+    add_monitors: typing.Iterable[int | str] = (),
+    fresh: bool = False,
+    rules: str = None,
+    url: typing.Iterable[str] = (),
+    name: typing.Iterable[str] = (),
+    compose: typing.Iterable[str] = (),
+    exact: bool = False,
+    dry_run: bool = False,
 ):
     """
     Select monitors to add to A dashboard.
 
     Usage: edwh uptime.edit_dashboard <dashboard_id>
 
+    Or without prompts, by rules (e.g. in CI):
+        edwh uptime.edit_dashboard <dashboard_id> --url '*.example.com' --name 'prod-*' --compose /srv/shop
+        edwh uptime.edit_dashboard --rules dashboards.toml
+
     :param dashboard_id: id of the dashboard you want to edit.
     :param friendly_name: Human-readable label (defaults to part of URL)
+    :param fresh: ignore locally cached data and fetch everything from the API
+    :param rules: TOML or YAML file with rules for many dashboards (see the README)
+    :param url: glob on the URL or host of monitors that belong on the dashboard (can be repeated)
+    :param name: glob on the friendly_name of monitors that belong on the dashboard (can be repeated)
+    :param compose: docker compose project directory whose traefik hosts belong on the dashboard (can be repeated)
+    :param exact: with rules: also remove the monitors that don't match
+    :param dry_run: with rules: only show what would change
     """
-    dashboard_info = uptime_robot.get_psp(dashboard_id)
+    if rules or url or name or compose:
+        return edit_dashboards_by_rules(ctx, dashboard_id, rules, url, name, compose, exact, dry_run, fresh)
+
+    if not dashboard_id:
+        cprint("Invalid dashboard id.", color="red", file=sys.stderr)
+        return
+
+    skip_cache(fresh)
+    with uptime_robot.fresh():  # its monitors are sent back as a whole
+        dashboard_info = uptime_robot.get_psp(dashboard_id)
     if not dashboard_info:
         cprint("Invalid dashboard id.", color="red", file=sys.stderr)
         return
 
     friendly_name = friendly_name or dashboard_info["friendly_name"]
 
-    monitors = uptime_robot.get_monitors()
-
-    available = {int(_["id"]): _["friendly_name"] for _ in monitors}
+    index = monitor_index()
+    available = dict(zip(index.monitors.ids, index.monitors.names))
     selected = dashboard_info["monitors"] + [int(_) for _ in add_monitors]
 
     new_monitors = interactive_selected_checkbox_values(
@@ -473,6 +1097,76 @@ def edit_dashboard(
         cprint(f"Dashboard {dashboard_info['friendly_name']} could not be updated.", color="red")
 
 
+def edit_dashboards_by_rules(
+    ctx: Context,
+    dashboard_id: int | str | None,
+    rules_path: str | None,
+    urls: typing.Iterable[str],
+    names: typing.Iterable[str],
+    hosts_from: typing.Iterable[str],
+    exact: bool,
+    dry_run: bool,
+    fresh: bool,
+) -> None:
+    """
+    Non-interactive edit_dashboard: one fetch of the monitors and one of the dashboards,
+    then only the dashboards whose monitors change are edited (in parallel).
+    """
+    from .dashboards import DashboardRule, plan_dashboards
+    from .sync import load_desired_state
+
+    rules = []
+    if rules_path:
+        rules = [DashboardRule.from_spec(_) for _ in load_desired_state(rules_path).get("dashboards") or []]
+    if urls or names or hosts_from:
+        if not dashboard_id:
+            return cprint("Pass a dashboard id for --url, --name or --compose.", color="red", file=sys.stderr)
+        rules.append(DashboardRule(str(dashboard_id), urls=list(urls), names=list(names), compose=list(hosts_from)))
+
+    # the docker compose projects of all rules, read at the same time:
+    projects = {pattern: expand_directories([pattern]) for rule in rules for pattern in rule.compose}
+    directories = list(dict.fromkeys(_ for found in projects.values() for _ in found))
+    domains = compose_domains(ctx, directories) if directories else {}
+    read = set().union(*domains.values())
+    for rule in rules:
+        for pattern in rule.compose:
+            # a project that couldn't be read must not make --exact remove its monitors:
+            if not (found := set(projects[pattern])) or not found <= read:
+                rule.unresolved.append(pattern)
+            rule.hosts += [domain for domain, found_in in domains.items() if found_in & found]
+
+    skip_cache(fresh)
+    with uptime_robot.fresh():  # the monitors of a dashboard are sent back as a whole
+        changes, problems = plan_dashboards(rules, uptime_robot.get_psps(), monitor_index().monitors, exact=exact)
+
+    for problem in problems:
+        cprint(problem, color="yellow", file=sys.stderr)
+
+    if not changes:
+        return cprint("All dashboards are up to date.", color="green")
+
+    for change in changes:
+        cprint(change.describe(), color="blue")
+
+    if dry_run:
+        return
+
+    def report(done: int, total: int, change: "DashboardChange", result: bool | Exception) -> None:
+        label = change.dashboard["friendly_name"]
+        if result is True:
+            cprint(f"[{done}/{total}] Dashboard {label} updated!", color="green")
+        else:
+            reason = f": {result}" if isinstance(result, Exception) else ""
+            cprint(f"[{done}/{total}] Dashboard {label} could not be updated{reason}.", color="red")
+
+    run_parallel(
+        lambda change: uptime_robot.edit_psp(change.dashboard["id"], change.monitors),
+        changes,
+        workers=uptime_robot.pool_size,
+        progress=report,
+    )
+
+
 def defer(callback: typing.Callable[[], None]):
     """
     When using atexit, you also have to listen to SIGTERM to ensure atexit runs.
@@ -487,13 +1181,88 @@ def defer(callback: typing.Callable[[], None]):
     return lambda: atexit.unregister(callback)
 
 
+# per bulk action: what to print when a step succeeded or failed (formatted with the step's params)
+STEP_MESSAGES = {
+    # 'Succesfully modified' is the other way around, but keeps the logic for the user:
+    "attach_mwindow": (
+        "Succesfully modified {monitor} maintenance window(s)",
+        "Failed to modified {monitor} to maintenance window(s)",
+    ),
+    "detach_mwindow": (
+        "Succesfully modified {monitor} maintenance window(s)",
+        "Failed to modified {monitor} maintenance window(s)",
+    ),
+    "delete_mwindow": ("Removed {window}", "Removal of {window} failed"),
+}
+
+
+def report_step(done: int, total: int, step: "Step", result: bool | Exception) -> None:
+    succeeded, failed = STEP_MESSAGES[step.action]
+    if isinstance(result, Exception):
+        cprint(f"[{done}/{total}] {failed.format(**step.params)}: {result}", color="red")
+    else:
+        cprint(f"[{done}/{total}] {succeeded.format(**step.params)}", color="green")
+
+
+def start_run(operation: str, steps: list["Step"], done: typing.Iterable[int] = ()) -> "BulkRun":
+    from .bulk import BulkRun
+
+    run = BulkRun.plan(operation, steps, done=done)
+    cprint(f"Journal: {run.id} (see `edwh uptime.resume` and `edwh uptime.rollback`)", color="blue", file=sys.stderr)
+    return run
+
+
+def execute_run(run: "BulkRun") -> int:
+    """
+    Perform the steps of a run that aren't done yet. Returns the amount that succeeded.
+    """
+    results = run.execute(uptime_robot, progress=report_step)
+    if failed := sum(isinstance(result, Exception) for _, result in results):
+        cprint(f"{failed} step(s) failed, retry them with: edwh uptime.resume --run-id {run.id}", color="yellow")
+    return len(results) - failed
+
+
+def rollback_run(run: "BulkRun") -> None:
+    results = run.rollback(uptime_robot, progress=report_step)
+    if failed := sum(isinstance(result, Exception) for _, result in results):
+        cprint(
+            f"{failed} step(s) could not be undone, retry with: edwh uptime.rollback --run-id {run.id}", color="yellow"
+        )
+    if irreversible := run.irreversible:
+        cprint(f"{len(irreversible)} step(s) can't be undone (e.g. removed windows).", color="yellow")
+
+
+def mwindow_steps(window_id: int | str, monitor_ids: typing.Iterable[int | str]) -> list["Step"]:
+    from .bulk import Step
+
+    return [Step("attach_mwindow", {"window": int(window_id), "monitor": int(_)}) for _ in monitor_ids]
+
+
+def add_maintenance_to_monitors(
+    window_id: int | str, monitor_ids: typing.Iterable[int | str], operation: str = "add_maintenance_to_monitors"
+) -> int:
+    """
+    Link a maintenance window to many monitors, as a journaled run (see `resume` and `rollback`).
+
+    The monitors (with their current windows) are fetched in one batched request,
+    after which the edits run in parallel (paced by the client's rate limiter).
+
+    :param operation: name of the run in its journal
+    Returns the amount of monitors that were modified successfully.
+    """
+    steps = mwindow_steps(window_id, monitor_ids)
+    if not steps:
+        return 0
+
+    return execute_run(start_run(operation, steps))
+
+
 @task
-def maintenance(c: Context, friendly_name: str, duration: int = 60, dashboard_id: int | str = None):
+def maintenance(_: Context, friendly_name: str, duration: int = 60, dashboard_id: int | str = None):
     """
     Start a new maintenance window.
 
     Args:
-        c: invoke Context
         friendly_name: descriptive name for the window (e.g. the version you're releasing)
         duration: time in minutes the window will stay if you don't end it manually
         dashboard_id: optional, id of the dashboard to take the monitors from.
@@ -514,24 +1283,25 @@ def maintenance(c: Context, friendly_name: str, duration: int = 60, dashboard_id
         return
 
     # Get the monitors of the dashboard
-    dashboard = uptime_robot.get_psp(idx=dashboard_id)
+    with uptime_robot.fresh():
+        dashboard = uptime_robot.get_psp(idx=dashboard_id)
     dashboard_monitors = dashboard.get("monitors", [])
 
     # add the maintenance window to all the monitors.
-    for monitor_id in dashboard_monitors:
-        monitor = uptime_robot.get_monitor(monitor_id=monitor_id, mwindows=1)
-        edit_status = uptime_robot.monitor_change_mwindows(monitor_data=monitor, to_add=[str(window_id)])
-        if edit_status:
-            cprint(
-                f"Succesfully modified {monitor_id} maintenance window(s)", color="green"
-            )  # Eigenlijk andersom maar om de logica voor de gebruiker aan te houden
-        else:
-            cprint(f"Failed to modified {monitor_id} to maintenance window(s)", color="red")
+    # the window is part of the journaled run, so `edwh uptime.rollback` removes it if this process gets killed:
+    from .bulk import Step
+
+    run = start_run(
+        "maintenance",
+        [Step("new_mwindow", {"window": window_id}), *mwindow_steps(window_id, dashboard_monitors)],
+        done=[0],
+    )
+    execute_run(run)
 
     # 3. on kill/done remove window
 
     def cleanup(*_):
-        unmaintenance(c, window_id)
+        rollback_run(run)
 
     cancel = defer(cleanup)
 
@@ -565,8 +1335,9 @@ def add_monitor_to_maintenance(_: Context, maintenance_id: int, monitor_id: int)
     :param maintenance_id: ID of the maintenance window to add the monitor to.
     :param monitor_id: ID of the monitor to add to the maintenance window.
     """
-    # Get monitor data.
-    monitor_data = uptime_robot.get_monitor(monitor_id=monitor_id, mwindows=1)
+    # Get monitor data (from the API: all of its windows are sent back).
+    with uptime_robot.fresh():
+        monitor_data = uptime_robot.get_monitor(monitor_id=monitor_id, mwindows=1)
     if not monitor_data:
         cprint(f"{maintenance_id} is not an valid maintenance_id.", color="red")
         return
@@ -598,7 +1369,8 @@ def add_dashboard_to_maintenance(_: Context, maintenance_id: int, dashboard_id:
     # Get dashboard data.
     dashboard_id = dashboard_id or uptime_robot.interactive_monitor_selector(allow_empty=False)
 
-    dashboard_data = uptime_robot.get_psp(idx=dashboard_id)
+    with uptime_robot.fresh():
+        dashboard_data = uptime_robot.get_psp(idx=dashboard_id)
     if not dashboard_data:
         return cprint(f"{dashboard_id} is not an valid dashboard_id.", color="red")
 
@@ -610,16 +1382,7 @@ def add_dashboard_to_maintenance(_: Context, maintenance_id: int, dashboard_id:
     # Search for the monitors in a dashboard and add the maintenance window_id to them
     dashboard_monitors = dashboard_data.get("monitors", [])
 
-    for monitor_id in dashboard_monitors:
-        # Get the monitor data
-        current_monitor = uptime_robot.get_monitor(monitor_id=monitor_id, mwindows=1)
-        edit_status = uptime_robot.monitor_change_mwindows(monitor_data=current_monitor, to_add=[str(maintenance_id)])
-        if edit_status:
-            cprint(
-                f"Succesfully modified {monitor_id} maintenance window(s)", color="green"
-            )  # Eigenlijk andersom maar om de logica voor de gebruiker aan te houden
-        else:
-            cprint(f"Failed to modified {monitor_id} to maintenance window(s)", color="red")
+    add_maintenance_to_monitors(maintenance_id, dashboard_monitors, operation="add_dashboard_to_maintenance")
 
 
 @task
@@ -631,8 +1394,9 @@ def remove_monitor_from_maintenance(_: Context, maintenance_id: int, monitor_id:
     :param maintenance_id: ID of the maintenance window to add the monitor to.
     :param monitor_id: ID of the monitor to add to the maintenance window.
     """
-    # Get monitor data.
-    monitor_data = uptime_robot.get_monitor(monitor_id=monitor_id, mwindows=1)
+    # Get monitor data (from the API: all of its windows are sent back).
+    with uptime_robot.fresh():
+        monitor_data = uptime_robot.get_monitor(monitor_id=monitor_id, mwindows=1)
     if not monitor_data:
         return cprint(f"{monitor_id} is not a valid monitor_id", color="red")
 
@@ -672,7 +1436,8 @@ def unmaintenance(_: Context, window: int | str):
     """
 
     def remove_maintenance_window(window_id: int):
-        m_window = uptime_robot.get_m_window(window_id)
+        with uptime_robot.fresh():
+            m_window = uptime_robot.get_m_window(window_id)
         # Pause the mwindow if it is not already paused
         if m_window["status"] != 0:
             m_window["status"] = 0
@@ -687,7 +1452,8 @@ def unmaintenance(_: Context, window: int | str):
         else:
             cprint(f"Removal of {window} failed.", color="red")
 
-    window_data = uptime_robot.get_m_windows()  # Get all maintenance windows.
+    with uptime_robot.fresh():
+        window_data = uptime_robot.get_m_windows()  # Get all maintenance windows.
 
     if not window_data:
         return cprint("No active maintenance windows found.", color="red")
@@ -705,10 +1471,107 @@ def unmaintenance(_: Context, window: int | str):
 def unmaintenance_all(_: Context):
     """Remove all maintenance one-time windows."""
     verification = confirm("This will remove all maintenance windows. Are you sure? (y/N)")
-    if verification:
-        cprint(f"Removed {uptime_robot.clean_maintenance_windows()} one-time maintenance windows.", color="green")
-    else:
-        cprint(f"Removal aborted.", color="red")
+    if not verification:
+        return cprint(f"Removal aborted.", color="red")
+
+    from .bulk import Step
+
+    # you can't query on type directly so filter all non-once here:
+    with uptime_robot.fresh():
+        windows = [_ for _ in uptime_robot.get_m_windows() or [] if _["type"] == "once"]
+    steps = [Step("delete_mwindow", {"window": _["id"]}) for _ in windows]
+    removed = execute_run(start_run("unmaintenance_all", steps)) if steps else 0
+    cprint(f"Removed {removed} one-time maintenance windows.", color="green")
+
+
+@task
+def maintenance_gc(
+    _: Context,
+    expired: bool = True,
+    orphaned: bool = True,
+    dry_run: bool = False,
+    yes: bool = False,
+    fresh: bool = False,
+):
+    """
+    Remove maintenance windows that are no longer needed: one-time windows that have ended (expired)
+    and windows that no monitor uses (orphaned). They are detached from their monitors first.
+
+    Usage: edwh uptime.maintenance-gc --dry-run
+
+    :param expired: remove one-time windows that have ended (--no-expired to keep them)
+    :param orphaned: remove windows without monitors (--no-orphaned to keep them)
+    :param dry_run: only list the windows that would be removed
+    :param yes: don't ask for confirmation
+    :param fresh: ignore locally cached data and fetch everything from the API
+    """
+    from .cleanup import cleanup_steps, find_stale_windows
+
+    skip_cache(fresh)
+    with uptime_robot.fresh():  # the monitors are edited with what is read here
+        windows = uptime_robot.get_m_windows() or []
+        monitors = uptime_robot.get_monitors(mwindows=1) if windows else []
+
+    stale = find_stale_windows(windows, monitors, expired=expired, orphaned=orphaned)
+    if not stale:
+        return cprint("No expired or orphaned maintenance windows found.", color="green")
+
+    for item in stale:
+        name = item.window.get("friendly_name", "")
+        print(f"{item.window['id']}: {name} ({item.reason}, {len(item.monitors)} monitors)")
+
+    if dry_run:
+        return
+    if not yes and not confirm(f"Remove these {len(stale)} maintenance windows? (y/N)"):
+        return cprint("Removal aborted.", color="red")
+
+    run = start_run("maintenance_gc", cleanup_steps(stale))
+    execute_run(run)
+    removed = sum(changed for idx, changed in run.changed.items() if run.steps[idx].action == "delete_mwindow")
+    cprint(f"Removed {removed} maintenance windows.", color="green")
+
+
+@task
+def resume(_: Context, run_id: str = ""):
+    """
+    Continue a bulk change (e.g. maintenance, unmaintenance-all, maintenance-gc) that was interrupted.
+    Only the steps that aren't done according to its journal are performed.
+
+    :param run_id: id of the run (printed when it started), defaults to the last unfinished one
+    """
+    from .bulk import BulkRun
+
+    run = BulkRun.find(run_id, unfinished=True)
+    if not run:
+        return cprint(f"No unfinished run {run_id} found.", color="red", file=sys.stderr)
+    if run.undone:
+        return cprint(f"{run.id} was rolled back.", color="red", file=sys.stderr)
+    if run.complete:
+        return cprint(f"{run.id} is already finished.", color="blue")
+
+    cprint(f"Resuming {run.id}: {len(run.pending)} of {len(run.steps)} steps left.", color="blue")
+    execute_run(run)
+
+
+@task
+def rollback(_: Context, run_id: str = "", yes: bool = False):
+    """
+    Undo the changes of a bulk run (maintenance, add-dashboard-to-maintenance, ...), also when it was interrupted.
+
+    :param run_id: id of the run (printed when it started), defaults to the last one
+    :param yes: don't ask for confirmation
+    """
+    from .bulk import BulkRun
+
+    run = BulkRun.find(run_id)
+    if not run:
+        return cprint(f"No run {run_id} found.", color="red", file=sys.stderr)
+
+    changed = sum(run.changed.values()) - len(run.undone)
+    if not yes and not confirm(f"Undo {changed} change(s) of {run.id} ({run.operation})? (y/N)"):
+        return cprint("Rollback aborted.", color="red")
+
+    rollback_run(run)
 
 
 @task
@@ -740,8 +1603,9 @@ def toggle_maintenance(_: Context, mwindow_id: int, status: int = None):
         if edit_status:
             return cprint(f"Activated: {mwindow_id}", color="green")
 
-    # Get window data
-    window_data = uptime_robot.get_m_window(mwindow_id)
+    # Get window data (from the API: it is sent back as a whole)
+    with uptime_robot.fresh():
+        window_data = uptime_robot.get_m_window(mwindow_id)
     if not window_data:
         return cprint(f"No maintenance window {mwindow_id} found.", color="red")
 
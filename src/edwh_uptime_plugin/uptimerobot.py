@@ -1,33 +1,59 @@
+import atexit
 import contextlib
 import datetime as dt
 import enum
 import json
+import os
 import sys
+import threading
+import time
 import typing
 import warnings
 from typing import Any, Optional
 
-import edwh
-import requests
-from edwh import check_env
-from edwh.helpers import interactive_selected_radio_value
 from termcolor import cprint
 from typing_extensions import NotRequired, Required
-from yayarl import URL
+
+from .cache import CACHED_ENDPOINTS, INVALIDATED_BY, namespace_for
+from .decoding import DecodeError, decode_response
+from .helpers import run_parallel
+from .memo import copied
+from .ratelimit import TokenBucket, parse_retry_after, plan_rate_limit
 
 if typing.TYPE_CHECKING:
+    # the HTTP stack (requests, yayarl) and edwh are only imported on first use, to keep the plugin cheap to load:
+    import requests
     from termcolor._types import Color
+    from yayarl import URL
+
+    from .cache import ResponseCache
+    from .memo import RequestMemo
+    from .stats import RequestStats
 
 AnyDict: typing.TypeAlias = dict[str, Any]
 
+DEFAULT_POOL_SIZE = 10
+DEFAULT_TIMEOUT = 30.0
+PAGE_SIZE = 50  # max 'limit' the API allows for paginated endpoints
+DEFAULT_PLAN = "free"
+DEFAULT_MAX_RETRIES = 5
+YEAR_3000 = 32504504418  # start_time for paused maintenance windows
+
+# the parameter that selects specific items by id, per paginated read endpoint:
+SELECTED_BY: dict[str, str] = {
+    "getMonitors": "monitors",
+    "getPSPs": "psps",
+    "getMWindows": "mwindows",
+}
+
 
 class UptimeRobotException(Exception):
     status_code: int
     message: str
-    response: requests.Response
+    response: "requests.Response"
     extra: Optional[Any]
 
-    def __init__(self, response: requests.Response, extra: Any = None):
+    def __init__(self, response: "requests.Response", extra: Any = None):
         self.response = response
         self.status_code = response.status_code
         self.message = response.text
@@ -66,6 +92,7 @@ class UptimeRobotDashboard(typing.TypedDict, total=False):
     status: int
     standard_url: str
     custom_url: str
+    account: str  # set when reading multiple accounts
 
 
 class UptimeRobotMaintenanceWindow(typing.TypedDict, total=False):
@@ -112,6 +139,7 @@ class UptimeRobotMonitor(typing.TypedDict, total=False):
     status: NotRequired[int]
     create_datetime: NotRequired[int]
     mwindows: NotRequired[list[UptimeRobotMaintenanceWindow]] | str
+    account: NotRequired[str]  # set when reading multiple accounts
 
 
 class MonitorType(enum.Enum):
@@ -123,20 +151,116 @@ class MonitorType(enum.Enum):
 
 
 class UptimeRobot:
-    base = URL("https://api.uptimerobot.com/v2/")
+    base = "https://api.uptimerobot.com/v2/"
 
     _api_key: str = ""  # cached version from .env
     _verbose: bool = False
 
+    def __init__(
+        self,
+        api_key: str = "",
+        base: "URL | str | None" = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeout: float = DEFAULT_TIMEOUT,
+        rate_limit: str | int | None = DEFAULT_PLAN,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        cache: "ResponseCache" = None,
+        stats: "RequestStats" = None,
+        memo: "RequestMemo" = None,
+    ):
+        """
+        :param api_key: optional API key, otherwise UPTIMEROBOT_APIKEY from .env is used (on first request)
+        :param base: optional other API root (e.g. a local stand-in server for tests)
+        :param pool_size: max amount of keep-alive connections kept open to the API
+        :param timeout: seconds to wait for the API before giving up on a request
+        :param rate_limit: plan name ('free', 'pro') or requests/minute to pace requests by; None to disable pacing.
+                           The budget is corrected by the X-RateLimit-* headers the API sends back.
+        :param max_retries: how often a rate limited (429) request is retried before UptimeRobotRatelimit is raised
+        :param cache: optional on-disk cache for monitors, dashboards and maintenance windows
+        :param stats: optional collector for per-endpoint request counts, latencies and sizes
+        :param memo: optional in-memory memo that answers repeated (and concurrent) identical reads
+        """
+        if api_key:
+            self._api_key = api_key
+        if base is not None:
+            self.base = str(base)
+
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.rate_limiter: Optional[TokenBucket] = None
+        self.set_rate_limit(rate_limit)
+        self.cache = cache
+        self.stats = stats
+        self.memo = memo
+
+        self._session: Optional["requests.Session"] = None
+        self._base_url: Optional["URL"] = None
+        self._lock = threading.Lock()
+        self._fresh = 0  # > 0 while reads bypass the on-disk cache, see fresh()
+        self._memo_from_cache = False  # whether the memo may hold responses that came from the on-disk cache
+        self._from_cache: set[str] = set()  # entities answered from the on-disk cache since they were invalidated
+
+    @property
+    def session(self) -> "requests.Session":
+        """
+        Persistent (keep-alive) HTTP session, shared by every request of this client.
+
+        The underlying urllib3 pool is thread-safe, so one client can be used from multiple threads.
+        """
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, pool_block=True)
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    self._session = session
+
+        return self._session
+
+    def url(self, endpoint: str) -> "URL":
+        if self._base_url is None:
+            from yayarl import URL
+
+            self._base_url = URL(self.base)
+
+        return self._base_url / endpoint
+
+    def close(self) -> None:
+        """
+        Close all pooled connections and the cache database. Both are reopened on the next request.
+        """
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+        if self.cache:
+            self.cache.close()
+
+    def __enter__(self) -> "UptimeRobot":
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.close()
+
     @property
     def api_key(self) -> str:
         if not self._api_key:
-            with contextlib.suppress(RuntimeError):
-                self._api_key = check_env(
-                    "UPTIMEROBOT_APIKEY",
-                    default="",
-                    comment="The API key used to manage UptimeRobot monitors.",
-                )
+            # lock: concurrent first requests (e.g. from AsyncUptimeRobot) should only prompt once
+            with self._lock, contextlib.suppress(RuntimeError):
+                if not self._api_key:
+                    from edwh import check_env
+
+                    self._api_key = check_env(
+                        "UPTIMEROBOT_APIKEY",
+                        default="",
+                        comment="The API key used to manage UptimeRobot monitors.",
+                    )
 
         return self._api_key
 
@@ -153,31 +277,217 @@ class UptimeRobot:
 
     def set_verbosity(self, verbose: bool = None) -> None:
         if verbose is None:
+            import edwh
+
             verbose = edwh.get_env_value("IS_DEBUG", "0") == "1"
 
         self._verbose = verbose
 
+    def set_rate_limit(self, plan: str | int | None = "") -> None:
+        """
+        :param plan: plan name or requests/minute. Empty: read UPTIMEROBOT_PLAN from .env, None: disable pacing.
+        """
+        if plan == "":
+            import edwh
+
+            plan = edwh.get_env_value("UPTIMEROBOT_PLAN", DEFAULT_PLAN)
+
+        self.rate_limiter = None if plan is None else TokenBucket(plan_rate_limit(plan))
+
+    def set_cache(self, enabled: bool = None) -> None:
+        """
+        :param enabled: use the on-disk response cache. None: enabled unless UPTIMEROBOT_CACHE=0 in .env
+        """
+        if enabled is None:
+            import edwh
+
+            enabled = edwh.get_env_value("UPTIMEROBOT_CACHE", "1") != "0"
+
+        from .cache import ResponseCache
+
+        self.cache = ResponseCache() if enabled else None
+
+    def set_stats(self, target: str = None) -> None:
+        """
+        :param target: '1' prints a per-endpoint summary to stderr on exit, a path ending in .json writes it there.
+                       None: read UPTIME_STATS from the environment or .env; empty/'0' disables collecting.
+        """
+        if target is None:
+            import edwh
+
+            target = os.environ.get("UPTIME_STATS") or edwh.get_env_value("UPTIME_STATS", "")
+
+        if not target or target == "0":
+            self.stats = None
+            return
+
+        from .stats import RequestStats
+
+        self.stats = RequestStats()
+        atexit.register(self.stats.report, target)
+
+    def set_memo(self, enabled: bool = True) -> None:
+        """
+        :param enabled: keep read responses in memory for as long as this client lives (e.g. one command)
+        """
+        from .memo import RequestMemo
+
+        self.memo = RequestMemo() if enabled else None
+
+    def invalidate_cache(self, *entities: str) -> None:
+        """
+        Forget cached 'monitors', 'psps' and/or 'mwindows' (everything if no entity is given).
+        """
+        if self.memo:
+            self.memo.invalidate(*entities)
+
+        if self.cache and self.api_key:
+            self.cache.invalidate(namespace_for(self.api_key), *entities)
+
+        if entities:
+            self._from_cache.difference_update(entities)
+        else:
+            self._from_cache.clear()
+
+    def answered_from_cache(self, entity: str) -> bool:
+        """
+        Whether (some of) the 'monitors', 'psps' or 'mwindows' this client returned came from the on-disk cache,
+        i.e. may be older than they look.
+        """
+        return entity in self._from_cache
+
+    @contextlib.contextmanager
+    def fresh(self) -> typing.Iterator["UptimeRobot"]:
+        """
+        Read from the API instead of the on-disk cache while the block runs (responses still refresh the cache).
+
+        For reads that feed writes: e.g. monitor_change_mwindows sends the complete set of windows,
+        so a cached monitor would undo changes made elsewhere in the meantime.
+        Applies to every thread that uses this client, e.g. the workers of a parallel bulk change.
+        """
+        with self._lock:
+            if not self._fresh and self._memo_from_cache and self.memo:
+                self.memo.invalidate()  # it may remember what the cache answered before
+                self._memo_from_cache = False
+            self._fresh += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._fresh -= 1
+
+    def _update_rate_limit(self, resp: "requests.Response") -> None:
+        """
+        Follow the X-RateLimit-Limit/Remaining/Reset headers, so the client paces at what the API actually allows.
+        """
+        if not self.rate_limiter:
+            return
+
+        headers = resp.headers
+        if (limit := headers.get("X-RateLimit-Limit", "")).isdigit():
+            self.rate_limiter.set_limit(int(limit))
+
+        if (remaining := headers.get("X-RateLimit-Remaining", "")).isdigit():
+            reset = headers.get("X-RateLimit-Reset", "")
+            reset_in = max(0.0, float(reset) - time.time()) if reset.isdigit() else None
+            self.rate_limiter.sync(int(remaining), reset_in)
+
+    def _retry_delay(self, resp: "requests.Response", attempt: int) -> float:
+        """
+        Seconds to wait after a 429: Retry-After, else until X-RateLimit-Reset, else exponential backoff.
+        """
+        if (delay := parse_retry_after(resp.headers.get("Retry-After"))) is not None:
+            return delay
+
+        if (reset := resp.headers.get("X-RateLimit-Reset", "")).isdigit():
+            return max(0.0, float(reset) - time.time())
+
+        return float(2**attempt)
+
     def _log(self, *args: Any) -> None:
         if not self._verbose:
             return
 
         print(*args, file=sys.stderr)
 
-    def _post(self, endpoint: str, **input_data: Any) -> UptimeRobotResponse:
+    def _post(self, endpoint: str, remember: bool = True, **input_data: Any) -> UptimeRobotResponse:
         """
+        :param remember: keep the response in the memo (if any), for reads that are done only once anyway
         :raise UptimeRobotError: if the request returns an error status code
+        :raise UptimeRobotRatelimit: if the request is still rate limited after `max_retries` retries
         """
         if not self.has_api_key:
             return {}
 
         input_data.setdefault("format", "json")
+
+        if remember and self.memo and (entity := CACHED_ENDPOINTS.get(endpoint)):
+            memo_key = json.dumps({"endpoint": endpoint, **input_data}, sort_keys=True, default=str)
+            output_data, memoized = self.memo.fetch(entity, memo_key, lambda: self._request(endpoint, input_data))
+            if memoized:
+                self._log("MEMO", endpoint, input_data)
+                if self.stats:
+                    self.stats.record_cached(endpoint)
+            return output_data
+
+        return self._request(endpoint, input_data)
+
+    def _request(self, endpoint: str, input_data: AnyDict) -> UptimeRobotResponse:
+        """
+        _post without the memo: answer from the on-disk cache or perform the HTTP request.
+        """
+        input_data = dict(input_data)
+
+        cache_key = ""
+        if self.cache and (entity := CACHED_ENDPOINTS.get(endpoint)):
+            cache_key = json.dumps({"endpoint": endpoint, **input_data}, sort_keys=True, default=str)
+            cached = None if self._fresh else self.cache.get(namespace_for(self.api_key), entity, cache_key)
+            if cached is not None:
+                self._log("CACHED", endpoint, input_data)
+                if self.stats:
+                    self.stats.record_cached(endpoint)
+                self._memo_from_cache = True
+                self._from_cache.add(entity)
+                return typing.cast(UptimeRobotResponse, cached)
+
         input_data["api_key"] = self.api_key
 
-        self._log("POST", self.base / endpoint, input_data)
+        self._log("POST", self.url(endpoint), input_data)
+
+        attempt = 0
+        while True:
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+
+            start = time.perf_counter()
+            resp = self.url(endpoint).post(session=self.session, json=input_data, timeout=self.timeout)
+
+            if self.stats:
+                self.stats.record(
+                    endpoint,
+                    time.perf_counter() - start,
+                    resp.status_code,
+                    request_bytes=len(resp.request.body or b"") if resp.request else 0,
+                    response_bytes=len(resp.content),
+                )
+
+            self._log("RESP", resp.__dict__)
+            self._update_rate_limit(resp)
 
-        resp = (self.base / endpoint).post(json=input_data)
+            if resp.status_code != 429 or attempt >= self.max_retries:
+                break
 
-        self._log("RESP", resp.__dict__)
+            delay = self._retry_delay(resp, attempt)
+            self._log("RATELIMIT", f"retrying {endpoint} in {delay:.1f}s")
+            if self.rate_limiter:
+                # hold back every other queued request too:
+                self.rate_limiter.pause(delay)
+            else:
+                time.sleep(delay)
+
+            attempt += 1
+            if self.stats:
+                self.stats.record_retry(endpoint)
 
         if not resp.ok:
             match resp.status_code:
@@ -187,13 +497,18 @@ class UptimeRobot:
                     raise UptimeRobotException(resp)
 
         try:
-            output_data = resp.json()  # type: UptimeRobotResponse
-        except json.JSONDecodeError as e:
+            output_data = decode_response(resp.content)
+        except DecodeError as e:
             raise UptimeRobotException(resp, str(e)) from e
 
         if output_data.get("stat") == "fail":
             raise UptimeRobotException(resp, output_data.get("error", output_data))
 
+        if cache_key:
+            self.cache.set(namespace_for(self.api_key), CACHED_ENDPOINTS[endpoint], cache_key, output_data)
+        elif stale := INVALIDATED_BY.get(endpoint):
+            self.invalidate_cache(*stale)
+
         return output_data
 
     @classmethod
@@ -212,15 +527,92 @@ class UptimeRobot:
 
         return resp.get("account", {})
 
-    def get_monitors(
-        self, search: str = "", monitor_ids: typing.Iterable[str | int] = (), mwindows=False
-    ) -> list[UptimeRobotMonitor]:
+    def _iter_page_lists(
+        self, endpoint: str, key: str, page_size: int = PAGE_SIZE, remember: bool = True, **input_data: Any
+    ) -> typing.Iterator[list[Any]]:
         """
-        Return all monitors as a list.
+        Walk the offset/limit pages of a paginated endpoint lazily, yielding the items under `key` per page.
+
+        The next page is only requested once the previous one is consumed,
+        so callers that stop early don't fetch the rest of the account.
+        """
+        offset = 0
+        while True:
+            resp = self._post(endpoint, remember=remember, offset=offset, limit=page_size, **input_data)
+            page = resp.get(key) or []
+            if page:
+                yield page
+
+            pagination: Optional[UptimeRobotPagination] = resp.get("pagination")
+            if not page or not pagination:
+                return
+
+            offset = pagination["offset"] + len(page)
+            if offset >= pagination["total"]:
+                return
+
+    def _iter_pages(
+        self, endpoint: str, key: str, page_size: int = PAGE_SIZE, remember: bool = True, **input_data: Any
+    ) -> typing.Iterator[Any]:
+        """
+        Like _iter_page_lists, but yield the items one by one.
+
+        With a memo, a complete listing is remembered, so later reads of some of its items (by id) need no request.
+
+        :param remember: False to keep the listing (a full dict per item) out of the memo, e.g. when the caller
+                         keeps only a few fields of it and reads nothing else afterwards
+        """
+        if not self.memo or not (entity := CACHED_ENDPOINTS.get(endpoint)):
+            for page in self._iter_page_lists(endpoint, key, page_size=page_size, **input_data):
+                yield from page
+            return
+
+        selection = input_data.pop(SELECTED_BY[endpoint], None)
+        listing_key = json.dumps({"endpoint": endpoint, **input_data}, sort_keys=True, default=str)
+
+        if (items := self.memo.listing(entity, listing_key)) is not None:
+            self._log("MEMO", endpoint, input_data, selection or "")
+            if self.stats:
+                self.stats.record_cached(endpoint)
+
+            wanted = None if selection is None else set(str(selection).split("-"))
+            yield from (_ for _ in items if wanted is None or str(_["id"]) in wanted)
+            return
+
+        if selection is not None or not remember:
+            if selection is not None:
+                input_data[SELECTED_BY[endpoint]] = selection
+            for page in self._iter_page_lists(endpoint, key, page_size=page_size, remember=remember, **input_data):
+                yield from page
+            return
+
+        generation = self.memo.generation(entity)
+        collected = []
+        for page in self._iter_page_lists(endpoint, key, page_size=page_size, **input_data):
+            collected.extend(page)
+            yield from copied(page)  # what the caller does with its items shouldn't end up in the listing
+
+        # only reached when the caller consumed every page:
+        self.memo.store_listing(entity, listing_key, collected, generation)
+
+    def iter_monitors(
+        self,
+        search: str = "",
+        monitor_ids: typing.Iterable[str | int] = (),
+        mwindows=False,
+        page_size: int = PAGE_SIZE,
+        remember: bool = True,
+        **options: Any,
+    ) -> typing.Iterator[UptimeRobotMonitor]:
+        """
+        Yield all monitors, page by page as they arrive from the API.
 
         :param mwindows: set True to also return the maintenance windows associated to the monitor
+        :param page_size: amount of monitors requested per API call (max 50)
+        :param remember: False to keep them out of the memo (when nothing reads them again during this command)
+        :param options: other getMonitors parameters, e.g. custom_uptime_ratios, response_times or logs
         """
-        data = {}
+        data = dict(options)
         if search:
             data["search"] = search
 
@@ -230,11 +622,17 @@ class UptimeRobot:
         if mwindows:
             data["mwindows"] = mwindows
 
-        result = self._post("getMonitors", **data).get("monitors")
-        if result is None:
-            return []
+        yield from self._iter_pages("getMonitors", "monitors", page_size=page_size, remember=remember, **data)
 
-        return result
+    def get_monitors(
+        self, search: str = "", monitor_ids: typing.Iterable[str | int] = (), mwindows=False
+    ) -> list[UptimeRobotMonitor]:
+        """
+        Return all monitors as a list.
+
+        :param mwindows: set True to also return the maintenance windows associated to the monitor
+        """
+        return list(self.iter_monitors(search, monitor_ids, mwindows=mwindows))
 
     def get_monitor(self, monitor_id: str, mwindows=False) -> Optional[UptimeRobotMonitor]:
         if monitors := self.get_monitors(monitor_ids=[monitor_id], mwindows=mwindows):
@@ -242,8 +640,14 @@ class UptimeRobot:
 
         return None
 
-    def new_monitor(self, friendly_name: str, url: str, monitor_type: MonitorType = MonitorType.HTTP) -> Optional[int]:
+    def new_monitor(
+        self, friendly_name: str, url: str, monitor_type: MonitorType = MonitorType.HTTP, **extra: Any
+    ) -> Optional[int]:
+        """
+        :param extra: other monitor fields to set right away (e.g. interval, mwindows)
+        """
         data = {
+            **extra,
             "friendly_name": friendly_name,
             "url": url,
             "type": monitor_type.value,
@@ -287,11 +691,7 @@ class UptimeRobot:
         if mwindow_id:
             data["mwindows"] = self.format_list(mwindow_id)
 
-        result = self._post("getMWindows", **data).get("mwindows")
-        if result is None:
-            return []
-
-        return result
+        return list(self._iter_pages("getMWindows", "mwindows", **data))
 
     def get_m_window(self, mwindow_id: int) -> Optional[UptimeRobotMaintenanceWindow]:
         """
@@ -330,28 +730,17 @@ class UptimeRobot:
         return resp.get("stat", "") == "ok"
 
     def clean_maintenance_windows(self) -> int:
-        removed = 0
-        for window in self._post("getMWindows").get("mwindows", []):
-            # you can't query on type directly so filter all non-once here:
-            if window["type"] != "once":
-                continue
+        # you can't query on type directly so filter all non-once here:
+        window_ids = [window["id"] for window in self.get_m_windows() or [] if window["type"] == "once"]
 
-            self.delete_maintenance_window(window["id"])
-            removed += 1
-
-        return removed
+        results = run_parallel(self.delete_maintenance_window, window_ids, workers=self.pool_size)
+        return sum(result is True for _, result in results)
 
     def get_psps(self) -> list[UptimeRobotDashboard]:
-        resp = self._post("getPSPs")
-
-        return resp.get("psps")
+        return list(self._iter_pages("getPSPs", "psps"))
 
     def get_psp(self, idx: str) -> UptimeRobotDashboard | None:
-        resp = self._post("getPSPs", psps=str(idx))
-
-        psps = resp.get("psps")
-
-        return psps[0] if psps else None
+        return next(self._iter_pages("getPSPs", "psps", psps=str(idx)), None)
 
     # def new_psp(self, psp_data):
     #     return self._post("newPSP", input_data=psp_data)
@@ -388,6 +777,8 @@ class UptimeRobot:
         if not dashboard_ids:
             return cprint("No dashboards available!", color="red", file=sys.stderr)
         else:
+            from edwh.helpers import interactive_selected_radio_value
+
             return interactive_selected_radio_value(
                 dashboard_ids,
                 allow_empty=allow_empty,
@@ -432,6 +823,10 @@ class LazyUptimeRobot:
         if self._instance is None:
             self._instance = UptimeRobot()
             self._instance.set_verbosity()  # uses 'edwh.get_env_value', which warns if dc.yml is missing
+            self._instance.set_rate_limit()
+            self._instance.set_cache()
+            self._instance.set_stats()
+            self._instance.set_memo()  # one CLI command = one client, so reads can be shared for its whole run
         return getattr(self._instance, item)
 
 
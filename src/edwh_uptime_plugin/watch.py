@@ -0,0 +1,119 @@
+"""
+Poll monitor statuses and report only what changed, e.g. during an incident.
+"""
+
+import math
+import time
+import typing
+
+from .uptimerobot import PAGE_SIZE, UptimeRobot, UptimeRobotMonitor
+
+DEFAULT_INTERVAL = 60.0  # seconds between polls while everything is up
+DEFAULT_FAST_INTERVAL = 15.0  # while something is down
+DOWN_STATUSES = (8, 9)
+
+
+class Transition(typing.NamedTuple):
+    monitor: UptimeRobotMonitor
+    before: int | None  # None: new monitor
+    after: int | None  # None: monitor was removed
+
+
+class StatusWatcher:
+    """
+    Poll getMonitors on an adaptive interval and diff the statuses against the previous poll.
+
+    The interval is never shorter than what the client's rate limit allows for a full fetch of all pages,
+    and the time in between is spent sleeping.
+    """
+
+    def __init__(
+        self,
+        client: UptimeRobot,
+        search: str = "",
+        interval: float = DEFAULT_INTERVAL,
+        fast_interval: float = DEFAULT_FAST_INTERVAL,
+        sleep: typing.Callable[[float], None] = time.sleep,
+        on_poll: typing.Callable[[list[UptimeRobotMonitor]], None] = None,
+    ):
+        """
+        :param on_poll: called with all monitors after every poll (e.g. to record them)
+        """
+        self.client = client
+        self.search = search
+        self.interval = interval
+        self.fast_interval = min(fast_interval, interval)
+        self._sleep = sleep
+        self._on_poll = on_poll
+
+        self.statuses: dict[int, int] = {}
+        self.monitors: dict[int, UptimeRobotMonitor] = {}
+        self.polls = 0
+
+    @property
+    def down(self) -> list[UptimeRobotMonitor]:
+        return [self.monitors[_] for _, status in self.statuses.items() if status in DOWN_STATUSES]
+
+    def poll(self) -> list[Transition]:
+        # statuses are what we're after, so never answer from the local cache:
+        self.client.invalidate_cache("monitors")
+        monitors = {int(_["id"]): _ for _ in self.client.iter_monitors(self.search)}
+
+        transitions = []
+        if self.polls:
+            for monitor_id, monitor in monitors.items():
+                before = self.statuses.get(monitor_id)
+                if before != monitor["status"]:
+                    transitions.append(Transition(monitor, before, monitor["status"]))
+
+            transitions.extend(
+                Transition(monitor, self.statuses[monitor_id], None)
+                for monitor_id, monitor in self.monitors.items()
+                if monitor_id not in monitors
+            )
+
+        self.monitors = monitors
+        self.statuses = {monitor_id: _["status"] for monitor_id, _ in monitors.items()}
+        self.polls += 1
+
+        if self._on_poll:
+            self._on_poll(list(monitors.values()))
+
+        return transitions
+
+    def min_interval(self) -> float:
+        """
+        Seconds one full poll costs from the rate limit budget.
+        """
+        if not (limiter := self.client.rate_limiter) or not limiter.per_minute:
+            return 0.0
+
+        pages = max(1, math.ceil(len(self.monitors) / PAGE_SIZE))
+        return pages * 60 / limiter.per_minute
+
+    def next_interval(self) -> float:
+        wanted = self.fast_interval if self.down else self.interval
+        return max(wanted, self.min_interval())
+
+    def run(
+        self,
+        on_change: typing.Callable[[Transition], None],
+        polls: int = 0,
+        on_start: typing.Callable[[], None] = None,
+    ) -> None:
+        """
+        :param on_change: called for every status transition (not for the initial state)
+        :param polls: stop after this many polls (0: until interrupted)
+        :param on_start: called once the initial state is known
+        """
+        while True:
+            for transition in self.poll():
+                on_change(transition)
+
+            if on_start and self.polls == 1:
+                on_start()
+
+            if polls and self.polls >= polls:
+                return
+
+            self._sleep(self.next_interval())
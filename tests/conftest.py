@@ -0,0 +1,38 @@
+import pytest
+
+from src.edwh_uptime_plugin import tasks
+from src.edwh_uptime_plugin.uptimerobot import UptimeRobot, uptime_robot
+
+from .fake_uptimerobot import FakeUptimeRobotServer
+
+
+@pytest.fixture(autouse=True)
+def local_data(tmp_path, monkeypatch):
+    """
+    Keep the status history that tasks record out of the real user data directory,
+    and read from the single (fake) account unless a test configures more.
+    """
+    monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path / "data"))
+    monkeypatch.delenv("UPTIME_HISTORY", raising=False)
+    monkeypatch.delenv("UPTIMEROBOT_ACCOUNTS", raising=False)
+    monkeypatch.setattr(tasks, "_accounts", None)
+
+
+@pytest.fixture
+def server():
+    """
+    Local stand-in for the UptimeRobot API, empty until a test seeds it.
+    """
+    with FakeUptimeRobotServer() as server:
+        yield server
+
+
+@pytest.fixture
+def client(server, monkeypatch):
+    """
+    Client of the stand-in server, which the global `uptime_robot` (used by every task) points to as well.
+    """
+    with UptimeRobot(api_key="fake", base=server.base) as client:
+        monkeypatch.setattr(uptime_robot, "_instance", client)
+        monkeypatch.setattr(tasks, "_monitor_index", None)
+        yield client
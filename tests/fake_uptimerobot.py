@@ -0,0 +1,397 @@
+"""
+Local stand-in for the UptimeRobot v2 API, used by the offline tests and benchmarks.
+
+Covers the monitor, maintenance window (MWindow) and dashboard (PSP) endpoints, pagination and rate limiting,
+and can be seeded with synthetic accounts of any size.
+"""
+
+import json
+import threading
+import time
+import typing
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+AnyDict = dict[str, typing.Any]
+
+MWINDOW_TYPES = {1: "once", 2: "daily", 3: "weekly", 4: "monthly"}
+
+
+class FakeUptimeRobotHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 so clients can keep connections alive:
+    protocol_version = "HTTP/1.1"
+    # headers and body are written separately, don't let delayed ACKs stall keep-alive connections:
+    disable_nagle_algorithm = True
+    server: "FakeUptimeRobotServer"
+
+    def setup(self) -> None:
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, *_: typing.Any) -> None:
+        # keep pytest output clean
+        return
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        endpoint = self.path.rstrip("/").rsplit("/", 1)[-1]
+
+        with self.server.lock:
+            self.server.requests.append((endpoint, payload))
+
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        allowed, headers = self.server.admit()
+        if allowed:
+            status_code = 200
+            body = json.dumps(self.server.respond(endpoint, payload)).encode()
+        else:
+            status_code = 429
+            body = b'{"stat": "fail", "error": {"type": "rate_limit", "message": "Too Many Requests"}}'
+
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        for header, value in headers.items():
+            self.send_header(header, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FakeUptimeRobotServer(ThreadingHTTPServer):
+    """
+    Serves the UptimeRobot API on localhost and keeps track of connections and requests.
+
+    Usage:
+        with FakeUptimeRobotServer() as server:
+            client = UptimeRobot(api_key="fake", base=server.base)
+    """
+
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), FakeUptimeRobotHandler)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.requests: list[tuple[str, AnyDict]] = []
+        self.monitors: list[AnyDict] = []
+        self.psps: list[AnyDict] = []
+        self.mwindows: list[AnyDict] = []
+        self.monitor_mwindows: dict[int, set[int]] = defaultdict(set)
+        self._last_id = 790000000
+        self.rate_limit = 5000
+        self.enforced = False
+        self.window_seconds = 60.0
+        self._window_end = 0.0
+        self._window_used = 0
+        self.pending_429s = 0
+        self.rejected = 0
+        self.retry_after = "0"
+        self.latency = 0.0  # seconds every request takes, e.g. for a far away account
+        self._thread: typing.Optional[threading.Thread] = None
+
+    @property
+    def base(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v2/"
+
+    def seed_monitors(self, amount: int, statuses: typing.Callable[[int], int] = lambda _: 2) -> list[AnyDict]:
+        """
+        Add `amount` synthetic HTTP monitors.
+
+        :param statuses: status code per monitor index (default: everything up)
+        """
+        start = len(self.monitors)
+        for idx in range(start, start + amount):
+            self.monitors.append(
+                {
+                    "id": 780000000 + idx,
+                    "friendly_name": f"site{idx}",
+                    "url": f"https://site{idx}.example.com/",
+                    "type": 1,
+                    "interval": 300,
+                    "status": statuses(idx),
+                    "create_datetime": 1700000000 + idx,
+                }
+            )
+        return self.monitors
+
+    def seed_account(self, monitors: int, dashboards: int = 2, dashboard_size: int = 60, mwindows: int = 3) -> None:
+        """
+        Fill the account with a realistic mix: some monitors (seem) down or paused,
+        a few dashboards and recurring + one-time maintenance windows attached to some monitors.
+        """
+
+        def status(idx: int) -> int:
+            if idx % 50 == 49:
+                return 0
+            if idx % 20 == 19:
+                return 9
+            if idx % 37 == 36:
+                return 8
+            return 2
+
+        self.seed_monitors(monitors, statuses=status)
+
+        for idx in range(dashboards):
+            members = self.monitors[idx * dashboard_size : (idx + 1) * dashboard_size]
+            self.seed_dashboard(f"Dashboard {idx}", [_["id"] for _ in members])
+
+        for idx in range(mwindows):
+            window = self.seed_mwindow(f"window {idx}", window_type=1 if idx % 2 else 2)
+            for monitor in self.monitors[idx::10]:
+                self.monitor_mwindows[monitor["id"]].add(window["id"])
+
+    def enforce_rate_limit(self, per_window: int, window_seconds: float = 60.0) -> None:
+        """
+        Like the real API: answer with 429 once `per_window` requests were made in the current window.
+        """
+        self.rate_limit = per_window
+        self.window_seconds = window_seconds
+        self.enforced = True
+
+    def admit(self) -> tuple[bool, dict[str, str]]:
+        """
+        Count a request against the rate limit. Returns whether it's allowed + the rate limit headers.
+        """
+        with self.lock:
+            now = time.monotonic()
+            if now >= self._window_end:
+                self._window_end = now + self.window_seconds
+                self._window_used = 0
+
+            forced = self.pending_429s > 0
+            self.pending_429s -= forced
+
+            allowed = not forced and (not self.enforced or self._window_used < self.rate_limit)
+            self._window_used += allowed
+            self.rejected += not allowed
+            reset_in = self._window_end - now
+
+            # the API advertises requests per minute, also when the emulated window is shorter:
+            headers = {"X-RateLimit-Limit": str(int(self.rate_limit * 60 / self.window_seconds))}
+            if self.enforced:
+                headers["X-RateLimit-Remaining"] = str(max(0, self.rate_limit - self._window_used))
+                headers["X-RateLimit-Reset"] = str(int(time.time() + reset_in))
+            if not allowed:
+                headers["Retry-After"] = self.retry_after if forced else f"{reset_in:.3f}"
+
+        return allowed, headers
+
+    def seed_dashboard(self, friendly_name: str, monitor_ids: typing.Iterable[int]) -> AnyDict:
+        psp = {
+            "id": 900000 + len(self.psps),
+            "friendly_name": friendly_name,
+            "monitors": [int(_) for _ in monitor_ids],
+            "sort": 1,
+            "status": 1,
+            "standard_url": "https://stats.uptimerobot.com/fake",
+            "custom_url": "",
+        }
+        self.psps.append(psp)
+        return psp
+
+    def seed_mwindow(self, friendly_name: str, window_type: int = 1, duration: int = 60) -> AnyDict:
+        self._last_id += 1
+        mwindow = {
+            "id": self._last_id,
+            "friendly_name": friendly_name,
+            "type": MWINDOW_TYPES.get(window_type, window_type),
+            "start_time": 0,
+            "duration": duration,
+            "status": 1,
+        }
+        self.mwindows.append(mwindow)
+        return mwindow
+
+    @staticmethod
+    def paginate(key: str, items: list[AnyDict], payload: AnyDict) -> AnyDict:
+        offset = int(payload.get("offset", 0))
+        limit = min(int(payload.get("limit", 50)), 50)
+        return {
+            "stat": "ok",
+            "pagination": {"offset": offset, "limit": limit, "total": len(items)},
+            key: items[offset : offset + limit],
+        }
+
+    @staticmethod
+    def not_found(message: str) -> AnyDict:
+        return {"stat": "fail", "error": {"type": "not_found", "message": message}}
+
+    @staticmethod
+    def parse_ids(value: typing.Any) -> set[int]:
+        return {int(_) for _ in str(value).split("-") if _}
+
+    @staticmethod
+    def editable(payload: AnyDict) -> AnyDict:
+        return {k: v for k, v in payload.items() if k not in ("id", "api_key", "format")}
+
+    def find(self, items: list[AnyDict], idx: typing.Any) -> AnyDict | None:
+        return next((_ for _ in items if str(_["id"]) == str(idx)), None)
+
+    def respond(self, endpoint: str, payload: AnyDict) -> AnyDict:
+        with self.lock:
+            if handler := getattr(self, f"api_{endpoint}", None):
+                return handler(payload)
+
+        return self.not_found(f"Unknown endpoint {endpoint}")
+
+    def api_getAccountDetails(self, _: AnyDict) -> AnyDict:
+        return {"stat": "ok", "account": {"email": "fake@example.com", "firstname": "EDWH-pytest"}}
+
+    def api_getMonitors(self, payload: AnyDict) -> AnyDict:
+        monitors = self.monitors
+        if search := payload.get("search"):
+            monitors = [_ for _ in monitors if search in _["url"] or search in _["friendly_name"]]
+        if ids := payload.get("monitors"):
+            wanted = self.parse_ids(ids)
+            monitors = [_ for _ in monitors if _["id"] in wanted]
+        response = self.paginate("monitors", monitors, payload)
+        if payload.get("mwindows"):
+            response["monitors"] = [
+                {**_, "mwindows": [self.find(self.mwindows, w) for w in sorted(self.monitor_mwindows[_["id"]])]}
+                for _ in response["monitors"]
+            ]
+        if any(payload.get(_) for _ in ("custom_uptime_ratios", "response_times", "logs")):
+            response["monitors"] = [{**_, **self.sla_fields(_, payload)} for _ in response["monitors"]]
+        return response
+
+    @staticmethod
+    def sla_fields(monitor: AnyDict, payload: AnyDict) -> AnyDict:
+        """
+        Deterministic uptime ratios, response times and down/up logs per monitor.
+
+        Every 10th monitor had `id % 3 + 1` incidents of 10 minutes each.
+        """
+        fields: AnyDict = {}
+        now = int(time.time())
+        incidents = monitor["id"] % 3 + 1 if monitor["id"] % 10 == 0 else 0
+
+        if periods := payload.get("custom_uptime_ratios"):
+            ratios = []
+            for days in str(periods).split("-"):
+                ratios.append(f"{100 - incidents * 600 / (int(days) * 86400) * 100:.3f}")
+            fields["custom_uptime_ratio"] = "-".join(ratios)
+
+        if payload.get("response_times"):
+            start = int(payload.get("response_times_start_date", now - 86400))
+            end = int(payload.get("response_times_end_date", now))
+            step = max(1, int(payload.get("response_times_average", 60))) * 60
+            fields["response_times"] = [
+                {"datetime": timestamp, "value": 100 + (monitor["id"] + timestamp // step) % 50}
+                for timestamp in range(end, start, -step)
+            ]
+            fields["average_response_time"] = "124.500"
+
+        if payload.get("logs"):
+            end = int(payload.get("logs_end_date", now))
+            logs = []
+            for idx in range(incidents):
+                down = end - (idx + 1) * 86400
+                logs.append({"type": 2, "datetime": down + 600, "duration": 86400 - 600})
+                logs.append({"type": 1, "datetime": down, "duration": 600, "reason": {"code": "522"}})
+            fields["logs"] = logs
+
+        return fields
+
+    def api_newMonitor(self, payload: AnyDict) -> AnyDict:
+        self._last_id += 1
+        fields = self.editable(payload)
+        if "mwindows" in fields:
+            self.monitor_mwindows[self._last_id] = self.parse_ids(fields.pop("mwindows"))
+        monitor = {"id": self._last_id, "status": 1, "interval": 300, **fields}
+        self.monitors.append(monitor)
+        return {"stat": "ok", "monitor": {"id": monitor["id"], "status": 1}}
+
+    def api_editMonitor(self, payload: AnyDict) -> AnyDict:
+        if not (monitor := self.find(self.monitors, payload.get("id"))):
+            return self.not_found("Monitor not found.")
+
+        changes = self.editable(payload)
+        if "mwindows" in changes:
+            self.monitor_mwindows[monitor["id"]] = self.parse_ids(changes.pop("mwindows"))
+        monitor.update(changes)
+        return {"stat": "ok", "monitor": {"id": monitor["id"]}}
+
+    def api_deleteMonitor(self, payload: AnyDict) -> AnyDict:
+        if not (monitor := self.find(self.monitors, payload.get("id"))):
+            return self.not_found("Monitor not found.")
+
+        self.monitors.remove(monitor)
+        self.monitor_mwindows.pop(monitor["id"], None)
+        return {"stat": "ok", "monitor": {"id": monitor["id"]}}
+
+    def api_resetMonitor(self, payload: AnyDict) -> AnyDict:
+        if not (monitor := self.find(self.monitors, payload.get("id"))):
+            return self.not_found("Monitor not found.")
+        return {"stat": "ok", "monitor": {"id": monitor["id"]}}
+
+    def api_getMWindows(self, payload: AnyDict) -> AnyDict:
+        mwindows = self.mwindows
+        if ids := payload.get("mwindows"):
+            wanted = self.parse_ids(ids)
+            mwindows = [_ for _ in mwindows if _["id"] in wanted]
+        return self.paginate("mwindows", mwindows, payload)
+
+    def api_newMWindow(self, payload: AnyDict) -> AnyDict:
+        mwindow = self.seed_mwindow(payload["friendly_name"], int(payload["type"]), int(payload.get("duration", 0)))
+        mwindow["start_time"] = int(payload.get("start_time", 0))
+        return {"stat": "ok", "mwindow": {"id": mwindow["id"], "status": 1}}
+
+    def api_editMWindow(self, payload: AnyDict) -> AnyDict:
+        if not (mwindow := self.find(self.mwindows, payload.get("id"))):
+            return self.not_found("Maintenance window not found.")
+
+        mwindow.update(self.editable(payload))
+        return {"stat": "ok", "mwindow": {"id": mwindow["id"]}}
+
+    def api_deleteMWindow(self, payload: AnyDict) -> AnyDict:
+        if not (mwindow := self.find(self.mwindows, payload.get("id"))):
+            return self.not_found("Maintenance window not found.")
+
+        self.mwindows.remove(mwindow)
+        for mwindow_ids in self.monitor_mwindows.values():
+            mwindow_ids.discard(mwindow["id"])
+        return {"stat": "ok", "mwindow": {"id": mwindow["id"]}}
+
+    def api_getPSPs(self, payload: AnyDict) -> AnyDict:
+        psps = self.psps
+        if ids := payload.get("psps"):
+            wanted = self.parse_ids(ids)
+            psps = [_ for _ in psps if _["id"] in wanted]
+        return self.paginate("psps", psps, payload)
+
+    def api_editPSP(self, payload: AnyDict) -> AnyDict:
+        if not (psp := self.find(self.psps, payload.get("id"))):
+            return self.not_found("Dashboard not found.")
+
+        changes = self.editable(payload)
+        if "monitors" in changes:
+            changes["monitors"] = sorted(self.parse_ids(changes["monitors"]))
+        psp.update(changes)
+        return {"stat": "ok", "psp": {"id": psp["id"]}}
+
+    def ratelimit_next(self, amount: int, retry_after: str = "0") -> None:
+        """
+        Answer the next `amount` requests with '429 Too Many Requests'.
+        """
+        self.pending_429s = amount
+        self.retry_after = retry_after
+
+    def reset_counters(self) -> None:
+        with self.lock:
+            self.connections = 0
+            self.requests.clear()
+
+    def __enter__(self) -> "FakeUptimeRobotServer":
+        # short poll interval so shutdown() doesn't stall every test:
+        self._thread = threading.Thread(target=self.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_: typing.Any) -> None:
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,119 @@
+import contextlib
+import json
+import time
+
+import pytest
+from invoke import Context
+
+from src.edwh_uptime_plugin import tasks
+from src.edwh_uptime_plugin.accounts import Accounts, setting_for
+from src.edwh_uptime_plugin.memo import RequestMemo
+from src.edwh_uptime_plugin.uptimerobot import UptimeRobot
+
+from .fake_uptimerobot import FakeUptimeRobotServer
+
+
+@pytest.fixture
+def servers():
+    with contextlib.ExitStack() as stack:
+        servers = {name: stack.enter_context(FakeUptimeRobotServer()) for name in ("alpha", "beta", "gamma")}
+        for idx, server in enumerate(servers.values()):
+            server.seed_account(100 + idx * 25, dashboards=1, dashboard_size=10)
+        yield servers
+
+
+@pytest.fixture
+def accounts(servers):
+    accounts = Accounts({name: UptimeRobot(api_key=name, base=_.base, rate_limit=None) for name, _ in servers.items()})
+    yield accounts
+    accounts.close()
+
+
+def test_setting_for():
+    assert setting_for("UPTIMEROBOT_APIKEY", "cluster-a") == "UPTIMEROBOT_APIKEY_CLUSTER_A"
+
+
+def test_from_env(monkeypatch):
+    monkeypatch.setenv("UPTIMEROBOT_ACCOUNTS", "cluster-a, cluster-b")
+    monkeypatch.setenv("UPTIMEROBOT_APIKEY_CLUSTER_A", "key-a")
+    monkeypatch.setenv("UPTIMEROBOT_APIKEY_CLUSTER_B", "key-b")
+    monkeypatch.setenv("UPTIMEROBOT_PLAN_CLUSTER_B", "600")
+
+    template = UptimeRobot(api_key="default", base="http://localhost:1/v2/", cache=None)
+    accounts = Accounts.from_env(template)
+
+    a, b = accounts.clients["cluster-a"], accounts.clients["cluster-b"]
+    assert (a.api_key, b.api_key) == ("key-a", "key-b")
+    assert a.base == b.base == template.base
+    # separate budgets and pools:
+    assert a.rate_limiter is not b.rate_limiter
+    assert b.rate_limiter.per_minute == 600
+    assert a.session is not b.session
+
+    monkeypatch.delenv("UPTIMEROBOT_ACCOUNTS")
+    assert not Accounts.from_env(template)
+
+
+def test_from_env_with_memo(monkeypatch):
+    monkeypatch.setenv("UPTIMEROBOT_ACCOUNTS", "cluster-a,cluster-b")
+    monkeypatch.setenv("UPTIMEROBOT_APIKEY_CLUSTER_A", "key-a")
+    monkeypatch.setenv("UPTIMEROBOT_APIKEY_CLUSTER_B", "key-b")
+
+    template = UptimeRobot(api_key="default", base="http://localhost:1/v2/", cache=None, memo=RequestMemo())
+    accounts = Accounts.from_env(template)
+
+    a, b = accounts.clients["cluster-a"], accounts.clients["cluster-b"]
+    # every account memoizes, but not in the template's memo nor in each other's:
+    assert a.memo is not None and b.memo is not None
+    assert len({id(template.memo), id(a.memo), id(b.memo)}) == 3
+
+
+def test_fan_out_merges_and_tags(accounts, servers):
+    monitors = accounts.get_monitors()
+
+    assert len(monitors) == sum(len(_.monitors) for _ in servers.values())
+    assert {_["account"] for _ in monitors} == set(servers)
+    assert len([_ for _ in monitors if _["account"] == "beta"]) == len(servers["beta"].monitors)
+
+    dashboards = accounts.get_psps()
+    assert sorted(_["account"] for _ in dashboards) == ["alpha", "beta", "gamma"]
+
+
+def test_fan_out_is_concurrent(accounts, servers):
+    for server in servers.values():
+        server.latency = 0.1
+
+    began = time.perf_counter()
+    accounts.get_monitors()
+    seconds = time.perf_counter() - began
+
+    requests = [len(_.requests) for _ in servers.values()]
+    assert requests == [2, 3, 3]
+    # as slow as the slowest account (3 pages), not as all of them together (8 pages):
+    assert seconds < sum(requests) * 0.1 * 0.75
+
+
+def test_failing_account_does_not_stop_the_others(accounts, servers, capsys):
+    accounts.clients["broken"] = UptimeRobot(api_key="broken", base="http://127.0.0.1:1/v2/", rate_limit=None)
+
+    monitors = accounts.get_monitors()
+
+    assert len(monitors) == sum(len(_.monitors) for _ in servers.values())
+    assert list(accounts.errors) == ["broken"]
+    assert "Account broken failed" in capsys.readouterr().err
+
+
+def test_read_tasks_use_all_accounts(accounts, servers, monkeypatch, capsys):
+    monkeypatch.setattr(tasks, "_accounts", accounts)
+
+    tasks.list_statuses(Context(), fmt="json")
+    statuses = json.loads(capsys.readouterr().out)["statuses"]
+    assert sorted(statuses) == sorted(servers)
+    assert len(statuses["gamma"]) == len(servers["gamma"].monitors)
+
+    tasks.list_down(Context(), fmt="ndjson")
+    lines = [json.loads(_) for _ in capsys.readouterr().out.splitlines()]
+    assert lines and all(_["account"] in servers for _ in lines)
+
+    tasks.list_down(Context())
+    assert "- [alpha] https://" in capsys.readouterr().out
@@ -0,0 +1,259 @@
+"""
+End-to-end benchmark of every `edwh uptime.*` task against the local stand-in server.
+
+Records wall time and the amount of API requests per task and account size,
+and fails when a task needs more requests than its budget (e.g. an N+1 pattern sneaking in).
+
+UPTIME_BENCHMARK_SIZES=10,1000,10000  account sizes (amount of monitors) to run against
+UPTIME_BENCHMARK_JSON=path.json       also write the results to a JSON file
+"""
+
+import builtins
+import json
+import math
+import os
+import tempfile
+import time
+import typing
+from collections import Counter
+from dataclasses import dataclass
+
+import invoke
+import pytest
+import tomli_w
+from invoke import Context
+
+from src.edwh_uptime_plugin import tasks
+from src.edwh_uptime_plugin.bulk import BulkRun, Step
+from src.edwh_uptime_plugin.memo import RequestMemo
+from src.edwh_uptime_plugin.uptimerobot import UptimeRobot, uptime_robot
+
+from .fake_uptimerobot import FakeUptimeRobotServer
+
+SIZES = [int(_) for _ in os.environ.get("UPTIME_BENCHMARK_SIZES", "10,1000,10000").split(",")]
+DASHBOARD_SIZE = 60
+
+
+def pages(amount: int) -> int:
+    return max(1, math.ceil(amount / 50))
+
+
+@dataclass
+class Scenario:
+    run: typing.Callable[[Context, FakeUptimeRobotServer], typing.Any]
+    budget: typing.Callable[[int], int]  # max requests for an account of n monitors
+
+
+def dashboard_size(n: int) -> int:
+    return min(n, DASHBOARD_SIZE)
+
+
+def run_maintenance(ctx: Context, server: FakeUptimeRobotServer) -> None:
+    tasks.maintenance(ctx, "release", dashboard_id=server.psps[0]["id"])
+
+
+def run_auto_add(ctx: Context, _: FakeUptimeRobotServer) -> None:
+    hosts = [f"site{idx}.example.com" for idx in range(2)] + [f"new{idx}.example.com" for idx in range(5)]
+    ctx.compose = {"services": {"web": {"hosts": hosts}}}
+    tasks.auto_add(ctx, force=True)
+
+
+def run_sync(ctx: Context, server: FakeUptimeRobotServer) -> None:
+    # everything stays, except 5 changed intervals, 3 new monitors and one dashboard that gets the new ones:
+    monitors = [{"url": _["url"], "interval": 60 if idx < 5 else 300} for idx, _ in enumerate(server.monitors)]
+    new = [f"https://new{idx}.example.com" for idx in range(3)]
+    state = {
+        "monitors": monitors + [{"url": _} for _ in new],
+        "dashboards": [{"friendly_name": server.psps[0]["friendly_name"], "monitors": new}],
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "uptime.toml")
+        with open(path, "w") as f:
+            f.write(tomli_w.dumps(state))
+        tasks.sync(ctx, path, yes=True)
+
+
+def first_once_window(server: FakeUptimeRobotServer) -> int:
+    return next(_["id"] for _ in server.mwindows if _["type"] == "once")
+
+
+def interrupted_run(server: FakeUptimeRobotServer) -> int:
+    """
+    Journal of linking a window to the first dashboard that stopped halfway. Returns the amount of steps done.
+    """
+    window = first_once_window(server)
+    monitor_ids = server.psps[0]["monitors"]
+    done = len(monitor_ids) // 2
+    for monitor_id in monitor_ids[:done]:
+        server.monitor_mwindows[monitor_id].add(window)
+
+    steps = [Step("attach_mwindow", {"window": window, "monitor": _}) for _ in monitor_ids]
+    BulkRun.plan("add_dashboard_to_maintenance", steps, done=range(done))
+    return done
+
+
+def run_resume(ctx: Context, server: FakeUptimeRobotServer) -> None:
+    interrupted_run(server)
+    tasks.resume(ctx)
+
+
+def run_rollback(ctx: Context, server: FakeUptimeRobotServer) -> None:
+    interrupted_run(server)
+    tasks.rollback(ctx, yes=True)
+
+
+SCENARIOS: dict[str, Scenario] = {
+    "auto_add_to_dashboard": Scenario(
+        lambda ctx, server: tasks.auto_add_to_dashboard(
+            ctx, [_["id"] for _ in server.monitors[-3:]], dashboard_id=server.psps[0]["id"]
+        ),
+        lambda n: pages(n) + 2,
+    ),
+    "auto_add": Scenario(run_auto_add, lambda n: pages(n) + 5 + 2),
+    "sync": Scenario(run_sync, lambda n: pages(n) + 2 + min(n, 5) + 3 + 1),
+    "watch": Scenario(lambda ctx, _: tasks.watch(ctx, interval=0, fast_interval=0, polls=3), lambda n: 3 * pages(n)),
+    "exporter": Scenario(lambda ctx, _: tasks.exporter(ctx, port=0, interval=0, polls=2), lambda n: 2 * (pages(n) + 1)),
+    "history": Scenario(lambda ctx, _: tasks.history(ctx), lambda _: 0),  # local data only
+    "sla_report": Scenario(lambda ctx, _: tasks.sla_report(ctx, days=90), lambda n: pages(n) + 1),
+    "status": Scenario(lambda ctx, _: tasks.status(ctx, "site5.example.com"), pages),
+    "monitors_verbose": Scenario(lambda ctx, _: tasks.monitors_verbose(ctx), pages),
+    "list_statuses": Scenario(lambda ctx, _: tasks.list_statuses(ctx), pages),
+    "list_up": Scenario(lambda ctx, _: tasks.list_up(ctx), pages),
+    "list_down": Scenario(lambda ctx, _: tasks.list_down(ctx), pages),
+    "add": Scenario(lambda ctx, _: tasks.add(ctx, "https://brand-new.example.org"), lambda n: pages(n) + 1),
+    "remove": Scenario(lambda ctx, _: tasks.remove(ctx, "site5.example.com"), lambda n: pages(n) + 1),
+    "edit": Scenario(
+        lambda ctx, _: tasks.edit(ctx, "site5.example.com", friendly_name="renamed"), lambda n: pages(n) + 1
+    ),
+    "reset": Scenario(lambda ctx, _: tasks.reset(ctx, "site5.example.com"), lambda n: pages(n) + 1),
+    "account": Scenario(lambda ctx, _: tasks.account(ctx), lambda _: 1),
+    "dashboards": Scenario(lambda ctx, _: tasks.dashboards(ctx), lambda _: 1),
+    "dashboard": Scenario(
+        lambda ctx, server: tasks.dashboard(ctx, server.psps[0]["id"]), lambda n: 1 + pages(dashboard_size(n))
+    ),
+    "edit_dashboard": Scenario(
+        lambda ctx, server: tasks.edit_dashboard(ctx, server.psps[0]["id"], friendly_name="renamed"),
+        lambda n: pages(n) + 2,
+    ),
+    "maintenance": Scenario(run_maintenance, lambda n: dashboard_size(n) + pages(dashboard_size(n)) + 5),
+    # detaches the expired one-time window from every 10th monitor, then pauses and removes it:
+    "maintenance_gc": Scenario(
+        lambda ctx, _: tasks.maintenance_gc(ctx, yes=True), lambda n: 1 + pages(n) + math.ceil(n / 10) + 2
+    ),
+    "maintenances": Scenario(lambda ctx, _: tasks.maintenances(ctx), lambda _: 1),
+    "add_monitor_to_maintenance": Scenario(
+        lambda ctx, server: tasks.add_monitor_to_maintenance(ctx, first_once_window(server), server.monitors[1]["id"]),
+        lambda _: 3,
+    ),
+    "add_dashboard_to_maintenance": Scenario(
+        lambda ctx, server: tasks.add_dashboard_to_maintenance(ctx, first_once_window(server), server.psps[0]["id"]),
+        lambda n: dashboard_size(n) + pages(dashboard_size(n)) + 2,
+    ),
+    "remove_monitor_from_maintenance": Scenario(
+        lambda ctx, server: tasks.remove_monitor_from_maintenance(
+            ctx, server.mwindows[0]["id"], server.monitors[0]["id"]
+        ),
+        lambda _: 3,
+    ),
+    "unmaintenance": Scenario(lambda ctx, server: tasks.unmaintenance(ctx, first_once_window(server)), lambda _: 3),
+    "unmaintenance_all": Scenario(lambda ctx, _: tasks.unmaintenance_all(ctx), lambda _: 3),
+    # half of the dashboard is still to do / to undo:
+    "resume": Scenario(run_resume, lambda n: dashboard_size(n) // 2 + pages(dashboard_size(n) // 2)),
+    "rollback": Scenario(run_rollback, lambda n: dashboard_size(n) // 2 + pages(dashboard_size(n) // 2)),
+    "toggle_maintenance": Scenario(
+        lambda ctx, server: tasks.toggle_maintenance(ctx, server.mwindows[0]["id"]), lambda _: 2
+    ),
+}
+
+RESULTS: list[dict[str, typing.Any]] = []
+
+
+def all_tasks() -> list[str]:
+    return sorted(name for name, value in vars(tasks).items() if isinstance(value, invoke.Task))
+
+
+@pytest.fixture(scope="module", autouse=True)
+def report(pytestconfig):
+    yield
+
+    if not RESULTS:
+        return
+
+    if path := os.environ.get("UPTIME_BENCHMARK_JSON"):
+        with open(path, "w") as f:
+            json.dump(RESULTS, f, indent=2)
+
+    reporter = pytestconfig.pluginmanager.get_plugin("terminalreporter")
+    with pytestconfig.pluginmanager.get_plugin("capturemanager").global_and_fixture_disabled():
+        reporter.write_line("")
+        reporter.write_line(f"{'task':<34}{'monitors':>10}{'requests':>10}{'budget':>8}{'seconds':>10}")
+        for result in RESULTS:
+            reporter.write_line(
+                f"{result['task']:<34}{result['monitors']:>10}{result['requests']:>10}"
+                f"{result['budget']:>8}{result['seconds']:>10.3f}"
+            )
+
+
+@pytest.fixture
+def interactive(monkeypatch):
+    """
+    Answer every prompt of the tasks non-interactively.
+    """
+    deferred: list[typing.Callable[[], None]] = []
+
+    monkeypatch.setattr(builtins, "input", lambda *_: "")
+    monkeypatch.setattr(tasks, "confirm", lambda *_, **__: True)
+    monkeypatch.setattr(tasks.edwh, "confirm", lambda *_, **__: True)
+    monkeypatch.setattr(tasks.edwh, "set_env_value", lambda *_: None)
+    monkeypatch.setattr(tasks, "interactive_selected_checkbox_values", lambda options, *_, **__: list(options))
+    monkeypatch.setattr(tasks, "interactive_selected_radio_value", lambda options, *_, **__: next(iter(options)))
+    monkeypatch.setattr(tasks, "dc_config", lambda ctx: ctx.compose)
+    monkeypatch.setattr(tasks, "get_hosts_for_service", lambda service: service["hosts"])
+    monkeypatch.setattr(tasks, "defer", lambda callback: deferred.append(callback) or (lambda: None))
+
+    return deferred
+
+
+def test_every_task_has_a_scenario():
+    assert sorted(SCENARIOS) == all_tasks()
+
+
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize("name", sorted(SCENARIOS))
+def test_benchmark_task(name, size, interactive, capsys):
+    scenario = SCENARIOS[name]
+
+    with FakeUptimeRobotServer() as server:
+        server.seed_account(size, dashboard_size=DASHBOARD_SIZE)
+
+        previous = uptime_robot._instance
+        # like the CLI: one client (and memo) per command
+        uptime_robot._instance = UptimeRobot(api_key="fake", base=server.base, rate_limit=None, memo=RequestMemo())
+        tasks._monitor_index = None
+        try:
+            start = time.perf_counter()
+            scenario.run(Context(), server)
+            for callback in interactive:  # e.g. closing the maintenance window
+                callback()
+            seconds = time.perf_counter() - start
+        finally:
+            uptime_robot._instance.close()
+            uptime_robot._instance = previous
+            tasks._monitor_index = None
+
+    capsys.readouterr()  # task output is not interesting here
+
+    requests = len(server.requests)
+    budget = scenario.budget(size)
+    RESULTS.append(
+        {
+            "task": name,
+            "monitors": size,
+            "requests": requests,
+            "budget": budget,
+            "seconds": seconds,
+            "endpoints": dict(Counter(endpoint for endpoint, _ in server.requests)),
+        }
+    )
+
+    assert requests <= budget, Counter(endpoint for endpoint, _ in server.requests)
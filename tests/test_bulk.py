@@ -0,0 +1,124 @@
+import shlex
+
+import pytest
+from invoke import Collection, Context
+from invoke.parser import Parser
+
+from src.edwh_uptime_plugin import tasks
+from src.edwh_uptime_plugin.bulk import BulkRun, Step
+from src.edwh_uptime_plugin.cache import ResponseCache
+from src.edwh_uptime_plugin.memo import RequestMemo
+from src.edwh_uptime_plugin.uptimerobot import UptimeRobot, uptime_robot
+
+
+def edits(server) -> int:
+    return sum(endpoint == "editMonitor" for endpoint, _ in server.requests)
+
+
+def test_steps_never_edit_cached_monitors(server, monkeypatch, tmp_path):
+    monitors = server.seed_monitors(3)
+    window, other = server.seed_mwindow("deploy"), server.seed_mwindow("nightly")
+    cache = ResponseCache(tmp_path / "cache.sqlite3")
+
+    # an earlier command cached the monitors, then a window was linked elsewhere:
+    UptimeRobot(api_key="fake", base=server.base, cache=cache).get_monitors(mwindows=1)
+    server.monitor_mwindows[monitors[0]["id"]].add(other["id"])
+
+    client = UptimeRobot(api_key="fake", base=server.base, cache=cache, memo=RequestMemo())
+    monkeypatch.setattr(uptime_robot, "_instance", client)
+    client.get_monitors(mwindows=1)  # the memo now remembers the cached monitors too
+
+    assert tasks.add_maintenance_to_monitors(window["id"], [_["id"] for _ in monitors]) == 3
+    assert server.monitor_mwindows[monitors[0]["id"]] == {window["id"], other["id"]}
+
+    tasks.remove_monitor_from_maintenance(Context(), window["id"], monitors[0]["id"])
+    assert server.monitor_mwindows[monitors[0]["id"]] == {other["id"]}
+
+
+@pytest.mark.usefixtures("client")
+def test_resume_only_performs_unfinished_steps(server, monkeypatch, capsys):
+    monitors = server.seed_monitors(20)
+    window = server.seed_mwindow("deploy")
+
+    # the API refuses some edits (e.g. 429s that outlast the retries):
+    refused = {_["id"] for _ in monitors[5:10]}
+    edit_monitor = server.api_editMonitor
+    monkeypatch.setattr(
+        server,
+        "api_editMonitor",
+        lambda payload: server.not_found("busy") if int(payload["id"]) in refused else edit_monitor(payload),
+    )
+
+    assert tasks.add_maintenance_to_monitors(window["id"], [_["id"] for _ in monitors]) == 15
+    hint = capsys.readouterr().out.split("retry them with: edwh ")[1].splitlines()[0]
+
+    run = BulkRun.find(unfinished=True)
+    # the printed command is one the CLI accepts:
+    name, *argv = shlex.split(hint)
+    parsed = Parser(contexts=Collection.from_module(tasks).to_contexts()).parse_argv(
+        [name.removeprefix("uptime."), *argv]
+    )
+    assert parsed[0].name == "resume" and parsed[0].args["run_id"].value == run.id
+    assert run.operation == "add_maintenance_to_monitors"
+    assert len(run.pending) == 5 and len(run.errors) == 5
+
+    refused.clear()
+    server.requests.clear()
+    tasks.resume(Context())
+
+    assert edits(server) == 5
+    assert all(window["id"] in server.monitor_mwindows[_["id"]] for _ in monitors)
+    assert BulkRun.find(run.id).complete
+    assert BulkRun.find(unfinished=True) is None
+
+
+@pytest.mark.usefixtures("client")
+def test_rollback_keeps_links_that_existed_before(server):
+    monitors = server.seed_monitors(10)
+    window = server.seed_mwindow("deploy")
+    for monitor in monitors[:3]:
+        server.monitor_mwindows[monitor["id"]].add(window["id"])
+
+    tasks.add_maintenance_to_monitors(window["id"], [_["id"] for _ in monitors])
+    assert edits(server) == 7
+
+    server.requests.clear()
+    tasks.rollback(Context(), yes=True)
+
+    assert edits(server) == 7
+    assert all(window["id"] in server.monitor_mwindows[_["id"]] for _ in monitors[:3])
+    assert not any(window["id"] in server.monitor_mwindows[_["id"]] for _ in monitors[3:])
+
+    # nothing left to undo:
+    server.requests.clear()
+    tasks.rollback(Context(), yes=True)
+    assert edits(server) == 0
+
+
+def test_rollback_removes_created_window(server, client):
+    monitors = server.seed_monitors(5)
+    window = server.seed_mwindow("release")
+    steps = [
+        Step("new_mwindow", {"window": window["id"]}),
+        *tasks.mwindow_steps(window["id"], [_["id"] for _ in monitors]),
+    ]
+
+    run = BulkRun.plan("maintenance", steps, done=[0])
+    run.execute(client)
+    run.rollback(client)
+
+    # removing the window also removes its links, so the monitors aren't edited one by one:
+    assert [endpoint for endpoint, _ in server.requests][-2:] == ["editMWindow", "deleteMWindow"]
+    assert edits(server) == 5
+    assert not server.mwindows
+    assert len(BulkRun.find(run.id).undone) == 6
+
+
+@pytest.mark.usefixtures("client")
+def test_journal_survives_half_written_line():
+    run = BulkRun.plan("test", [Step("delete_mwindow", {"window": 1})] * 3)
+    with run.path.open("a") as f:
+        f.write('{"done": 0, "changed": true}\n{"done": 1, "cha')
+
+    run = BulkRun.find(run.id)
+    assert run.pending == [1, 2]
@@ -0,0 +1,75 @@
+import pytest
+from invoke import Context
+
+from src.edwh_uptime_plugin import tasks
+from src.edwh_uptime_plugin.bulk import BulkRun
+from src.edwh_uptime_plugin.cleanup import cleanup_steps, find_stale_windows
+
+NOW = 1_700_000_000
+
+
+def window(idx: int, window_type: str = "once", start_time: int = NOW - 7200, duration: int = 60) -> dict:
+    return {
+        "id": idx,
+        "friendly_name": f"window {idx}",
+        "type": window_type,
+        "start_time": start_time,
+        "duration": duration,
+    }
+
+
+def test_find_stale_windows():
+    windows = [
+        window(1),  # ended an hour ago
+        window(2, start_time=NOW - 1800),  # still going
+        window(3, window_type="weekly"),
+        window(4, window_type="daily"),  # not used
+    ]
+    monitors = [
+        {"id": 10, "mwindows": [{"id": 1}, {"id": 3}]},
+        {"id": 11, "mwindows": [{"id": 1}, {"id": 2}]},
+        {"id": 12, "mwindows": []},
+    ]
+
+    stale = find_stale_windows(windows, monitors, now=NOW)
+    assert [(_.window["id"], _.reason, _.monitors) for _ in stale] == [(1, "expired", [10, 11]), (4, "orphaned", [])]
+    assert [_.window["id"] for _ in find_stale_windows(windows, monitors, orphaned=False, now=NOW)] == [1]
+    assert [_.window["id"] for _ in find_stale_windows(windows, monitors, expired=False, now=NOW)] == [4]
+
+    steps = cleanup_steps(stale)
+    assert [(_.action, _.params) for _ in steps] == [
+        ("detach_mwindow", {"monitor": 10, "windows": [1]}),
+        ("detach_mwindow", {"monitor": 11, "windows": [1]}),
+        ("delete_mwindow", {"window": 1}),
+        ("delete_mwindow", {"window": 4}),
+    ]
+
+
+@pytest.mark.usefixtures("client")
+def test_maintenance_gc(server, capsys):
+    monitors = server.seed_monitors(30)
+    expired = [server.seed_mwindow(f"deploy {idx}") for idx in range(3)]  # once, start_time 0
+    orphan = server.seed_mwindow("old nightly", window_type=2)
+    nightly = server.seed_mwindow("nightly", window_type=2)
+    for monitor in monitors[:20]:
+        server.monitor_mwindows[monitor["id"]] |= {expired[0]["id"], expired[1]["id"], nightly["id"]}
+
+    tasks.maintenance_gc(Context(), dry_run=True)
+    listing = capsys.readouterr().out
+    assert f"{orphan['id']}: old nightly (orphaned, 0 monitors)" in listing
+    assert f"{expired[0]['id']}: deploy 0 (expired, 20 monitors)" in listing
+    assert [endpoint for endpoint, _ in server.requests] == ["getMWindows", "getMonitors"]
+
+    server.requests.clear()
+    tasks.maintenance_gc(Context(), yes=True)
+
+    endpoints = [endpoint for endpoint, _ in server.requests]
+    assert endpoints.count("editMonitor") == 20  # one edit per monitor for both of its expired windows
+    assert endpoints.count("deleteMWindow") == 4
+    assert [_["id"] for _ in server.mwindows] == [nightly["id"]]
+    assert all(server.monitor_mwindows[_["id"]] == {nightly["id"]} for _ in monitors[:20])
+    assert "Removed 4 maintenance windows." in capsys.readouterr().out
+
+    # removed windows can't come back, and neither can their links:
+    run = BulkRun.find()
+    assert len(run.irreversible) == len(run.steps)
@@ -0,0 +1,314 @@
+import asyncio
+import atexit
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.edwh_uptime_plugin.aio import AsyncUptimeRobot
+from src.edwh_uptime_plugin.cache import ResponseCache
+from src.edwh_uptime_plugin.memo import RequestMemo
+from src.edwh_uptime_plugin.ratelimit import (
+    TokenBucket,
+    parse_retry_after,
+    plan_rate_limit,
+)
+from src.edwh_uptime_plugin.stats import RequestStats
+from src.edwh_uptime_plugin.uptimerobot import (
+    UptimeRobot,
+    UptimeRobotException,
+    UptimeRobotRatelimit,
+)
+
+
+def test_get_monitors_walks_all_pages(server, client):
+    server.seed_monitors(120)
+
+    monitors = client.get_monitors()
+
+    assert [_["id"] for _ in monitors] == [_["id"] for _ in server.monitors]
+    assert [endpoint for endpoint, _ in server.requests] == ["getMonitors"] * 3
+    assert [payload["offset"] for _, payload in server.requests] == [0, 50, 100]
+
+
+def test_iter_monitors_is_lazy(server, client):
+    server.seed_monitors(120)
+
+    monitors = client.iter_monitors()
+    first_page = [next(monitors) for _ in range(50)]
+
+    assert len(first_page) == 50
+    assert len(server.requests) == 1
+
+    next(monitors)
+    assert len(server.requests) == 2
+
+
+def test_get_monitors_empty(server, client):
+    assert client.get_monitors() == []
+    assert client.get_monitor(1) is None
+    # one request each, no extra page fetches for empty results:
+    assert len(server.requests) == 2
+
+
+def test_ratelimit_is_retried(server, client):
+    server.ratelimit_next(2)
+
+    assert client.get_account_details()
+    assert [endpoint for endpoint, _ in server.requests] == ["getAccountDetails"] * 3
+
+
+def test_ratelimit_gives_up(server):
+    client = UptimeRobot(api_key="fake", base=server.base, max_retries=1)
+    server.ratelimit_next(5)
+
+    with pytest.raises(UptimeRobotRatelimit):
+        client.get_account_details()
+
+    assert len(server.requests) == 2
+
+
+def test_budget_follows_response_headers(server, client):
+    assert client.rate_limiter.per_minute == 10  # free plan until the API says otherwise
+
+    client.get_account_details()
+
+    assert client.rate_limiter.per_minute == server.rate_limit
+
+
+def test_token_bucket_paces_requests():
+    now = [0.0]
+    bucket = TokenBucket(10, clock=lambda: now[0], sleep=lambda _: None)
+
+    # full bucket: burst of 10
+    assert [bucket.reserve() for _ in range(10)] == [0.0] * 10
+    # then one every 6 seconds, queued behind each other:
+    assert bucket.reserve() == pytest.approx(6)
+    assert bucket.reserve() == pytest.approx(12)
+
+    now[0] = 12
+    assert bucket.reserve() == pytest.approx(6)
+
+    bucket.pause(30)
+    assert bucket.reserve() >= 30
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("12") == 12
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+    assert parse_retry_after("garbage") is None
+
+
+def test_plan_rate_limit():
+    assert plan_rate_limit("free") == 10
+    assert plan_rate_limit("pro", monitor_limit=50) == 100
+    assert plan_rate_limit("pro", monitor_limit=10_000) == 5000
+    assert plan_rate_limit(60) == 60
+
+    with pytest.raises(ValueError):
+        plan_rate_limit("enterprise")
+
+
+def test_async_client_fans_out(server, client):
+    server.seed_monitors(120)
+
+    async def main():
+        async with AsyncUptimeRobot(client, concurrency=4) as robot:
+            monitors = [_ async for _ in robot.iter_monitors()]
+            results = await asyncio.gather(*(robot.edit_monitor(_["id"], {"interval": 60}) for _ in monitors))
+            return monitors, results
+
+    monitors, results = asyncio.run(main())
+
+    assert len(monitors) == 120
+    assert all(results)
+    assert all(_["interval"] == 60 for _ in server.monitors)
+    # bounded: never more connections than concurrent workers
+    assert server.connections <= 4
+
+
+def test_async_client_raises_same_exceptions(client):
+    async def main():
+        async with AsyncUptimeRobot(client) as robot:
+            await robot.edit_monitor(1, {"interval": 60})
+
+    with pytest.raises(UptimeRobotException):
+        asyncio.run(main())
+
+
+def test_async_clean_maintenance_windows_counts_removals(server, client, monkeypatch):
+    windows = [server.seed_mwindow(f"deploy {idx}") for idx in range(4)]
+    nightly = server.seed_mwindow("nightly", window_type=2)
+
+    delete = server.api_deleteMWindow
+    refused = windows[1]["id"]
+    monkeypatch.setattr(
+        server,
+        "api_deleteMWindow",
+        lambda payload: server.not_found("busy") if int(payload["id"]) == refused else delete(payload),
+    )
+
+    async def main():
+        async with AsyncUptimeRobot(client) as robot:
+            return await robot.clean_maintenance_windows()
+
+    assert asyncio.run(main()) == 3
+    assert [_["id"] for _ in server.mwindows] == [refused, nightly["id"]]
+
+
+def test_cache_serves_repeated_reads(server, tmp_path):
+    now = [1000.0]
+    cache = ResponseCache(tmp_path / "cache.sqlite3", clock=lambda: now[0])
+    client = UptimeRobot(api_key="fake", base=server.base, cache=cache)
+    server.seed_monitors(3)
+
+    assert len(client.get_monitors()) == 3
+    assert len(client.get_monitors()) == 3
+    assert len(server.requests) == 1
+
+    # other parameters are cached separately:
+    client.get_monitors(search="site1")
+    assert len(server.requests) == 2
+
+    # and entries expire per entity:
+    now[0] += cache.ttls["monitors"] + 1
+    client.get_monitors()
+    assert len(server.requests) == 3
+
+
+def test_cache_is_invalidated_by_writes(server, tmp_path):
+    client = UptimeRobot(api_key="fake", base=server.base, cache=ResponseCache(tmp_path / "cache.sqlite3"))
+    monitor = server.seed_monitors(1)[0]
+    client.get_psps()
+
+    assert client.get_monitor(monitor["id"])["interval"] == 300
+    client.edit_monitor(monitor["id"], {"interval": 60})
+    assert client.get_monitor(monitor["id"])["interval"] == 60
+
+    # dashboards were not affected by the edit:
+    client.get_psps()
+    assert [endpoint for endpoint, _ in server.requests].count("getPSPs") == 1
+
+    # accounts don't share entries:
+    other = UptimeRobot(api_key="other", base=server.base, cache=client.cache)
+    other.get_psps()
+    assert [endpoint for endpoint, _ in server.requests].count("getPSPs") == 2
+
+
+def test_fresh_reads_bypass_the_cache(server, tmp_path):
+    client = UptimeRobot(api_key="fake", base=server.base, cache=ResponseCache(tmp_path / "cache.sqlite3"))
+    monitor = server.seed_monitors(1)[0]
+    client.get_monitor(monitor["id"])
+    server.monitors[0]["interval"] = 60  # changed elsewhere
+
+    assert client.get_monitor(monitor["id"])["interval"] == 300
+    with client.fresh():
+        assert client.get_monitor(monitor["id"])["interval"] == 60
+
+    # the fresh response replaced the cached one:
+    assert client.get_monitor(monitor["id"])["interval"] == 60
+    assert [endpoint for endpoint, _ in server.requests].count("getMonitors") == 2
+
+
+def test_memo_serves_repeats_and_subselections(server):
+    client = UptimeRobot(api_key="fake", base=server.base, memo=RequestMemo())
+    monitors = server.seed_monitors(120)
+    window = server.seed_mwindow("window")
+
+    assert len(client.get_monitors()) == 120
+    assert len(client.get_monitors()) == 120
+    assert client.get_monitor(monitors[70]["id"])["url"] == monitors[70]["url"]
+    assert [_["id"] for _ in client.get_monitors(monitor_ids=[monitors[3]["id"], monitors[1]["id"]])] == [
+        monitors[1]["id"],
+        monitors[3]["id"],
+    ]
+    assert client.get_m_windows() and client.get_m_window(window["id"])["id"] == window["id"]
+    assert [endpoint for endpoint, _ in server.requests] == ["getMonitors"] * 3 + ["getMWindows"]
+
+    # callers can change what they get without changing the memo:
+    client.get_monitor(monitors[0]["id"]).pop("id")
+    assert client.get_monitor(monitors[0]["id"])["id"] == monitors[0]["id"]
+
+
+def test_memo_is_invalidated_by_writes(server):
+    client = UptimeRobot(api_key="fake", base=server.base, memo=RequestMemo())
+    monitor = server.seed_monitors(1)[0]
+    dashboard = server.seed_dashboard("Dashboard", [])
+    client.get_psp(dashboard["id"])
+
+    assert client.get_monitor(monitor["id"])["interval"] == 300
+    client.edit_monitor(monitor["id"], {"interval": 60})
+    assert client.get_monitor(monitor["id"])["interval"] == 60
+
+    client.get_psp(dashboard["id"])  # not affected by the edit
+    client.edit_psp(dashboard["id"], [monitor["id"]])
+    assert client.get_psp(dashboard["id"])["monitors"] == [monitor["id"]]
+    assert [endpoint for endpoint, _ in server.requests].count("getPSPs") == 2
+
+
+def test_memo_coalesces_concurrent_reads(server):
+    client = UptimeRobot(api_key="fake", base=server.base, memo=RequestMemo())
+    server.seed_monitors(10)
+    server.latency = 0.1
+
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(lambda _: client.get_monitors(), range(8)))
+
+    assert all(len(_) == 10 for _ in results)
+    assert len(server.requests) == 1
+
+
+def test_client_recovers_from_enforced_rate_limit(server):
+    server.enforce_rate_limit(5, window_seconds=0.5)
+    server.seed_monitors(1)
+    # the client expects more than the server allows, so it runs into 429s and has to follow the headers:
+    client = UptimeRobot(api_key="fake", base=server.base, rate_limit=1000)
+
+    for _ in range(12):
+        assert client.get_monitors()
+
+    assert server.rejected
+    assert len(server.requests) == 12 + server.rejected
+
+
+def test_stats_per_endpoint(server, tmp_path):
+    stats = RequestStats()
+    cache = ResponseCache(tmp_path / "cache.sqlite3")
+    client = UptimeRobot(api_key="fake", base=server.base, cache=cache, stats=stats)
+    server.seed_monitors(120)
+    server.ratelimit_next(1)
+
+    client.get_account_details()
+    client.get_monitors()
+    client.get_monitors()  # cached
+
+    account, monitors = stats.endpoints["getAccountDetails"], stats.endpoints["getMonitors"]
+    assert (account.calls, account.retries, account.ratelimited) == (2, 1, 1)
+    assert (monitors.calls, monitors.cached, monitors.retries) == (3, 3, 0)
+    assert sum(monitors.histogram) == monitors.calls
+    assert monitors.request_bytes > 0
+    assert monitors.response_bytes > account.response_bytes
+    assert stats.total_calls == len(server.requests)
+
+    table = stats.table().splitlines()
+    assert table[0].split()[:3] == ["endpoint", "calls", "cached"]
+    assert len(table) == 4
+
+    stats.report(str(tmp_path / "stats.json"))
+    report = json.loads((tmp_path / "stats.json").read_text())
+    assert report["endpoints"]["getMonitors"]["calls"] == 3
+
+
+def test_stats_are_opt_in(server, monkeypatch):
+    client = UptimeRobot(api_key="fake", base=server.base)
+    assert client.stats is None
+
+    monkeypatch.setenv("UPTIME_STATS", "0")
+    client.set_stats()
+    assert client.stats is None
+
+    monkeypatch.setattr(atexit, "register", lambda *_: None)
+    client.set_stats("1")
+    client.get_account_details()
+    assert client.stats.total_calls == 1
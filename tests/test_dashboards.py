@@ -0,0 +1,129 @@
+import pytest
+from invoke import Context
+
+from src.edwh_uptime_plugin import tasks
+from src.edwh_uptime_plugin.dashboards import DashboardRule, plan_dashboards
+from src.edwh_uptime_plugin.table import MonitorTable
+
+
+def monitor(idx: int, url: str, name: str) -> dict:
+    return {"id": idx, "url": url, "friendly_name": name}
+
+
+MONITORS = MonitorTable(
+    [
+        monitor(1, "https://shop.example.com/", "prod-shop"),
+        monitor(2, "https://blog.example.com/", "prod-blog"),
+        monitor(3, "https://shop.example.org/health", "staging-shop"),
+        monitor(4, "https://intranet.local", "INTRANET"),
+    ]
+)
+
+
+def test_plan_dashboards():
+    dashboards = [
+        {"id": 10, "friendly_name": "Production", "monitors": [1, 4]},
+        {"id": 11, "friendly_name": "Shops", "monitors": [1, 3]},
+        {"id": 12, "friendly_name": "Internal", "monitors": []},
+    ]
+    rules = [
+        DashboardRule("production", urls=["*.example.com"]),
+        DashboardRule("11", urls=["https://shop.*"]),  # by id; already complete
+        DashboardRule("12", names=["intra*"], hosts=["blog.example.com"]),
+        DashboardRule("Missing", names=["*"]),
+    ]
+
+    changes, problems = plan_dashboards(rules, dashboards, MONITORS)
+    assert [(_.dashboard["id"], _.added, _.removed) for _ in changes] == [(10, [2], []), (12, [2, 4], [])]
+    assert changes[0].monitors == [1, 4, 2]
+    assert problems == ["unknown dashboard 'Missing', create it first"]
+
+    changes, _ = plan_dashboards(rules, dashboards, MONITORS, exact=True)
+    assert [(_.dashboard["id"], _.added, _.removed) for _ in changes] == [(10, [2], [4]), (12, [2, 4], [])]
+    assert changes[0].monitors == [1, 2]
+
+
+def test_incomplete_rules_remove_nothing():
+    dashboards = [
+        {"id": 10, "friendly_name": "Production", "monitors": [1, 4]},
+        {"id": 11, "friendly_name": "Shops", "monitors": [1, 3]},
+    ]
+    rules = [
+        DashboardRule("10", urls=["*.example.com"], compose=["/srv/gone"], unresolved=["/srv/gone"]),
+        DashboardRule("11"),
+    ]
+
+    changes, problems = plan_dashboards(rules, dashboards, MONITORS, exact=True)
+    assert [(_.dashboard["id"], _.added, _.removed) for _ in changes] == [(10, [2], [])]
+    assert problems == [
+        "not removing monitors from dashboard Production: no hosts found for compose /srv/gone",
+        "not removing monitors from dashboard Shops: a rule has no patterns",
+    ]
+
+
+@pytest.mark.usefixtures("client")
+def test_edit_dashboards_by_rules(server, monkeypatch, tmp_path, capsys):
+    monitors = server.seed_monitors(120)
+    even = server.seed_dashboard("Even", [_["id"] for _ in monitors[::2]])
+    first = server.seed_dashboard("First ten", [])
+    project = server.seed_dashboard("Project", [monitors[0]["id"]])
+    for idx in range(30):
+        server.seed_dashboard(f"Other {idx}", [])
+
+    (tmp_path / "shop").mkdir()
+    monkeypatch.setattr(tasks, "dc_config", lambda _: {"services": {"web": {"hosts": ["site7.example.com"]}}})
+    monkeypatch.setattr(tasks, "get_hosts_for_service", lambda service: service["hosts"])
+
+    rules = tmp_path / "dashboards.toml"
+    rules.write_text(f"""
+[[dashboards]]
+friendly_name = "Even"
+names = ["site*[02468]"]  # already up to date
+
+[[dashboards]]
+id = {first["id"]}
+urls = ["site?.example.com"]
+
+[[dashboards]]
+friendly_name = "project"
+compose = ["{tmp_path / "shop"}"]
+""")
+
+    tasks.edit_dashboard(Context(), rules=str(rules), exact=True, dry_run=True)
+    assert "~ dashboard Project (+1 -1 monitors)" in capsys.readouterr().out
+    assert not any(endpoint == "editPSP" for endpoint, _ in server.requests)
+
+    server.requests.clear()
+    tasks._monitor_index = None  # like a new command
+    tasks.edit_dashboard(Context(), rules=str(rules), exact=True)
+
+    endpoints = [endpoint for endpoint, _ in server.requests]
+    # 120 monitors = 3 pages, then only the two dashboards that change:
+    assert sorted(endpoints) == ["editPSP"] * 2 + ["getMonitors"] * 3 + ["getPSPs"]
+    assert [_["id"] for _ in monitors[:10]] == server.find(server.psps, first["id"])["monitors"]
+    assert server.find(server.psps, project["id"])["monitors"] == [monitors[7]["id"]]
+    assert len(server.find(server.psps, even["id"])["monitors"]) == 60
+
+
+@pytest.mark.usefixtures("client")
+def test_edit_dashboard_rules_need_a_dashboard(capsys):
+    tasks.edit_dashboard(Context(), url=["*.example.com"])
+    assert "Pass a dashboard id" in capsys.readouterr().err
+
+
+@pytest.mark.usefixtures("client")
+def test_unreadable_compose_keeps_the_dashboard(server, monkeypatch, tmp_path, capsys):
+    monitors = server.seed_monitors(5)
+    dashboard = server.seed_dashboard("Prod", [_["id"] for _ in monitors])
+    (tmp_path / "broken").mkdir()
+    monkeypatch.setattr(tasks, "dc_config", lambda _: {})  # what it returns when `docker compose config` fails
+
+    for directory in (tmp_path / "missing", tmp_path / "broken"):
+        tasks.edit_dashboard(Context(), dashboard["id"], compose=[str(directory)], exact=True)
+
+    captured = capsys.readouterr()
+    assert "missing is not a directory" in captured.err
+    assert f"Could not read the compose config in {tmp_path / 'broken'}" in captured.err
+    assert captured.err.count("not removing monitors from dashboard Prod: no hosts found for compose") == 2
+    assert not any(endpoint == "editPSP" for endpoint, _ in server.requests)
+    assert len(server.find(server.psps, dashboard["id"])["monitors"]) == 5
@@ -0,0 +1,106 @@
+import json
+import time
+import tracemalloc
+
+import pytest
+
+from src.edwh_uptime_plugin import decoding
+from src.edwh_uptime_plugin.decoding import DecodeError, decode_response
+
+
+@pytest.fixture
+def stdlib_json(monkeypatch):
+    monkeypatch.setattr(decoding, "_decode", None)
+    monkeypatch.setattr(decoding, "msgspec_decoder", lambda: None)
+    yield
+    monkeypatch.setattr(decoding, "_decode", None)
+
+
+@pytest.fixture
+def fast(monkeypatch):
+    pytest.importorskip("msgspec")
+    monkeypatch.setattr(decoding, "_decode", None)
+    yield
+    monkeypatch.setattr(decoding, "_decode", None)
+
+
+def monitor(idx: int) -> dict:
+    return {
+        "id": 780000000 + idx,
+        "friendly_name": f"site{idx}",
+        "url": f"https://site{idx}.example.com/",
+        "type": 1,
+        "sub_type": "",
+        "keyword_type": None,
+        "keyword_value": "",
+        "port": "",
+        "interval": 300,
+        "timeout": 30,
+        "status": 2,
+        "create_datetime": 1700000000,
+        "custom_uptime_ratio": "99.990-100.000",
+        "mwindows": [{"id": 1, "status": 1}],
+    }
+
+
+def payload(size: int) -> bytes:
+    return json.dumps(
+        {
+            "stat": "ok",
+            "pagination": {"offset": 0, "limit": size, "total": size},
+            "monitors": [monitor(idx) for idx in range(size)],
+        }
+    ).encode()
+
+
+@pytest.mark.usefixtures("stdlib_json")
+def test_falls_back_to_json():
+    assert decoding.backend() == "json"
+    assert decode_response(payload(3)) == json.loads(payload(3))
+
+
+@pytest.mark.usefixtures("fast")
+def test_msgspec_matches_json():
+    assert decoding.backend() == "msgspec"
+    # every field of the items is kept, not only the ones UptimeRobotMonitor lists:
+    assert decode_response(payload(3)) == json.loads(payload(3))
+
+    with pytest.raises(DecodeError):
+        decode_response(b'{"stat": "ok", "monitors": {"not": "a list"}}')
+
+
+@pytest.mark.parametrize("backend", ["stdlib_json", "fast"])
+def test_invalid_bodies(backend, request):
+    request.getfixturevalue(backend)
+
+    with pytest.raises(DecodeError):
+        decode_response(b"<html>502 Bad Gateway</html>")
+    with pytest.raises(DecodeError):
+        decode_response(b"[1, 2]")
+
+    failed = decode_response(b'{"stat": "fail", "error": {"type": "invalid_parameter", "message": "nope"}}')
+    assert failed["stat"] == "fail" and failed["error"]["message"] == "nope"
+
+
+@pytest.mark.parametrize("backend", ["stdlib_json", "fast"])
+def test_decode_benchmark(backend, request):
+    """
+    Decode time and peak memory for a 10k-monitor getMonitors response.
+    """
+    request.getfixturevalue(backend)
+    body = payload(10_000)
+    decode_response(body)  # warm up (e.g. building msgspec's decoder)
+
+    started = time.perf_counter()
+    for _ in range(5):
+        decode_response(body)
+    elapsed = (time.perf_counter() - started) / 5
+
+    tracemalloc.start()
+    decoded = decode_response(body)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{decoding.backend()}: {len(body) / 1e6:.1f}MB body in {elapsed * 1000:.1f}ms, peak {peak / 1e6:.1f}MB")
+    assert len(decoded["monitors"]) == 10_000
+    assert elapsed < 2
@@ -0,0 +1,121 @@
+import threading
+import urllib.request
+
+import pytest
+from invoke import Context
+
+from src.edwh_uptime_plugin import tasks
+from src.edwh_uptime_plugin.accounts import Accounts
+from src.edwh_uptime_plugin.exporter import MetricsPoller, MetricsServer, render_metrics
+from src.edwh_uptime_plugin.memo import RequestMemo
+from src.edwh_uptime_plugin.uptimerobot import UptimeRobot
+
+
+def test_render_metrics():
+    monitors = [
+        {"id": 1, "friendly_name": 'say "hi"', "url": "https://a.example.com", "type": 1, "status": 2, "interval": 300},
+        {"id": 2, "friendly_name": "b", "url": "b.example.com", "type": 3, "status": 9, "interval": 60},
+    ]
+    monitors[0]["response_times"] = [{"datetime": 2, "value": 250}, {"datetime": 1, "value": 999}]
+    dashboards = [
+        {"id": 10, "friendly_name": "Production", "monitors": [1]},
+        {"id": 11, "friendly_name": "Shops", "monitors": ["1"]},
+    ]
+
+    metrics = render_metrics(monitors, dashboards)
+    first = 'id="1",name="say \\"hi\\"",url="https://a.example.com",type="http"'
+    assert f'uptimerobot_monitor_status{{{first},dashboard="Production"}} 2' in metrics
+    assert f'uptimerobot_monitor_status{{{first},dashboard="Shops"}} 2' in metrics
+    assert f'uptimerobot_monitor_response_time_seconds{{{first},dashboard="Shops"}} 0.25' in metrics
+    assert 'uptimerobot_monitor_interval_seconds{id="2",name="b",url="b.example.com",type="ping",dashboard=""} 60' in (
+        metrics
+    )
+    # no response times for the second monitor:
+    assert metrics.count("uptimerobot_monitor_response_time_seconds{") == 2
+    assert metrics.count("# TYPE uptimerobot_monitor_status gauge") == 1
+
+
+def scrape(url: str) -> str:
+    with urllib.request.urlopen(url, timeout=5) as response:
+        assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+        return response.read().decode()
+
+
+def test_scrapes_are_served_from_memory(server, client):
+    monitors = server.seed_monitors(120)
+    server.seed_dashboard("Even", [_["id"] for _ in monitors[::2]])
+
+    poller = MetricsPoller(client)
+    poller.poll()
+    assert sorted(endpoint for endpoint, _ in server.requests) == ["getMonitors"] * 3 + ["getPSPs"]
+
+    server.requests.clear()
+    with MetricsServer(poller, port=0) as metrics:
+        threading.Thread(target=metrics.serve_forever, daemon=True).start()
+        bodies = [scrape(metrics.url) for _ in range(5)]
+        metrics.shutdown()
+
+    assert not server.requests
+    assert len(set(bodies)) == 1
+    assert bodies[0].count("uptimerobot_monitor_status{") == 120
+    assert bodies[0].count('uptimerobot_monitor_type{id="') == 120
+    assert bodies[0].count('dashboard="Even"}') == 60 * 4  # every metric of the even monitors
+    assert " 0.1245\n" not in bodies[0]  # the latest response time, not the average
+    assert "uptimerobot_exporter_polls_total 1" in bodies[0]
+
+
+def test_polls_refresh_monitors_and_dashboards(server):
+    # like the CLI, with a memo that lives as long as the exporter:
+    client = UptimeRobot(api_key="fake", base=server.base, rate_limit=None, memo=RequestMemo())
+    monitors = server.seed_monitors(3)
+    server.seed_dashboard("First", [monitors[0]["id"]])
+
+    poller = MetricsPoller(client)
+    poller.poll()
+    server.seed_dashboard("Second", [monitors[1]["id"]])
+    server.monitors[2]["status"] = 9
+    poller.poll()
+    client.close()
+
+    metrics = poller.metrics()
+    assert [endpoint for endpoint, _ in server.requests] == ["getMonitors", "getPSPs"] * 2
+    assert f'uptimerobot_monitor_status{{id="{monitors[1]["id"]}",' in metrics
+    assert 'dashboard="Second"} 2' in metrics
+    assert 'dashboard=""} 9' in metrics
+
+
+def test_min_interval_per_account():
+    small = UptimeRobot(api_key="small", rate_limit=10)
+    big = UptimeRobot(api_key="big", rate_limit=600)
+    poller = MetricsPoller(Accounts({"small": small, "big": big}), interval=0)
+    poller._monitors.update(small=40, big=5000)
+
+    # 'small': 1 page + dashboards at 10/minute, 'big': 100 pages + dashboards at 600/minute
+    assert poller.next_interval() == 12
+    poller._monitors.update(big=5000)
+    assert poller.next_interval() == 201 * 60 / 600
+
+
+def test_failed_poll_keeps_the_metrics(server, client, monkeypatch):
+    server.seed_monitors(3)
+    poller = MetricsPoller(client, interval=0)
+    poller.poll()
+    before = poller.metrics()
+
+    monkeypatch.setattr(server, "api_getMonitors", lambda _: server.not_found("busy"))
+    errors = []
+    poller.run(polls=2, on_error=errors.append)
+
+    assert len(errors) == 2
+    after = poller.metrics()
+    assert "uptimerobot_exporter_poll_errors_total 2" in after
+    assert before.split("# HELP uptimerobot_exporter")[0] == after.split("# HELP uptimerobot_exporter")[0]
+
+
+@pytest.mark.usefixtures("client")
+def test_exporter_task(server, capsys):
+
+    tasks.exporter(Context(), port=0, interval=0, polls=3)
+
+    assert [endpoint for endpoint, _ in server.requests].count("getMonitors") == 3
+    assert "Serving metrics on http://127.0.0.1:" in capsys.readouterr().err
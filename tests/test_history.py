@@ -0,0 +1,185 @@
+import threading
+import time
+import tracemalloc
+from array import array
+
+import pytest
+from invoke import Context
+
+from src.edwh_uptime_plugin import tasks
+from src.edwh_uptime_plugin.cache import ResponseCache
+from src.edwh_uptime_plugin.history import HEADER, HistoryStore, Period
+from src.edwh_uptime_plugin.uptimerobot import UptimeRobot, uptime_robot
+
+from .fake_uptimerobot import FakeUptimeRobotServer
+
+DAY = 86400
+
+
+def poll(*statuses: int) -> list[dict]:
+    return [
+        {"id": idx + 1, "status": status, "url": f"https://site{idx + 1}.example.com"}
+        for idx, status in enumerate(statuses)
+    ]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return HistoryStore(tmp_path / "history.bin", heartbeat=3600)
+
+
+def test_only_changes_and_heartbeats_are_written(store, tmp_path):
+    assert store.append(poll(2, 2), now=1000) == 2
+    assert store.append(poll(2, 2), now=1060) == 0
+    assert store.append(poll(2, 9), now=1120) == 1
+    assert store.append(poll(2, 9), now=1000 + 3600) == 1  # heartbeat for monitor 1
+
+    # a new process continues where the previous one left off:
+    other = HistoryStore(store.path, heartbeat=3600)
+    assert other.append(poll(2, 9), now=4700) == 0
+    assert len(other) == 4
+    assert (tmp_path / "history.bin").stat().st_size == len(HEADER) + 4 * 12
+    assert other.names()[2]["url"] == "https://site2.example.com"
+
+
+def test_periods(store):
+    store.append(poll(2, 2), now=1000)
+    store.append(poll(9, 2), now=2000)
+    store.append(poll(2, 8), now=2600)
+    store.append(poll(2, 9), now=2700)
+
+    assert store.periods(since=0) == [
+        Period(1, 9, 2000, 2600),
+        Period(2, 8, 2600, 2700),
+        Period(2, 9, 2700, None),
+    ]
+    assert store.periods(since=2300, monitor_ids=[1]) == [Period(1, 9, 2300, 2600)]  # clipped to the window
+    assert store.periods(since=2650, until=2680) == [Period(2, 8, 2650, None)]
+
+
+def test_flapping(store):
+    for idx, status in enumerate([2, 9, 2, 9, 2]):
+        store.append(poll(status, 2), now=1000 + idx * 60)
+
+    assert store.flapping(since=0) == {1: 4}
+    assert store.flapping(since=1150) == {1: 2}
+    assert store.flapping(since=1150, min_changes=3) == {}
+
+
+def test_partial_records_and_foreign_files(store):
+    store.append(poll(2), now=1000)
+    with store.path.open("ab") as f:
+        f.write(b"\x01\x02")  # interrupted write
+
+    assert store.periods(since=0) == []
+    assert store.append(poll(9), now=1060) == 1
+
+    store.path.write_bytes(b"not a history file")
+    with pytest.raises(ValueError):
+        store.periods(since=0)
+
+
+def test_appends_from_other_processes_stay_sorted(store):
+    other = HistoryStore(store.path, heartbeat=3600)
+    store.append(poll(2, 2), now=1000)
+    other.append(poll(9, 2), now=2000)
+    # `store` still remembers its own append, but the file moved on:
+    assert store.append(poll(2, 2), now=1500) == 1
+    assert store.periods(since=0) == [Period(1, 9, 2000, 2000)]
+
+    def poller(idx: int) -> None:
+        own = HistoryStore(store.path, heartbeat=3600)
+        for round_idx in range(50):
+            own.append(poll((idx + round_idx) % 2 * 7 + 2), now=3000 + round_idx)
+
+    threads = [threading.Thread(target=poller, args=(idx,)) for idx in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    timestamps = store._read()[0::3]
+    assert list(timestamps) == sorted(timestamps)
+
+
+def test_append_reads_only_the_tail(store):
+    monitors, polls = 2000, 500  # a million samples (12MB)
+    start = int(time.time()) - 30 * DAY
+    records = array("I")
+    for poll_idx in range(polls):
+        records.extend(_ for monitor_id in range(monitors) for _ in (start + poll_idx * 300, monitor_id, 2))
+    store.path.write_bytes(HEADER + records.tobytes())
+    del records
+
+    tracemalloc.start()
+    assert store.append([{"id": 1, "status": 9}], now=start + polls * 300) == 1
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"appended to {monitors * polls} samples with a peak of {peak / 1e6:.1f}MB")
+    assert peak < 2e6  # the last hour, not the whole file
+
+
+def test_cached_statuses_are_not_recorded_again(monkeypatch, tmp_path):
+    with FakeUptimeRobotServer() as server:
+        server.seed_monitors(3)
+        client = UptimeRobot(api_key="fake", base=server.base, cache=ResponseCache(tmp_path / "cache.sqlite3"))
+        monkeypatch.setattr(uptime_robot, "_instance", client)
+        store = tasks.history_store()
+
+        tasks.list_statuses(Context())
+        assert len(store) == 3
+
+        # a later command answered from the cache sees the same (older) statuses:
+        server.monitors[1]["status"] = 9
+        monkeypatch.setattr(time, "time", lambda: store._read()[0] + 5000)
+        tasks.list_down(Context())
+        assert len(store) == 3
+
+        client.invalidate_cache()
+        tasks.list_down(Context())
+        client.close()
+
+    assert len(store) == 6  # heartbeats, and the new status
+    assert store.periods(since=0) == [Period(server.monitors[1]["id"], 9, store._read()[-3 * 2], None)]
+
+
+def test_list_records_and_history_reports(monkeypatch, capsys):
+    with FakeUptimeRobotServer() as server:
+        server.seed_monitors(3)
+        monkeypatch.setattr(uptime_robot, "_instance", UptimeRobot(api_key="fake", base=server.base))
+
+        tasks.list_statuses(Context())
+        server.monitors[1]["status"] = 9
+        tasks.list_down(Context())
+
+    capsys.readouterr()
+    tasks.history(Context(), "site1")
+
+    captured = capsys.readouterr()
+    out = captured.out
+    assert "https://site1.example.com/: down from" in out
+    assert "to now" in out, captured.err
+
+
+def test_history_scan_benchmark(store):
+    monitors, polls = 2000, 500  # a million samples
+    start = int(time.time()) - 30 * DAY
+    records = array("I")
+    for poll_idx in range(polls):
+        timestamp = start + poll_idx * 300
+        for monitor_id in range(monitors):
+            status = 9 if (monitor_id % 100 == 0 and poll_idx % 10 < 3) else 2
+            records.extend((timestamp, monitor_id, status))
+
+    store.path.write_bytes(HEADER + records.tobytes())
+
+    began = time.perf_counter()
+    periods = store.periods(since=start, monitor_ids=[100])
+    flapped = store.flapping(since=start)
+    seconds = time.perf_counter() - began
+
+    print(f"scanned {monitors * polls * 2} samples in {seconds:.3f}s")
+    assert len(periods) == polls // 10
+    assert len(flapped) == monitors // 100
+    assert seconds < 1
@@ -0,0 +1,78 @@
+"""
+Every `edwh` invocation imports this plugin, so keep that cheap.
+
+UPTIME_IMPORT_BUDGET_MS=150  max time (median of a few runs) `edwh_uptime_plugin.tasks` may add on top of edwh itself
+"""
+
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SRC = Path(__file__).parent.parent / "src"
+BUDGET_MS = float(os.environ.get("UPTIME_IMPORT_BUDGET_MS", "150"))
+
+# what edwh (and invoke) already load for every command, so it doesn't count towards the plugin:
+PRELOAD = "import edwh, edwh.helpers, edwh.tasks, invoke"
+
+HEAVY = ("requests", "yayarl", "yaml", "tomli_w", "sqlite3", "email.utils")
+
+
+def python(code: str, *flags: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=SRC,
+        env={**os.environ, "PYTHONPATH": str(SRC)},
+    )
+
+
+def new_modules(preload: str, module: str) -> set[str]:
+    code = (
+        f"import json, sys; {preload}; before = set(sys.modules); import {module}; "
+        "print(json.dumps(sorted(set(sys.modules) - before)))"
+    )
+    return set(json.loads(python(code).stdout))
+
+
+def test_package_import_is_lazy():
+    loaded = new_modules("pass", "edwh_uptime_plugin")
+
+    assert "edwh_uptime_plugin.tasks" not in loaded
+    assert not loaded & {"edwh", *HEAVY}
+
+
+def test_client_import_skips_http_stack():
+    loaded = new_modules("pass", "edwh_uptime_plugin.uptimerobot")
+
+    assert not loaded & {"edwh", *HEAVY}
+
+
+@pytest.mark.parametrize("module", ["requests", "yayarl", "yaml", "tomli_w", "sqlite3"])
+def test_tasks_import_skips_unused_backends(module):
+    # edwh may already load some of these itself; the plugin just shouldn't add them:
+    assert module not in new_modules(PRELOAD, "edwh_uptime_plugin.tasks")
+
+
+def test_tasks_import_time():
+    def measure() -> float:
+        stderr = python(f"{PRELOAD}; import edwh_uptime_plugin.tasks", "-X", "importtime").stderr
+        # 'import time: self [us] | cumulative | name', the last line for the plugin includes its submodules:
+        cumulative = [
+            int(match.group(1))
+            for match in re.finditer(r"^import time:\s+\d+ \|\s+(\d+) \| (edwh_uptime_plugin.*)$", stderr, re.M)
+            if match.group(2).strip() in ("edwh_uptime_plugin", "edwh_uptime_plugin.tasks")
+        ]
+        return sum(cumulative) / 1000
+
+    milliseconds = statistics.median(measure() for _ in range(3))
+    print(f"edwh_uptime_plugin.tasks import: {milliseconds:.1f}ms (budget {BUDGET_MS:.0f}ms)")
+
+    assert milliseconds <= BUDGET_MS
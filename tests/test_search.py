@@ -0,0 +1,68 @@
+import time
+
+from src.edwh_uptime_plugin.search import MonitorIndex, split_url
+
+
+def monitor(idx, url, friendly_name):
+    return {"id": idx, "url": url, "friendly_name": friendly_name, "status": 2}
+
+
+def sample_index():
+    return MonitorIndex(
+        [
+            monitor(1, "https://www.example.com/", "Example"),
+            monitor(2, "https://api.example.com/health", "example api"),
+            monitor(3, "https://shop.other.nl/", "Shop"),
+            monitor(4, "https://example.com.other.nl/", "mirror"),
+        ]
+    )
+
+
+def ids(monitors):
+    return [_["id"] for _ in monitors]
+
+
+def test_split_url():
+    assert split_url("https://www.Example.com/Some/Path") == ("www.example.com", "/some/path")
+    assert split_url("https://example.com") == ("example.com", "")
+
+
+def test_search_substring_ranked():
+    index = sample_index()
+
+    # exact host (without www.) first, then prefix matches, then other substrings:
+    assert ids(index.search("example.com")) == [1, 4, 2]
+    assert ids(index.search("EXAMPLE API")) == [2]
+    assert ids(index.search("/health")) == [2]
+    assert ids(index.search("nl")) == [3, 4]
+    assert index.search("nothing-like-this") == []
+    assert len(index.search("")) == 4
+
+
+def test_prefix():
+    index = sample_index()
+
+    assert ids(index.prefix("exa")) == [1, 2, 4]
+    assert ids(index.prefix("shop")) == [3]
+    assert ids(index.prefix("www.")) == [1]
+    assert index.prefix("zzz") == []
+
+
+def test_fuzzy():
+    index = sample_index()
+
+    assert ids(index.fuzzy("shop.ohter.nl")) == [3]
+    assert index.fuzzy("completely different") == []
+
+
+def test_benchmark_lookups():
+    index = MonitorIndex(monitor(idx, f"https://site{idx}.example.com/", f"site {idx}") for idx in range(10_000))
+    lookups = 1000
+
+    start = time.perf_counter()
+    for idx in range(lookups):
+        assert index.search(f"site{idx * 7}.example")
+    per_lookup = (time.perf_counter() - start) / lookups
+
+    print(f"\nsubstring lookup over {len(index)} monitors: {per_lookup * 1_000_000:.1f}µs")
+    assert per_lookup < 0.01
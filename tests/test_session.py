@@ -0,0 +1,63 @@
+import time
+
+import requests
+
+from src.edwh_uptime_plugin.uptimerobot import UptimeRobot
+
+ROUNDS = 50
+
+
+def test_connections_are_reused(server):
+    client = UptimeRobot(api_key="fake", base=server.base)
+
+    for _ in range(ROUNDS):
+        assert client.get_account_details()
+
+    assert len(server.requests) == ROUNDS
+    assert server.connections == 1
+
+    client.close()
+    client.get_account_details()
+    assert server.connections == 2
+
+
+def test_session_is_shared_between_threads(server):
+    from concurrent.futures import ThreadPoolExecutor
+
+    client = UptimeRobot(api_key="fake", base=server.base, pool_size=4)
+
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(lambda _: client.get_monitors(), range(ROUNDS)))
+
+    assert results == [[]] * ROUNDS
+    # pool_block: never more connections than the pool allows
+    assert server.connections <= 4
+
+
+def test_benchmark_keepalive(server):
+    """
+    Compare a fresh connection per request (old behavior) with the pooled session.
+    """
+    client = UptimeRobot(api_key="fake", base=server.base)
+    url = f"{server.base}getAccountDetails"
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        requests.post(url, json={"api_key": "fake", "format": "json"}).json()
+    unpooled = (time.perf_counter() - start) / ROUNDS
+    unpooled_connections = server.connections
+
+    server.reset_counters()
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        client.get_account_details()
+    pooled = (time.perf_counter() - start) / ROUNDS
+
+    print(
+        f"\nper request: unpooled {unpooled * 1000:.3f}ms, pooled {pooled * 1000:.3f}ms "
+        f"(saved {(unpooled - pooled) * 1000:.3f}ms; {unpooled_connections} vs {server.connections} connections)"
+    )
+
+    assert unpooled_connections == ROUNDS
+    assert server.connections == 1
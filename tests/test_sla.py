@@ -0,0 +1,127 @@
+import json
+import time
+from array import array
+
+import pytest
+from invoke import Context
+
+from src.edwh_uptime_plugin import sla, tasks
+from src.edwh_uptime_plugin.memo import RequestMemo
+from src.edwh_uptime_plugin.uptimerobot import UptimeRobot, uptime_robot
+
+from .fake_uptimerobot import FakeUptimeRobotServer
+
+
+@pytest.fixture(params=["python", "numpy"])
+def backend(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(sla, "numpy", lambda: None)
+    return request.param
+
+
+@pytest.mark.usefixtures("backend")
+def test_group_stats():
+    groups = array("I", [0, 0, 0, 0, 2, 2])
+    values = array("d", [40, 10, 30, 20, 5, 7])
+
+    stats = sla.group_stats(groups, values, 3, q=50)
+
+    assert stats.count == [4, 0, 2]
+    assert stats.total == [100, 0, 12]
+    assert stats.maximum == [40, None, 7]
+    assert stats.percentile == [20, None, 5]
+
+    assert sla.group_stats(array("I"), array("d"), 2).count == [0, 0]
+
+
+@pytest.mark.usefixtures("backend")
+def test_regroup():
+    groups = array("I", [0, 1, 1, 2])
+    values = array("d", [1, 2, 3, 4])
+    members = [[0, 1], [], [1]]  # monitor 0 is on two dashboards, monitor 1 on none
+
+    new_groups, new_values = sla.regroup(groups, values, members)
+
+    assert sorted(zip(new_groups, new_values)) == [(0, 1.0), (1, 1.0), (1, 4.0)]
+
+
+@pytest.mark.usefixtures("backend")
+def test_sla_report():
+    monitors = [
+        {
+            "id": 1,
+            "url": "https://one.example.com",
+            "custom_uptime_ratio": "99.500-99.900",
+            "response_times": [{"datetime": 0, "value": 100}, {"datetime": 60, "value": 300}],
+            "logs": [{"type": 1, "datetime": 100, "duration": 600}, {"type": 1, "datetime": 5, "duration": 60}],
+        },
+        {"id": 2, "url": "https://two.example.com", "custom_uptime_ratio": "100.000"},
+    ]
+    dashboards = [
+        {"id": 7, "friendly_name": "both", "monitors": [1, 2, 3]},
+        {"id": 8, "friendly_name": "unrelated", "monitors": [3]},
+    ]
+
+    report = sla.sla_report(monitors, dashboards, since=10)
+
+    one, two = report["monitors"]
+    assert one["uptime"] == 99.5
+    assert (one["incidents"], one["downtime"], one["mttr"]) == (1, 600, 600)  # the second log is before `since`
+    assert (one["response_avg"], one["response_max"]) == (200, 300)
+    assert two["incidents"] == 0 and two["mttr"] is None and two["response_avg"] is None
+
+    [dashboard] = report["dashboards"]
+    assert dashboard["monitors"] == 2
+    assert dashboard["uptime"] == 99.75
+    assert dashboard["incidents"] == 1
+
+
+def test_sla_report_task(monkeypatch, capsys):
+    with FakeUptimeRobotServer() as server:
+        server.seed_account(30, dashboard_size=10)
+        memo = RequestMemo()
+        monkeypatch.setattr(uptime_robot, "_instance", UptimeRobot(api_key="fake", base=server.base, memo=memo))
+
+        tasks.sla_report(Context(), days=90, fmt="json")
+        report = json.loads(capsys.readouterr().out)
+        # the monitors with their logs and response times aren't kept for the rest of the command:
+        assert not memo._responses.get("monitors") and not memo._listings.get("monitors")
+
+        tasks.sla_report(Context(), dashboard_id=server.psps[0]["id"], fmt="ndjson")
+        lines = [json.loads(_) for _ in capsys.readouterr().out.splitlines()]
+
+    assert len(report["monitors"]) == 30
+    by_id = {_["id"]: _ for _ in report["monitors"]}
+    incidents = {_: by_id[_]["incidents"] for _ in by_id if _ % 10 == 0}
+    assert incidents == {_: _ % 3 + 1 for _ in incidents}
+    assert all(by_id[_]["mttr"] == 600 for _ in incidents)
+    assert all(_["response_p95"] for _ in report["monitors"])
+
+    assert {_["kind"] for _ in lines} == {"monitor", "dashboard"}
+    assert sum(_["kind"] == "dashboard" for _ in lines) == 1
+
+
+def test_sla_report_benchmark(backend):
+    size, samples, days = 5000, 7 * 24, 90  # hourly response times for a week, per monitor
+    now = int(time.time())
+    monitors = [
+        {
+            "id": idx,
+            "custom_uptime_ratio": "99.900",
+            "response_times": [{"datetime": now - s * 3600, "value": 100 + (idx + s) % 50} for s in range(samples)],
+            "logs": [{"type": 1, "datetime": now - 3600, "duration": 600}] * (idx % 3),
+        }
+        for idx in range(size)
+    ]
+    dashboards = [{"id": idx, "monitors": list(range(idx, size, 10))} for idx in range(10)]
+
+    began = time.perf_counter()
+    report = sla.sla_report(monitors, dashboards, since=now - days * 86400)
+    seconds = time.perf_counter() - began
+
+    print(f"{backend}: {size} monitors, {size * samples} response times in {seconds:.3f}s")
+    assert len(report["dashboards"]) == 10
+    assert report["dashboards"][0]["response_avg"] > 100
+    assert seconds < 10
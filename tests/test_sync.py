@@ -0,0 +1,121 @@
+import pytest
+import tomli_w
+import yaml
+from invoke import Context
+
+from src.edwh_uptime_plugin import tasks
+from src.edwh_uptime_plugin.sync import compute_plan, load_desired_state, url_key
+
+
+@pytest.fixture
+def server(server, monkeypatch):
+    server.seed_monitors(5)
+    server.seed_dashboard("Production", [server.monitors[0]["id"]])
+    server.seed_mwindow("weekly release", window_type=3)
+    monkeypatch.setattr(tasks, "confirm", lambda *_, **__: True)
+    return server
+
+
+def test_url_key():
+    assert url_key("Example.com") == url_key("https://example.com/")
+
+
+def test_load_desired_state(tmp_path):
+    state = {"monitors": [{"url": "https://example.com", "interval": 60}]}
+    (tmp_path / "state.toml").write_text(tomli_w.dumps(state))
+    (tmp_path / "state.yml").write_text(yaml.dump(state))
+
+    assert load_desired_state(tmp_path / "state.toml") == state
+    assert load_desired_state(tmp_path / "state.yml") == state
+
+    with pytest.raises(ValueError):
+        load_desired_state(tmp_path / "state.ini")
+
+
+def test_plan_only_contains_differences():
+    monitors = [
+        {"id": 1, "url": "https://a.example.com/", "friendly_name": "a", "type": 1, "interval": 300, "mwindows": []},
+        {"id": 2, "url": "https://b.example.com/", "friendly_name": "b", "type": 1, "interval": 300, "mwindows": []},
+    ]
+    mwindows = [{"id": 7, "friendly_name": "Weekly release", "type": "weekly"}]
+    desired = {
+        "monitors": [
+            {"url": "a.example.com", "friendly_name": "a", "interval": 300},  # unchanged
+            {"url": "https://b.example.com", "interval": 60, "mwindows": ["weekly release"]},
+            {"url": "https://c.example.com", "mwindows": ["nope"]},
+        ],
+        "dashboards": [{"friendly_name": "Unknown", "monitors": []}],
+    }
+
+    plan = compute_plan(desired, monitors, [], mwindows)
+
+    assert [(_.monitor["id"], _.changes) for _ in plan.edit] == [(2, {"interval": 60, "mwindows": "7"})]
+    assert [_["url"] for _ in plan.create] == ["https://c.example.com"]
+    assert plan.create[0]["friendly_name"] == "c.example.com"
+    assert not plan.delete
+    assert len(plan.problems) == 2  # unknown window and dashboard
+
+    assert [_["id"] for _ in compute_plan(desired, monitors, [], mwindows, prune=True).delete] == []
+    assert [
+        _["id"] for _ in compute_plan({"monitors": desired["monitors"][:1]}, monitors, [], [], prune=True).delete
+    ] == [2]
+
+
+def test_plan_dashboards_by_monitor_id():
+    monitors = [{"id": 1, "url": "https://a.example.com/"}, {"id": 2, "url": "https://b.example.com/"}]
+    dashboards = [{"id": 10, "friendly_name": "Production", "monitors": [1]}]
+
+    desired = {"dashboards": [{"friendly_name": "Production", "monitors": [1, 3, "b.example.com"]}]}
+    plan = compute_plan(desired, monitors, dashboards, [])
+    assert [_.monitors for _ in plan.dashboards] == [[1, "https://b.example.com"]]
+    assert plan.problems == ["dashboard Production: unknown monitor 3"]
+
+    # the same members, listed like the API does:
+    assert not compute_plan({"dashboards": [{"id": 10, "monitors": [1]}]}, monitors, dashboards, []).dashboards
+
+
+@pytest.mark.usefixtures("client")
+def test_sync_applies_minimal_changes(server, tmp_path):
+    state = tmp_path / "uptime.toml"
+    state.write_text(
+        tomli_w.dumps(
+            {
+                "monitors": [
+                    {"url": _["url"], "interval": 60 if idx == 1 else 300} for idx, _ in enumerate(server.monitors[:4])
+                ]
+                + [{"url": "https://new.example.com", "mwindows": ["weekly release"]}],
+                "dashboards": [
+                    {"friendly_name": "Production", "monitors": ["https://new.example.com", "site2.example.com"]}
+                ],
+            }
+        )
+    )
+    removed = server.monitors[4]
+
+    tasks.sync(Context(), str(state), prune=True)
+
+    writes = [endpoint for endpoint, _ in server.requests if not endpoint.startswith("get")]
+    assert sorted(writes) == ["deleteMonitor", "editMonitor", "editPSP", "newMonitor"]
+    assert server.monitors[1]["interval"] == 60
+    assert removed not in server.monitors
+
+    new = server.monitors[-1]
+    assert new["url"] == "https://new.example.com"
+    assert server.monitor_mwindows[new["id"]] == {server.mwindows[0]["id"]}
+    assert server.psps[0]["monitors"] == sorted([server.monitors[2]["id"], new["id"]])
+
+    # and now there's nothing left to do:
+    server.reset_counters()
+    tasks.sync(Context(), str(state), prune=True)
+    assert all(endpoint.startswith("get") for endpoint, _ in server.requests)
+
+
+@pytest.mark.usefixtures("client")
+def test_dry_run_does_not_write(server, tmp_path):
+    state = tmp_path / "uptime.yaml"
+    state.write_text(yaml.dump({"monitors": [{"url": "https://new.example.com"}]}))
+
+    tasks.sync(Context(), str(state), prune=True, dry_run=True)
+
+    assert all(endpoint.startswith("get") for endpoint, _ in server.requests)
+    assert len(server.monitors) == 5
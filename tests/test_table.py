@@ -0,0 +1,128 @@
+import json
+import tracemalloc
+
+import pytest
+from invoke import Context
+
+from src.edwh_uptime_plugin import tasks
+from src.edwh_uptime_plugin.memo import RequestMemo
+from src.edwh_uptime_plugin.table import MonitorTable
+from src.edwh_uptime_plugin.uptimerobot import UptimeRobot, uptime_robot
+
+from .fake_uptimerobot import FakeUptimeRobotServer
+
+
+def monitor(idx: int, status: int = 2, **extra) -> dict:
+    return {
+        "id": 780000000 + idx,
+        "friendly_name": f"site{idx}",
+        "url": f"https://site{idx}.example.com/",
+        "type": 1,
+        "interval": 300,
+        "status": status,
+        **extra,
+    }
+
+
+def test_rows_and_lookup():
+    table = MonitorTable([monitor(0), monitor(1, status=9), {"id": 5, "url": "https://new.example.com"}])
+
+    assert len(table) == 3
+    assert table[1] == monitor(1, status=9)
+    assert table[-1] == {"id": 5, "friendly_name": "", "url": "https://new.example.com"}  # unknown fields stay out
+    assert table.get(780000001)["status"] == 9
+    assert table.get(42) is None
+    assert 5 in table and table.status_of(5) is None
+    assert table.status_of(780000001) == 9
+    assert [_["id"] for _ in table] == [780000000, 780000001, 5]
+
+    with pytest.raises(IndexError):
+        table[3]
+
+
+def test_with_status():
+    table = MonitorTable(monitor(idx, status=(0, 2, 8, 9)[idx % 4]) for idx in range(10))
+
+    down = table.with_status((8, 9))
+    assert [_["id"] % 100 for _ in down] == [2, 3, 6, 7]
+    assert down.get(780000003)["status"] == 9
+    assert down.get(780000000) is None
+    assert table.count([0]) == 3
+    assert table.count(range(0, 3)) == 6
+
+
+def test_accounts_column():
+    table = MonitorTable([monitor(0), monitor(1, account="beta")])
+
+    assert table[0]["account"] == "" and table[1]["account"] == "beta"
+    assert table.with_status([2])[1]["account"] == "beta"
+
+
+def test_memory_benchmark():
+    """
+    50k monitors as they come from the API (pages of full dicts): kept as-is versus as a MonitorTable.
+    """
+    size, page_size = 50_000, 50
+    extra = {
+        "sub_type": "",
+        "keyword_type": None,
+        "keyword_case_type": None,
+        "keyword_value": "",
+        "http_username": "",
+        "http_password": "",
+        "port": "",
+        "timeout": 30,
+        "create_datetime": 1700000000,
+    }
+    pages = [
+        json.dumps({"monitors": [monitor(idx, **extra) for idx in range(start, start + page_size)]})
+        for start in range(0, size, page_size)
+    ]
+
+    def measure(container):
+        tracemalloc.start()
+        for page in pages:
+            container.extend(json.loads(page)["monitors"])
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return current
+
+    as_dicts = measure([])
+    as_table = measure(MonitorTable())
+
+    print(f"{size} monitors: {as_dicts / 1e6:.1f}MB as dicts, {as_table / 1e6:.1f}MB as MonitorTable")
+    assert as_table < as_dicts / 3
+
+
+def test_task_memory_benchmark(monkeypatch):
+    """
+    `edwh uptime.down` over 5k monitors like the CLI runs it (one client with a memo for the whole command):
+    what it keeps in memory, versus the same monitors as dicts.
+    """
+    with FakeUptimeRobotServer() as server:
+        server.seed_monitors(5000, statuses=lambda idx: 9 if idx % 100 == 0 else 2)
+        monkeypatch.setattr(
+            uptime_robot,
+            "_instance",
+            UptimeRobot(api_key="fake", base=server.base, rate_limit=None, memo=RequestMemo()),
+        )
+        down = []
+        monkeypatch.setattr(tasks, "output_statuses", lambda monitors, _: down.append(monitors))
+
+        tasks.list_down(Context())  # warm up: imports, the connection pool and the history file
+        down.clear()
+
+        tracemalloc.start()
+        tasks.list_down(Context())
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        tracemalloc.start()
+        monitors = UptimeRobot(api_key="fake", base=server.base, rate_limit=None).get_monitors()
+        as_dicts, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    print(f"{len(monitors)} monitors: {as_dicts / 1e6:.1f}MB as dicts, down kept {retained / 1e6:.1f}MB")
+    assert len(down[0]) == 50
+    assert peak < as_dicts  # never all monitors as dicts at once, not even in the memo
+    assert retained < as_dicts / 5
@@ -0,0 +1,153 @@
+import io
+import json
+import time
+from pathlib import Path
+
+import pytest
+from invoke import Context
+
+from src.edwh_uptime_plugin import tasks
+from src.edwh_uptime_plugin.dumpers import dump_lines
+
+
+def endpoints(server):
+    return [endpoint for endpoint, _ in server.requests]
+
+
+@pytest.mark.usefixtures("client")
+def test_add_dashboard_to_maintenance_is_batched(server, capsys):
+    monitors = server.seed_monitors(60)
+    dashboard = server.seed_dashboard("Dashboard", [_["id"] for _ in monitors])
+    existing = server.seed_mwindow("nightly", window_type=2)
+    window = server.seed_mwindow("deploy")
+    for monitor in monitors[:10]:
+        server.monitor_mwindows[monitor["id"]].add(existing["id"])
+
+    tasks.add_dashboard_to_maintenance(Context(), window["id"], dashboard["id"])
+
+    assert endpoints(server).count("getMonitors") == 2  # 60 monitors = 2 pages
+    assert endpoints(server).count("editMonitor") == 60
+    assert all(window["id"] in server.monitor_mwindows[_["id"]] for _ in monitors)
+    # existing windows are kept:
+    assert all(existing["id"] in server.monitor_mwindows[_["id"]] for _ in monitors[:10])
+    assert "[60/60]" in capsys.readouterr().out
+
+
+@pytest.mark.usefixtures("client")
+def test_add_maintenance_to_monitors_reports_missing(server, capsys):
+    monitors = server.seed_monitors(3)
+    window = server.seed_mwindow("deploy")
+
+    modified = tasks.add_maintenance_to_monitors(window["id"], [_["id"] for _ in monitors] + [1234])
+
+    assert modified == 3
+    assert "Failed to modified 1234" in capsys.readouterr().out
+
+
+@pytest.mark.usefixtures("client")
+def test_lookups_use_one_fetch(server, monkeypatch, capsys):
+    server.seed_monitors(120)
+    monkeypatch.setattr(tasks.edwh, "confirm", lambda *_, **__: False)
+
+    tasks.status(Context(), "site42.example")
+    assert tasks.select_monitor("site7.example")["id"] == server.monitors[7]["id"]
+    assert not tasks.add(Context(), "site99.example.com")  # already exists, not confirmed
+
+    assert endpoints(server) == ["getMonitors"] * 3  # one full fetch of 3 pages
+    assert "site42.example.com/: up" in capsys.readouterr().out
+
+
+@pytest.mark.usefixtures("client")
+def test_auto_add_creates_missing_monitors_in_parallel(server, monkeypatch, capsys):
+    server.seed_monitors(10)
+    dashboard = server.seed_dashboard("Dashboard", [])
+    hosts = ["site1.example.com", "site2.example.com", "www.site3.example.com"] + [
+        f"new{_}.example.com" for _ in range(40)
+    ]
+
+    monkeypatch.setattr(tasks, "dc_config", lambda _: {"services": {"web": {"hosts": hosts}}})
+    monkeypatch.setattr(tasks, "get_hosts_for_service", lambda service: service["hosts"])
+    # every domain, and the pre-selected monitors for the dashboard:
+    monkeypatch.setattr(
+        tasks,
+        "interactive_selected_checkbox_values",
+        lambda options, prompt="", selected=(): list(options) if "domains" in prompt else list(selected),
+    )
+    monkeypatch.setattr(tasks.edwh, "confirm", lambda *_, **__: False)  # don't add www.site3 next to site3
+    monkeypatch.setattr(tasks, "confirm", lambda *_, **__: True)  # do add to the dashboard
+    monkeypatch.setattr(tasks.edwh, "set_env_value", lambda *_: None)
+
+    tasks.auto_add(Context(), force=True)
+
+    assert endpoints(server).count("getMonitors") == 1
+    assert endpoints(server).count("newMonitor") == 40
+    assert endpoints(server).count("editPSP") == 1
+    assert len(server.psps[0]["monitors"]) == 40
+    assert {_["url"] for _ in server.monitors[10:]} == {f"https://{_}" for _ in hosts[3:]}
+    assert dashboard["id"] == server.psps[0]["id"]
+    assert "Added 40 of 40 monitors." in capsys.readouterr().err
+
+
+@pytest.mark.usefixtures("client")
+def test_auto_add_combines_many_directories(server, monkeypatch, tmp_path, capsys):
+    server.seed_monitors(5)
+    for idx in range(10):
+        (tmp_path / f"project{idx}").mkdir()
+    (tmp_path / "not-a-directory").touch()
+
+    def dc_config(ctx):
+        time.sleep(0.1)  # `docker compose config` takes a while
+        idx = int(Path(ctx.cwd).name.removeprefix("project"))
+        # every project has a shared domain, its own one and one that's already monitored:
+        hosts = ["shared.example.com", f"project{idx}.example.com", f"site{idx % 5}.example.com"]
+        return {"services": {"web": {"hosts": hosts}}} if idx != 9 else {}
+
+    prompts = []
+
+    def select(options, *_, **__):
+        prompts.append(options)
+        return list(options)
+
+    monkeypatch.setattr(tasks, "dc_config", dc_config)
+    monkeypatch.setattr(tasks, "get_hosts_for_service", lambda service: service["hosts"])
+    monkeypatch.setattr(tasks, "interactive_selected_checkbox_values", select)
+    monkeypatch.setattr(tasks, "confirm", lambda *_, **__: False)
+    monkeypatch.setattr(tasks.edwh, "set_env_value", lambda *_: None)
+
+    began = time.perf_counter()
+    tasks.auto_add(Context(), directory=[str(tmp_path / "project*"), str(tmp_path / "*")], force=True)
+    seconds = time.perf_counter() - began
+
+    assert len(prompts) == 1 and len(prompts[0]) == 1 + 9 + 5
+    assert endpoints(server).count("getMonitors") == 1
+    assert endpoints(server).count("newMonitor") == 1 + 9
+    assert seconds < 0.5  # 10 configs of 0.1s each, evaluated side by side
+    assert "Found 15 domains in 9 of 10 directories." in capsys.readouterr().err
+
+
+def test_ndjson_is_written_per_record():
+    out = io.StringIO()
+    written = []
+
+    def records():
+        for idx in range(3):
+            written.append(out.getvalue().count("\n"))  # lines already out before the next record is produced
+            yield {"id": idx}
+
+    dump_lines(records(), file=out)
+
+    assert written == [0, 1, 2]
+    assert [json.loads(_) for _ in out.getvalue().splitlines()] == [{"id": 0}, {"id": 1}, {"id": 2}]
+
+
+@pytest.mark.usefixtures("client")
+def test_ndjson_output(server, capsys):
+    server.seed_monitors(120, statuses=lambda idx: 9 if idx % 2 else 2)
+
+    tasks.list_down(Context(), fmt="ndjson")
+    down = [json.loads(_) for _ in capsys.readouterr().out.splitlines()]
+    assert len(down) == 60
+    assert down[0] == {"url": server.monitors[1]["url"], "status": "down"}
+
+    tasks.monitors_verbose(Context(), fmt="jsonl")
+    assert [json.loads(_)["id"] for _ in capsys.readouterr().out.splitlines()] == [_["id"] for _ in server.monitors]
@@ -0,0 +1,62 @@
+import pytest
+from invoke import Context
+
+from src.edwh_uptime_plugin import tasks
+from src.edwh_uptime_plugin.uptimerobot import UptimeRobot
+from src.edwh_uptime_plugin.watch import StatusWatcher, Transition
+
+
+@pytest.fixture
+def server(server):
+    server.seed_monitors(3)
+    return server
+
+
+def test_only_transitions_are_reported(server, client):
+    intervals = []
+
+    def incident(seconds: float) -> None:
+        intervals.append(seconds)
+        match len(intervals):
+            case 1:
+                server.monitors[1]["status"] = 9
+            case 2:
+                pass  # nothing changes
+            case 3:
+                server.monitors[1]["status"] = 2
+                server.monitors.pop(2)
+
+    watcher = StatusWatcher(client, interval=60, fast_interval=15, sleep=incident)
+    changes: list[Transition] = []
+    watcher.run(changes.append, polls=4)
+
+    assert [(_.monitor["id"], _.before, _.after) for _ in changes] == [
+        (server.monitors[1]["id"], 2, 9),
+        (server.monitors[1]["id"], 9, 2),
+        (780000002, 2, None),
+    ]
+    # faster while something is down:
+    assert intervals == [60, 15, 15]
+    assert [endpoint for endpoint, _ in server.requests] == ["getMonitors"] * 4
+
+
+def test_interval_stays_within_rate_limit(server):
+    server.seed_monitors(147)  # 150 monitors = 3 pages per poll
+    client = UptimeRobot(api_key="fake", base=server.base, rate_limit=10)
+    watcher = StatusWatcher(client, interval=60, fast_interval=5)
+    watcher.monitors = {_["id"]: _ for _ in server.monitors}
+    watcher.statuses = {_["id"]: 9 for _ in server.monitors}
+
+    assert watcher.next_interval() == 18  # 3 of the 10 requests/minute
+
+
+@pytest.mark.usefixtures("client")
+def test_watch_task(server, capsys):
+    server.monitors[0]["status"] = 9
+
+    tasks.watch(Context(), polls=1, fmt="ndjson")
+
+    captured = capsys.readouterr()
+    assert not captured.out  # nothing changed (yet)
+    assert "Watching 3 monitors (1 down)" in captured.err
+    assert server.monitors[0]["url"] in captured.err